@@ -1,6 +1,10 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, abort, jsonify
 from flask_cors import CORS
 from flask_restx import Api
+from config import ensure_indexes, get_mongo_health, METRICS_ENABLED, SERVER_TIMING_ENABLED, SLOW_REQUEST_LOG_MS
+from utils import metrics
+from utils.resilience import get_providers_state
+from utils.serialization import FastJSONProvider, output_json
 from directors.routes import directors_bp, api as directors_api
 from favorites.routes import favorites_bp, api as favorites_api
 from generate_blogpost.routes import generate_blogpost_bp, api as blogposts_api
@@ -10,19 +14,26 @@ from movie_detail_cache.routes import movie_detail_cache_bp
 from movie_prepopulate.routes import movie_prepopulate_bp
 from personal_opinion.routes import personal_opinion_bp, api as personal_opinion_api
 from recommendations.routes import recommendations_bp, api as recommendations_api
+from search.routes import search_bp, api as search_api
 from write_review.routes import write_review_bp, api as write_review_api
 
 import logging
 
 app = Flask(__name__)
 
+# JSON rápido (orjson se instalado) com ObjectId e datas convertidos na serialização
+app.json = FastJSONProvider(app)
+
+# Cabeçalhos de resposta visíveis ao frontend (também usados pelas rotas assíncronas do asgi.py)
+CORS_EXPOSE_HEADERS = ["Content-Type", "X-Total-Count", "X-Export-Next-Since", "Server-Timing"]
+
 # Configure CORS with valid headers and origins
 CORS(
     app,
     resources={r"/*": {"origins": "*"}},
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD"],
     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Access-Control-Allow-Origin"],
-    expose_headers=["Content-Type", "X-Total-Count"],
+    expose_headers=CORS_EXPOSE_HEADERS,
     supports_credentials=True,
     max_age=3600
 )
@@ -33,10 +44,17 @@ api = Api(app,
     version='1.0',
     description='API para busca e gerenciamento de filmes'
 )
+api.representation('application/json')(output_json)
+
+# Tempo por requisição e por dependência (Server-Timing, /metrics e log de requisições lentas)
+metrics.init_app(app, server_timing=SERVER_TIMING_ENABLED, slow_request_ms=SLOW_REQUEST_LOG_MS)
 
 # Configure PyMongo logging level
 logging.getLogger('pymongo').setLevel(logging.WARNING)
 
+# Create MongoDB indexes (TTL and unique keys for cache collections)
+ensure_indexes()
+
 @app.route('/')
 def home():
     return jsonify({
@@ -46,6 +64,21 @@ def home():
         "version": "1.0",
     })
 
+@app.route('/api/providers')
+def providers_status():
+    return jsonify(get_providers_state())
+
+@app.route('/api/health/mongo')
+def mongo_health():
+    health = get_mongo_health()
+    return jsonify(health), 200 if health["ok"] else 503
+
+@app.route('/metrics')
+def prometheus_metrics():
+    if not METRICS_ENABLED:
+        abort(404)
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
 # Register namespaces
 api.add_namespace(directors_api, path='/api/directors')
 api.add_namespace(favorites_api, path='/api/favorites')
@@ -54,6 +87,7 @@ api.add_namespace(images_api, path='/api/images')
 api.add_namespace(music_api, path='/api/music')
 api.add_namespace(personal_opinion_api, path='/api/personal-opinion')
 api.add_namespace(recommendations_api, path='/api/recommendations')
+api.add_namespace(search_api, path='/api/search')
 api.add_namespace(write_review_api, path='/api/write-review')
 
 
@@ -67,6 +101,7 @@ app.register_blueprint(movie_detail_cache_bp, url_prefix='/api')
 app.register_blueprint(movie_prepopulate_bp, url_prefix='/api')
 app.register_blueprint(personal_opinion_bp, url_prefix='/api/personal-opinion')
 app.register_blueprint(recommendations_bp, url_prefix='/api/recommendations')
+app.register_blueprint(search_bp, url_prefix='/api/search')
 app.register_blueprint(write_review_bp, url_prefix='/api/write-review')
 
 
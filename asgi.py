@@ -0,0 +1,68 @@
+# Entrada ASGI: uvicorn asgi:app --workers N
+# Detalhes do filme, trilha sonora, diretores e imagens rodam em corrotinas (OpenAI e IMDB
+# assíncronos; MongoDB, S3 e Spotify em threads); as demais rotas, o Swagger e os outros métodos
+# continuam no Flask (app.py)
+from app import app as flask_app, CORS_EXPOSE_HEADERS
+from config import ASGI_WSGI_THREADS, HTTP_CACHE_POLICIES
+from directors.async_controller import get_director_info_async
+from images.async_controller import get_all_image_urls_async
+from movie_detail_cache.async_controller import get_movie_detail_cache_async
+from movie_detail_cache.routes import _cache_version
+from music.async_controller import get_movie_soundtrack_async
+from utils.asgi import AsyncRoutes, create_asgi_app
+from utils.clients import close_async_clients
+
+routes = AsyncRoutes()
+
+
+@routes.route("/api/movie-detail/<movie_id>", cache_policy=HTTP_CACHE_POLICIES["movie_detail"], version=_cache_version)
+async def get_movie_detail(request, movie_id):
+    """Cache completo da página de detalhes do filme"""
+    language = request.args.get('language', 'pt')
+    return await get_movie_detail_cache_async(movie_id, language)
+
+
+@routes.route("/api/directors/<string:director_name>", cache_policy=HTTP_CACHE_POLICIES["directors"])
+async def get_director(request, director_name):
+    """Informações de um diretor específico"""
+    movie_tconst = request.args.get('tconst')
+
+    language = request.args.get('language', 'pt')
+    if language not in ['pt', 'en']:
+        language = 'pt'
+
+    return await get_director_info_async(director_name, movie_tconst, language)
+
+
+@routes.route("/api/music/soundtrack", cache_policy=HTTP_CACHE_POLICIES["soundtracks"])
+async def get_soundtrack(request):
+    """Trilha sonora de um filme específico"""
+    movie_title = request.args.get('title')
+    movie_year = request.args.get('year', type=int)
+    movie_director = request.args.get('director')
+    language = request.args.get('language', 'pt')
+
+    if not movie_title:
+        return {"error": "Título do filme é obrigatório"}, 400
+
+    if language not in ['pt', 'en']:
+        language = 'pt'
+
+    return await get_movie_soundtrack_async(movie_title, movie_year, movie_director, language)
+
+
+@routes.route("/api/images/<string:tconst>", cache_policy=HTTP_CACHE_POLICIES["images"])
+async def get_images(request, tconst):
+    """Todas as URLs de imagens de um filme"""
+    BUCKET_NAME = 'themoviesearch'
+    refresh = request.args.get("refresh", "false").lower() == "true"
+    return await get_all_image_urls_async(BUCKET_NAME, tconst, refresh)
+
+
+app = create_asgi_app(
+    flask_app,
+    routes,
+    wsgi_workers=ASGI_WSGI_THREADS,
+    cors_expose_headers=CORS_EXPOSE_HEADERS,
+    on_shutdown=(close_async_clients,),
+)
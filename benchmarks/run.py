@@ -0,0 +1,272 @@
+# Benchmark dos endpoints com MongoDB local (ou mongomock) e provedores falsos
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.run --scale 1k --scale 10k --requests 200 --concurrency 8
+#   python -m benchmarks.run --scale 100k --mongo-uri mongodb://localhost:27017 --json resultado.json
+#   python -m benchmarks.run --baseline resultado.json --max-regression 20
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+BENCHMARK_DATABASE = "movie_search_benchmark"
+SCALES = {"1k": 1000, "10k": 10000, "100k": 100000}
+
+
+def parse_scale(value):
+    """'1k', '10k', '100k' ou um número"""
+    if value in SCALES:
+        return SCALES[value]
+    return int(value)
+
+
+def percentile(sorted_values, p):
+    """Percentil pelo método nearest-rank"""
+    if not sorted_values:
+        return None
+    index = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, wall_seconds):
+    """p50/p95/p99 (ms) e vazão de um cenário"""
+    values = sorted(latencies)
+    to_ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": to_ms(percentile(values, 50)),
+        "p95_ms": to_ms(percentile(values, 95)),
+        "p99_ms": to_ms(percentile(values, 99)),
+        "mean_ms": to_ms(sum(values) / len(values)) if values else None,
+        "max_ms": to_ms(values[-1]) if values else None,
+        "throughput_rps": round(len(values) / wall_seconds, 1) if wall_seconds > 0 else None,
+    }
+
+
+def build_scenarios(sample, requests, use_text_search):
+    """Cenários: nome -> (quantidade, função que gera (método, url, corpo))"""
+    movies = sample["movies"]
+    soundtrack_movies = sample["soundtrack_movies"] or movies
+    pages = max(len(movies) // 20, 1)
+    # Só páginas que existem: a busca responde 404 para página vazia, o que contaria como erro
+    favorite_pages = min(max(-(-sample["favorites"] // 20), 1), 5)
+    cold_movies = iter(random.Random(7).sample(movies, min(len(movies), requests)))
+    warm_movies = movies[:50]
+
+    def soundtrack_url(movie):
+        return f"/api/music/soundtrack?title={quote(movie['title'])}&year={movie['year']}"
+
+    scenarios = {
+        "recommendations_page": (requests, lambda rng: (
+            "GET", f"/api/recommendations/all?page={rng.randint(1, pages)}&page_size=20", None)),
+        "recommendations_cursor": (requests, lambda rng: (
+            "GET", "/api/recommendations/all?pagination=cursor&page_size=20", None)),
+        "recommendations_random": (max(requests // 10, 5), lambda rng: (
+            "GET", "/api/recommendations/random", None)),
+        "movie_detail_warm": (requests, lambda rng: (
+            "GET", f"/api/movie-detail/{rng.choice(warm_movies)['tconst']}", None)),
+        "movie_detail_cold": (min(requests, len(movies)), lambda rng: (
+            "GET", f"/api/movie-detail/{next(cold_movies)['tconst']}?language=en", None)),
+        "director": (requests, lambda rng: (
+            "GET", f"/api/directors/{quote(rng.choice(sample['directors']))}", None)),
+        "soundtrack": (requests, lambda rng: (
+            "GET", soundtrack_url(rng.choice(soundtrack_movies)), None)),
+        "favorites_search": (requests, lambda rng: (
+            "POST", "/api/favorites/search", {"page": rng.randint(1, favorite_pages), "page_size": 20})),
+        "blogpost_get": (requests, lambda rng: (
+            "GET", f"/api/generate-blogpost/{rng.choice(sample['blog_tconsts'])}", None)),
+        "images": (requests, lambda rng: (
+            "GET", f"/api/images/{rng.choice(warm_movies)['tconst']}", None)),
+        "search_typeahead": (requests, lambda rng: (
+            "GET", f"/api/search/?q={quote(rng.choice(sample['words'])[:3])}", None)),
+    }
+    if use_text_search:
+        scenarios["blogpost_text_search"] = (requests, lambda rng: (
+            "POST", "/api/generate-blogpost/search", {"query": rng.choice(sample["words"])}))
+    return scenarios
+
+
+def run_scenario(app, count, make_request, concurrency, seed):
+    """Executa `count` requisições com `concurrency` threads; retorna o resumo"""
+    local = threading.local()
+    lock = threading.Lock()
+    rng = random.Random(seed)
+    requests = [make_request(rng) for _ in range(count)]
+    latencies = []
+    errors = [0]
+
+    def execute(request):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        method, url, body = request
+        started = time.perf_counter()
+        response = client.open(url, method=method, json=body)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(execute, requests))
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def _configure_environment(args):
+    """Variáveis lidas pelo config.py; precisam existir antes de importar a aplicação"""
+    os.environ["MONGODB_DATABASE"] = BENCHMARK_DATABASE
+    os.environ["MONGODB_CONNECTION_STRING"] = args.mongo_uri or "mongodb://localhost:27017"
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ["SPOTIFY_CLIENT_ID"] = "benchmark"
+    os.environ["SPOTIFY_CLIENT_SECRET"] = "benchmark"
+    os.environ["BUCKET_NAME"] = "benchmark"
+    if not args.keep_rate_limits:
+        # Mede a aplicação, não o limitador de chamadas aos provedores
+        for provider in ("OPENAI", "SPOTIFY", "IMDB"):
+            os.environ[f"{provider}_RATE_LIMIT"] = "100000"
+            os.environ[f"{provider}_RATE_BURST"] = "100000"
+    if not args.mongo_uri:
+        # mongomock não tem change streams
+        os.environ["SEARCH_INDEX_CHANGE_STREAMS"] = "false"
+        import mongomock
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+
+
+def run_scale(args, scale):
+    """Roda todos os cenários em uma escala (chamado em um processo próprio)"""
+    _configure_environment(args)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from benchmarks.seed import seed_database
+    from benchmarks.stubs import install_stubs, parse_latency
+
+    install_stubs(parse_latency(args.latency))
+    from app import app
+    import config
+
+    db = config.get_mongo_collection("recommendations").database
+    seed_started = time.perf_counter()
+    sample = seed_database(db, scale)
+    seed_seconds = round(time.perf_counter() - seed_started, 2)
+
+    scenarios = build_scenarios(sample, args.requests, use_text_search=bool(args.mongo_uri))
+    if args.endpoint:
+        scenarios = {name: scenario for name, scenario in scenarios.items() if name in args.endpoint}
+
+    results = {}
+    for index, (name, (count, make_request)) in enumerate(scenarios.items()):
+        if not name.endswith("_cold") and args.warmup:
+            run_scenario(app, args.warmup, make_request, args.concurrency, seed=1000 + index)
+        results[name] = run_scenario(app, count, make_request, args.concurrency, seed=index)
+        print(f"  {name}: {results[name]}", file=sys.stderr)
+
+    return {"scale": scale, "seed_seconds": seed_seconds, "endpoints": results}
+
+
+def print_report(report):
+    header = f"{'endpoint':<24}{'req':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"
+    for scale_result in report["scales"]:
+        print(f"\nEscala {scale_result['scale']} filmes (seed em {scale_result['seed_seconds']}s)")
+        print(header)
+        print("-" * len(header))
+        for name, stats in scale_result["endpoints"].items():
+            print(
+                f"{name:<24}{stats['requests']:>6}{stats['errors']:>5}"
+                f"{stats['p50_ms']!s:>10}{stats['p95_ms']!s:>10}{stats['p99_ms']!s:>10}"
+                f"{stats['throughput_rps']!s:>10}"
+            )
+
+
+def compare_with_baseline(report, baseline, max_regression):
+    """Lista os cenários cujo p95 piorou mais que max_regression% em relação ao baseline"""
+    previous = {
+        (scale_result["scale"], name): stats
+        for scale_result in baseline.get("scales", [])
+        for name, stats in scale_result["endpoints"].items()
+    }
+    regressions = []
+    for scale_result in report["scales"]:
+        for name, stats in scale_result["endpoints"].items():
+            old = previous.get((scale_result["scale"], name))
+            if not old or not old.get("p95_ms") or stats["p95_ms"] is None:
+                continue
+            change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            if change > max_regression:
+                regressions.append(
+                    f"{name} ({scale_result['scale']}): p95 {old['p95_ms']}ms -> {stats['p95_ms']}ms (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos endpoints da API")
+    parser.add_argument("--scale", action="append", help="1k, 10k, 100k ou número de filmes (repetível)")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições medidas por cenário")
+    parser.add_argument("--warmup", type=int, default=20, help="Requisições de aquecimento (não medidas)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requisições simultâneas")
+    parser.add_argument("--latency", default="", help="Latência dos provedores falsos, ex.: openai=0.8,spotify=0.15,imdb=0.3,s3=0.05")
+    parser.add_argument("--mongo-uri", help="MongoDB local (o banco movie_search_benchmark é recriado); padrão: mongomock")
+    parser.add_argument("--endpoint", action="append", help="Roda só os cenários indicados (repetível)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Mantém os limites de chamadas aos provedores")
+    parser.add_argument("--json", help="Salva o relatório em JSON")
+    parser.add_argument("--baseline", help="Relatório JSON anterior para detectar regressões")
+    parser.add_argument("--max-regression", type=float, default=20, help="Piora máxima aceita no p95 (%%)")
+    parser.add_argument("--child-scale", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if not args.mongo_uri and args.concurrency > 1:
+        # mongomock não é thread-safe: requisições simultâneas corrompem as coleções em memória
+        print("mongomock: usando concurrency=1 (use --mongo-uri para medir concorrência)", file=sys.stderr)
+        args.concurrency = 1
+
+    if args.child_scale:
+        print(json.dumps(run_scale(args, args.child_scale)))
+        return 0
+
+    # Cada escala roda num processo novo: caches em memória e índices não vazam entre escalas
+    forwarded = list(argv if argv is not None else sys.argv[1:])
+    report = {"scales": [], "config": {
+        "requests": args.requests, "concurrency": args.concurrency,
+        "latency": args.latency or "default", "mongo": "local" if args.mongo_uri else "mongomock",
+    }}
+    for scale in [parse_scale(value) for value in (args.scale or ["1k"])]:
+        print(f"Executando escala {scale}...", file=sys.stderr)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", *forwarded, "--child-scale", str(scale)],
+            check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+        report["scales"].append(json.loads(output.strip().splitlines()[-1]))
+
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_with_baseline(report, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressões de desempenho:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nSem regressões em relação ao baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
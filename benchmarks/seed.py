@@ -0,0 +1,133 @@
+# Dados sintéticos para o benchmark (recomendações, diretores, trilhas, blog posts, favoritos...)
+import random
+
+BATCH_SIZE = 5000
+
+_SYLLABLES = ["ca", "sa", "ção", "ma", "ri", "lo", "tê", "vi", "da", "no", "ré", "su", "bra", "qui", "ló"]
+_WORDS = ["cidade", "deus", "noite", "terra", "transe", "vidas", "secas", "central", "brasil",
+          "memórias", "cárcere", "ação", "estética", "fome", "cinema", "novo", "sertão", "mar"]
+_COUNTRIES = ["Brasil", "França", "Itália", "Japão", "Estados Unidos", "Argentina", "México"]
+_GENRES = ["Drama", "Comédia", "Documentário", "Romance", "Crime", "Western"]
+
+
+def _name(rng, words=2):
+    return " ".join(
+        "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        for _ in range(words)
+    )
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _insert(collection, documents):
+    for start in range(0, len(documents), BATCH_SIZE):
+        collection.insert_many(documents[start:start + BATCH_SIZE], ordered=False)
+
+
+def seed_database(db, scale, seed=42):
+    """
+    Recria as coleções com `scale` filmes. Parte dos filmes fica sem diretor ou trilha
+    salvos, para exercitar os provedores falsos. Retorna amostras usadas nos cenários.
+    """
+    rng = random.Random(seed)
+    for name in ["recommendations", "directors", "movie_soundtracks", "blogposts", "favoritelist",
+                 "personal_opinions", "authoralreviewslist", "movie_detail_cache", "translations",
+                 "negative_cache", "image_manifests"]:
+        db[name].delete_many({})
+
+    directors = sorted({_name(rng) for _ in range(max(scale // 3, 10))})
+    movies = []
+    for position in range(1, scale + 1):
+        director = rng.choice(directors)
+        if rng.random() < 0.05:
+            director = f"{director}, {rng.choice(directors)}"
+        movies.append({
+            "tconst": f"tt{position:07d}",
+            "title": _text(rng, rng.randint(1, 4)).title(),
+            "original_title": _name(rng, rng.randint(1, 3)),
+            "year": str(rng.randint(1920, 2024)),
+            "director": director,
+            "genres": rng.choice(_GENRES),
+            "imdb_rating": str(round(rng.uniform(5, 9.5), 1)),
+            "runtime": str(rng.randint(70, 200)),
+            "position": position,
+            "url": f"https://www.imdb.com/title/tt{position:07d}/",
+        })
+    _insert(db["recommendations"], movies)
+
+    # ~80% dos diretores e ~50% das trilhas já existem; o resto passa pelos provedores
+    saved_directors = [name for name in directors if rng.random() < 0.8]
+    _insert(db["directors"], [
+        {"name": name, "bio": _text(rng, 80), "photo": f"https://example.com/{i}.jpg"}
+        for i, name in enumerate(saved_directors)
+    ])
+
+    # cache_key (título_ano) é único; títulos sintéticos podem se repetir
+    with_soundtrack = list({
+        f"{movie['title']}_{movie['year']}": movie for movie in movies if rng.random() < 0.5
+    }.values())
+    _insert(db["movie_soundtracks"], [
+        {
+            "cache_key": f"{movie['title']}_{movie['year']}",
+            "tracks": [{"title": f"Theme {i}", "artist": _name(rng), "spotify_id": None}
+                       for i in range(6)],
+            "description": _text(rng, 40),
+        }
+        for movie in with_soundtrack
+    ])
+
+    blog_movies = rng.sample(movies, max(scale // 10, 1))
+    _insert(db["blogposts"], [
+        {
+            "tconst": movie["tconst"],
+            "primaryTitle": movie["title"],
+            # Mesmo formato dos posts gerados: o texto fica em content.<idioma>
+            "content": {
+                language: {
+                    "title": _text(rng, 6).capitalize(),
+                    "introduction": _text(rng, 120),
+                    "historical_context": _text(rng, 200),
+                    "cultural_importance": _text(rng, 200),
+                    "technical_analysis": _text(rng, 200),
+                    "conclusion": _text(rng, 80),
+                }
+                for language in ("en", "pt")
+            },
+        }
+        for movie in blog_movies
+    ])
+
+    favorite_movies = rng.sample(movies, max(scale // 5, 1))
+    _insert(db["favoritelist"], [
+        {
+            "tconst": movie["tconst"],
+            "primaryTitle": movie["title"],
+            "director": movie["director"],
+            "startYear": movie["year"],
+            "country": rng.choice(_COUNTRIES),
+        }
+        for movie in favorite_movies
+    ])
+
+    opinion_movies = rng.sample(movies, max(scale // 20, 1))
+    _insert(db["personal_opinions"], [
+        {"tconst": movie["tconst"], "opinion": _text(rng, 60), "enjoying_1": _text(rng, 5),
+         "enjoying_2": _text(rng, 5)}
+        for movie in opinion_movies
+    ])
+    _insert(db["authoralreviewslist"], [
+        {"tconst": movie["tconst"], "primaryTitle": movie["title"],
+         "content": {language: {"text": _text(rng, 150)} for language in ("en", "pt")}}
+        for movie in opinion_movies
+    ])
+
+    return {
+        "movies": movies,
+        "directors": directors,
+        "soundtrack_movies": with_soundtrack,
+        "blog_tconsts": [movie["tconst"] for movie in blog_movies],
+        "favorites": len(favorite_movies),
+        "words": _WORDS,
+    }
@@ -0,0 +1,167 @@
+# Provedores falsos (OpenAI, Spotify, IMDB, S3) com latência configurável
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+DEFAULT_LATENCY = {
+    "openai": 0.8,
+    "spotify": 0.15,
+    "imdb": 0.3,
+    "s3": 0.05,
+}
+
+
+def parse_latency(spec):
+    """'openai=0.5,s3=0.02' -> dict de latências em segundos (demais provedores no padrão)"""
+    latency = dict(DEFAULT_LATENCY)
+    for item in filter(None, (spec or "").split(",")):
+        provider, _, seconds = item.partition("=")
+        if provider.strip() not in latency:
+            raise ValueError(f"Provedor desconhecido: {provider}")
+        latency[provider.strip()] = float(seconds)
+    return latency
+
+
+class _Latency:
+    """Espera a latência do provedor com ±20% de variação"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.calls = 0
+
+    def wait(self):
+        self.calls += 1
+        if self.seconds > 0:
+            time.sleep(self.seconds * random.uniform(0.8, 1.2))
+
+
+class FakeOpenAI:
+    """Responde chat.completions.create com trilhas em JSON, traduções ou biografias"""
+
+    def __init__(self, latency):
+        self.latency = _Latency(latency)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model=None, messages=None, **kwargs):
+        self.latency.wait()
+        prompt = messages[-1]["content"] if messages else ""
+
+        if '"tracks"' in prompt:
+            content = json.dumps({
+                "tracks": [
+                    {"title": f"Theme {i}", "artist": f"Composer {i}", "description": "Main theme"}
+                    for i in range(1, 7)
+                ],
+                "description": "Synthetic soundtrack description",
+            })
+        elif "ranslate" in prompt or "raduza" in prompt:
+            content = prompt.split(": ", 1)[-1]
+        else:
+            content = "Synthetic director biography. " * 20
+
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def close(self):
+        pass
+
+
+class FakeSpotify:
+    """Responde search() com uma música encontrada"""
+
+    def __init__(self, latency):
+        self.latency = _Latency(latency)
+
+    def search(self, q=None, type="track", limit=1, **kwargs):
+        self.latency.wait()
+        return {"tracks": {"items": [{
+            "id": f"sp{abs(hash(q)) % 10**8}",
+            "name": q,
+            "artists": [{"name": "Synthetic Artist"}],
+            "preview_url": None,
+            "external_urls": {"spotify": "https://open.spotify.com/track/x"},
+            "album": {"name": "Synthetic Album", "images": []},
+            "duration_ms": 180000,
+        }]}}
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeHTTPSession:
+    """Páginas do IMDB com link de diretor e foto"""
+
+    def __init__(self, latency):
+        self.latency = _Latency(latency)
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        self.latency.wait()
+        if "/name/" in url:
+            return _FakeResponse(
+                '<img src="https://m.media-amazon.com/images/M/synthetic_V1_UX214_CR0,0,214,317_AL_.jpg">'
+            )
+        return _FakeResponse("<html></html>")
+
+    def close(self):
+        pass
+
+
+class FakeS3:
+    """list_objects_v2 (paginado) e get_object_tagging para as imagens de um filme"""
+
+    def __init__(self, latency, images_per_movie=12):
+        self.latency = _Latency(latency)
+        self.images_per_movie = images_per_movie
+        self.modified = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def get_paginator(self, operation):
+        return SimpleNamespace(paginate=self._paginate)
+
+    def _paginate(self, Bucket=None, Prefix="", **kwargs):
+        self.latency.wait()
+        yield {"Contents": [
+            {
+                "Key": f"{Prefix}image_{i}.jpg",
+                "ETag": f'"etag{i}"',
+                "LastModified": self.modified + timedelta(minutes=i),
+            }
+            for i in range(self.images_per_movie)
+        ]}
+
+    def get_object_tagging(self, Bucket=None, Key=None):
+        self.latency.wait()
+        return {"TagSet": [
+            {"Key": "subtitle_pt", "Value": f"Legenda {Key}"},
+            {"Key": "subtitle_en", "Value": f"Caption {Key}"},
+        ]}
+
+    def close(self):
+        pass
+
+
+def install_stubs(latency):
+    """Registra os clientes falsos no registro de utils.clients (antes do primeiro uso)"""
+    from utils import clients
+
+    stubs = {
+        "openai": FakeOpenAI(latency["openai"]),
+        "spotify": FakeSpotify(latency["spotify"]),
+        "http": FakeHTTPSession(latency["imdb"]),
+        "s3": FakeS3(latency["s3"]),
+    }
+    clients.reset_clients()
+    clients._clients.update(stubs)
+    return stubs
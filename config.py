@@ -1,8 +1,11 @@
 import os
+import threading
 
 from pymongo import MongoClient
 from dotenv import load_dotenv
 
+from utils.mongo_pool import PoolStats, mongo_health
+
 load_dotenv()
 
 
@@ -10,20 +13,112 @@ load_dotenv()
 MONGODB_CONNECTION_STRING = os.getenv("MONGODB_CONNECTION_STRING")
 MONGODB_DATABASE = os.getenv("MONGODB_DATABASE")
 
-# Conexão com o MongoDB
-client = MongoClient(MONGODB_CONNECTION_STRING)
-db = client[MONGODB_DATABASE]
+# Pool e timeouts do cliente do MongoDB (variáveis vazias mantêm o padrão do pymongo)
+# MONGO_READ_PREFERENCE: primary, primaryPreferred, secondary, secondaryPreferred ou nearest
+# MONGO_COMPRESSORS: ex. "zstd,snappy,zlib" (zstd e snappy precisam de zstandard / python-snappy)
+def _optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS = _optional_int("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10000))
+MONGO_SOCKET_TIMEOUT_MS = _optional_int("MONGO_SOCKET_TIMEOUT_MS")
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE") or None
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS") or None
+MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "movie-search")
+
+
+def mongo_client_options(max_pool_size=MONGO_MAX_POOL_SIZE):
+    """Opções passadas ao MongoClient (têm precedência sobre as da string de conexão)"""
+    options = {
+        "maxPoolSize": max_pool_size,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "compressors": MONGO_COMPRESSORS,
+        "appname": MONGO_APP_NAME,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+# Clientes do processo atual, criados no primeiro uso. Um MongoClient não pode ser usado
+# depois de um fork (workers do gunicorn): o processo filho descarta os herdados e cria os seus
+_mongo_lock = threading.Lock()
+_mongo = {"client": None, "pool_stats": None}
+
+
+def get_mongo_client():
+    """MongoClient deste processo (criado na primeira chamada)"""
+    client = _mongo["client"]
+    if client is None:
+        with _mongo_lock:
+            client = _mongo["client"]
+            if client is None:
+                pool_stats = PoolStats()
+                client = MongoClient(
+                    MONGODB_CONNECTION_STRING, event_listeners=[pool_stats], **mongo_client_options()
+                )
+                _mongo.update(client=client, pool_stats=pool_stats)
+    return client
 
 
 # Função para obter uma coleção do MongoDB
 def get_mongo_collection(name):
     try:
-        collection = db[name]
+        collection = get_mongo_client()[MONGODB_DATABASE][name]
         return collection
     except Exception as e:
         print(f"Erro ao conectar com a coleção {name}: {e}")
         return None
 
+
+def reset_mongo_client():
+    """Descarta o MongoClient deste processo; o próximo uso cria um novo"""
+    global _mongo_lock
+    # O cliente herdado não é fechado: seus locks e sockets pertencem ao processo pai
+    _mongo_lock = threading.Lock()
+    _mongo.update(client=None, pool_stats=None)
+
+
+os.register_at_fork(after_in_child=reset_mongo_client)
+
+
+def get_mongo_health():
+    """Ping, topologia e uso do pool de conexões deste processo (para dimensionar o pool)"""
+    health = mongo_health(get_mongo_client(), _mongo["pool_stats"], mongo_client_options())
+    health["pid"] = os.getpid()
+    return health
+
+
+# Tempo de vida dos caches (aplicado pelos índices TTL do MongoDB)
+MOVIE_DETAIL_CACHE_TTL_HOURS = int(os.getenv("MOVIE_DETAIL_CACHE_TTL_HOURS", 24))
+MOVIE_SOUNDTRACKS_TTL_DAYS = int(os.getenv("MOVIE_SOUNDTRACKS_TTL_DAYS", 30))
+
+
+# Cria os índices das coleções de cache (chamado na inicialização da aplicação)
+def ensure_indexes():
+    from utils.indexes import ensure_indexes as _ensure_indexes
+    try:
+        _ensure_indexes(
+            get_mongo_client()[MONGODB_DATABASE],
+            movie_detail_ttl_seconds=MOVIE_DETAIL_CACHE_TTL_HOURS * 3600,
+            soundtracks_ttl_seconds=MOVIE_SOUNDTRACKS_TTL_DAYS * 86400,
+            blogposts_text_language=BLOGPOSTS_TEXT_LANGUAGE,
+        )
+        return True
+    except Exception as e:
+        print(f"Erro ao criar índices do MongoDB: {e}")
+        return False
+
 # Configuração do S3
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
@@ -34,4 +129,140 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Configurações do Spotify
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
\ No newline at end of file
+SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+
+# Configurações do cache em memória da página de detalhes. O TTL também é o atraso máximo
+# para uma invalidação chegar aos outros workers, já que cada um tem o seu cache
+MOVIE_DETAIL_MEMORY_CACHE_SIZE = int(os.getenv("MOVIE_DETAIL_MEMORY_CACHE_SIZE", 256))
+MOVIE_DETAIL_MEMORY_CACHE_TTL = int(os.getenv("MOVIE_DETAIL_MEMORY_CACHE_TTL", 60))
+
+# Configurações do cache de traduções em memória
+TRANSLATION_MEMORY_CACHE_SIZE = int(os.getenv("TRANSLATION_MEMORY_CACHE_SIZE", 1024))
+TRANSLATION_MEMORY_CACHE_TTL = int(os.getenv("TRANSLATION_MEMORY_CACHE_TTL", 3600))
+
+# Configurações dos pools de conexão para serviços externos
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", 10))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+SPOTIFY_POOL_SIZE = int(os.getenv("SPOTIFY_POOL_SIZE", 10))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", 30))
+S3_POOL_SIZE = int(os.getenv("S3_POOL_SIZE", 16))
+S3_REGION = os.getenv("S3_REGION", "us-east-2")
+# Conexões simultâneas dos clientes assíncronos (OpenAI e HTTP) no modo ASGI
+ASYNC_HTTP_POOL_SIZE = int(os.getenv("ASYNC_HTTP_POOL_SIZE", 100))
+
+# Configurações da busca de músicas no Spotify
+SPOTIFY_SEARCH_WORKERS = int(os.getenv("SPOTIFY_SEARCH_WORKERS", 8))
+SPOTIFY_TRACK_TIMEOUT = float(os.getenv("SPOTIFY_TRACK_TIMEOUT", 3))
+SPOTIFY_TRACK_CACHE_SIZE = int(os.getenv("SPOTIFY_TRACK_CACHE_SIZE", 2048))
+SPOTIFY_TRACK_CACHE_TTL = int(os.getenv("SPOTIFY_TRACK_CACHE_TTL", 86400))
+
+# Configurações da montagem paralela (diretor, trilha sonora, traduções)
+ORCHESTRATION_WORKERS = int(os.getenv("ORCHESTRATION_WORKERS", 16))
+MOVIE_DETAIL_BUILD_TIMEOUT = float(os.getenv("MOVIE_DETAIL_BUILD_TIMEOUT", 12))
+PREPOPULATE_MOVIE_TIMEOUT = float(os.getenv("PREPOPULATE_MOVIE_TIMEOUT", 30))
+# Pool próprio da pré-população, para não ocupar as threads usadas pelas requisições
+PREPOPULATE_MOVIE_WORKERS = int(os.getenv("PREPOPULATE_MOVIE_WORKERS", 6))
+
+# Configurações da busca de filmes com múltiplos diretores
+DIRECTORS_LOOKUP_WORKERS = int(os.getenv("DIRECTORS_LOOKUP_WORKERS", 8))
+DIRECTORS_LOOKUP_TIMEOUT = float(os.getenv("DIRECTORS_LOOKUP_TIMEOUT", 10))
+
+# Configurações da pré-população (lotes e jobs em segundo plano)
+PREPOPULATE_JOB_RUNNERS = int(os.getenv("PREPOPULATE_JOB_RUNNERS", 1))
+# Limite para o max_workers enviado no corpo de /prepopulate/all
+PREPOPULATE_MAX_WORKERS = int(os.getenv("PREPOPULATE_MAX_WORKERS", 8))
+PREPOPULATE_BATCH_SIZE = int(os.getenv("PREPOPULATE_BATCH_SIZE", 100))
+PREPOPULATE_JOB_STALE_SECONDS = int(os.getenv("PREPOPULATE_JOB_STALE_SECONDS", 300))
+
+# Limite de taxa por provedor (por processo) e circuit breaker
+PROVIDER_RATE_LIMITS = {
+    "openai": {
+        "rate": float(os.getenv("OPENAI_RATE_LIMIT", 5)),
+        "burst": int(os.getenv("OPENAI_RATE_BURST", 10)),
+    },
+    "spotify": {
+        "rate": float(os.getenv("SPOTIFY_RATE_LIMIT", 10)),
+        "burst": int(os.getenv("SPOTIFY_RATE_BURST", 20)),
+    },
+    "imdb": {
+        "rate": float(os.getenv("IMDB_RATE_LIMIT", 2)),
+        "burst": int(os.getenv("IMDB_RATE_BURST", 4)),
+    },
+}
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", 2))
+CIRCUIT_BREAKER_FAILURES = int(os.getenv("CIRCUIT_BREAKER_FAILURES", 5))
+CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", 30))
+
+# Cache negativo (trilhas sonoras e diretores não encontrados)
+NEGATIVE_CACHE_BACKOFF_MINUTES = [
+    int(minutes) for minutes in os.getenv("NEGATIVE_CACHE_BACKOFF_MINUTES", "15,60,360,1440,4320").split(",")
+]
+NEGATIVE_CACHE_TTL_DAYS = int(os.getenv("NEGATIVE_CACHE_TTL_DAYS", 7))
+
+# Tempo de cache das facetas e totais da listagem de favoritos (também o atraso máximo
+# para alterações em favoritelist aparecerem, já que cada worker tem o seu cache)
+FAVORITES_FACETS_TTL = int(os.getenv("FAVORITES_FACETS_TTL", 60))
+
+# Idioma do índice de texto dos blog posts ("none" desativa stemming e stop words,
+# útil porque os posts misturam português e inglês)
+BLOGPOSTS_TEXT_LANGUAGE = os.getenv("BLOGPOSTS_TEXT_LANGUAGE", "none")
+
+# Cache-Control dos endpoints de leitura (max-age no navegador, s-maxage na CDN)
+HTTP_CACHE_POLICIES = {
+    "movie_detail": {
+        "max_age": int(os.getenv("HTTP_CACHE_MOVIE_DETAIL_MAX_AGE", 60)),
+        "shared_max_age": int(os.getenv("HTTP_CACHE_MOVIE_DETAIL_S_MAXAGE", 300)),
+    },
+    "recommendations": {
+        "max_age": int(os.getenv("HTTP_CACHE_RECOMMENDATIONS_MAX_AGE", 30)),
+        "shared_max_age": int(os.getenv("HTTP_CACHE_RECOMMENDATIONS_S_MAXAGE", 120)),
+    },
+    "directors": {
+        "max_age": int(os.getenv("HTTP_CACHE_DIRECTORS_MAX_AGE", 300)),
+        "shared_max_age": int(os.getenv("HTTP_CACHE_DIRECTORS_S_MAXAGE", 3600)),
+    },
+    "soundtracks": {
+        "max_age": int(os.getenv("HTTP_CACHE_SOUNDTRACKS_MAX_AGE", 300)),
+        "shared_max_age": int(os.getenv("HTTP_CACHE_SOUNDTRACKS_S_MAXAGE", 3600)),
+    },
+    "images": {
+        "max_age": int(os.getenv("HTTP_CACHE_IMAGES_MAX_AGE", 300)),
+        "shared_max_age": int(os.getenv("HTTP_CACHE_IMAGES_S_MAXAGE", 600)),
+    },
+    "blogposts": {
+        "max_age": int(os.getenv("HTTP_CACHE_BLOGPOSTS_MAX_AGE", 120)),
+        "shared_max_age": int(os.getenv("HTTP_CACHE_BLOGPOSTS_S_MAXAGE", 600)),
+    },
+}
+
+# Documentos lidos por lote do MongoDB nas exportações NDJSON
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+
+# Índice de busca unificada (/api/search): recarga periódica quando não há change streams
+SEARCH_INDEX_REFRESH_SECONDS = int(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", 300))
+SEARCH_INDEX_CHANGE_STREAMS = os.getenv("SEARCH_INDEX_CHANGE_STREAMS", "true").lower() == "true"
+# Quanto uma busca espera pela primeira carga do índice antes de responder 503
+SEARCH_INDEX_READY_TIMEOUT = float(os.getenv("SEARCH_INDEX_READY_TIMEOUT", 10))
+# Palavras consideradas por prefixo ("ca" -> casa, cavalo...); com mais candidatas que isso,
+# ficam as presentes em mais documentos e o resultado de prefixos muito curtos é aproximado
+SEARCH_INDEX_MAX_PREFIX_EXPANSIONS = int(os.getenv("SEARCH_INDEX_MAX_PREFIX_EXPANSIONS", 200))
+
+# Manifesto de imagens por filme: dentro do intervalo de verificação não há chamadas ao S3
+IMAGE_MANIFEST_CHECK_SECONDS = int(os.getenv("IMAGE_MANIFEST_CHECK_SECONDS", 600))
+IMAGE_MANIFEST_MEMORY_CACHE_SIZE = int(os.getenv("IMAGE_MANIFEST_MEMORY_CACHE_SIZE", 512))
+IMAGE_TAG_FETCH_WORKERS = int(os.getenv("IMAGE_TAG_FETCH_WORKERS", 8))
+# Revalidações disparadas por /images/<tconst>/<arquivo>, que não esperam pela listagem
+IMAGE_MANIFEST_REFRESH_WORKERS = int(os.getenv("IMAGE_MANIFEST_REFRESH_WORKERS", 2))
+# Legendas ficam nas tags dos objetos, e editar uma tag não muda ETag nem LastModified:
+# na revalidação do manifesto, tags lidas há mais que isso são buscadas de novo
+IMAGE_SUBTITLE_TTL_SECONDS = int(os.getenv("IMAGE_SUBTITLE_TTL_SECONDS", 3600))
+
+# Instrumentação: cabeçalho Server-Timing, endpoint /metrics e log de requisições lentas
+# (SLOW_REQUEST_LOG_MS = 0 desativa o log)
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_LOG_MS = float(os.getenv("SLOW_REQUEST_LOG_MS", 0))
+
+# Modo ASGI (asgi.py): threads do pool que atende as rotas que continuam no Flask (WSGI)
+ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", 10))
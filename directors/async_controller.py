@@ -0,0 +1,155 @@
+# Busca de diretores para o modo ASGI (asgi.py): mesma sequência do controller.py, com OpenAI e
+# IMDB assíncronos. O MongoDB usa as funções do controller.py numa thread (consultas rápidas)
+import asyncio
+from config import OPENAI_API_KEY, DIRECTORS_LOOKUP_TIMEOUT
+from directors.controller import (
+    IMDB_HEADERS,
+    _ai_director,
+    _bio_translation_request,
+    _combine_directors_info,
+    _default_director_bio,
+    _director_bio_request,
+    _fallback_director,
+    _fetch_director_from_tmdb,
+    _find_director,
+    _find_directors,
+    _imdb_name_url,
+    _imdb_title_url,
+    _parse_director_id,
+    _parse_director_photo,
+    _save_director,
+    _set_director_photo,
+    _split_director_names,
+)
+from utils.clients import chat_completion_async, get_async_http_client
+from utils.metrics import count_cache
+from utils.negative_cache import is_known_missing, record_missing, clear_missing
+from utils.orchestration import run_parallel_async
+from utils.resilience import guarded_call_async
+from utils.translations import translate_text_async
+
+
+async def get_director_info_async(director_name, movie_tconst=None, language="pt"):
+    """Busca informações do diretor incluindo biografia e foto"""
+    try:
+        if ',' in director_name:
+            return await _get_multiple_directors_info_async(director_name, movie_tconst, language)
+
+        director_data = await asyncio.to_thread(_find_director, director_name)
+        count_cache("directors_mongo", director_data is not None)
+
+        return await _resolve_director_info_async(director_name, director_data, movie_tconst, language)
+
+    except Exception as e:
+        return {"error": "Erro ao buscar informações do diretor"}, 500
+
+
+async def _resolve_director_info_async(director_name, director_data, movie_tconst=None, language="pt"):
+    """Completa o diretor já buscado no banco ou cria um novo a partir das fontes externas"""
+    try:
+        if director_data:
+            director_data["_id"] = str(director_data["_id"])
+
+            if not director_data.get("photo") and movie_tconst:
+                imdb_photo = await _get_director_photo_from_imdb_async(director_name, movie_tconst)
+
+                if imdb_photo:
+                    await asyncio.to_thread(_set_director_photo, director_name, imdb_photo)
+                    director_data["photo"] = imdb_photo
+
+            if language != "pt" and director_data.get("bio"):
+                director_data["bio"] = await translate_text_async(
+                    "director_bio", director_data["bio"], language, _bio_translation_request
+                )
+
+            return director_data, 200
+
+        if await asyncio.to_thread(is_known_missing, "director", director_name):
+            return _fallback_director(director_name, language), 200
+
+        # O TMDB ainda usa requests; roda numa thread para não bloquear o event loop
+        tmdb_data = await asyncio.to_thread(_fetch_director_from_tmdb, director_name, language)
+
+        if tmdb_data:
+            if not tmdb_data.get("photo") and movie_tconst:
+                imdb_photo = await _get_director_photo_from_imdb_async(director_name, movie_tconst)
+                if imdb_photo:
+                    tmdb_data["photo"] = imdb_photo
+
+            director = await asyncio.to_thread(_save_director, director_name, tmdb_data)
+            await asyncio.to_thread(clear_missing, "director", director_name)
+            return director, 200
+
+        ai_bio = await _generate_director_bio_with_ai_async(director_name, language)
+
+        if not ai_bio:
+            await asyncio.to_thread(record_missing, "director", director_name)
+            return _fallback_director(director_name, language), 200
+
+        imdb_photo = None
+        if movie_tconst:
+            imdb_photo = await _get_director_photo_from_imdb_async(director_name, movie_tconst)
+
+        basic_data = _ai_director(director_name, ai_bio, imdb_photo)
+        director = await asyncio.to_thread(_save_director, director_name, basic_data)
+        await asyncio.to_thread(clear_missing, "director", director_name)
+        return director, 200
+
+    except Exception as e:
+        return {"error": "Erro ao buscar informações do diretor"}, 500
+
+
+async def _get_multiple_directors_info_async(directors_string, movie_tconst=None, language="pt"):
+    """Busca informações para múltiplos diretores (em tarefas do event loop)"""
+    try:
+        director_names = _split_director_names(directors_string)
+        saved_directors = await asyncio.to_thread(_find_directors, director_names)
+
+        def lookup(director_name):
+            return lambda: _resolve_director_info_async(
+                director_name, saved_directors.get(director_name), movie_tconst, language
+            )
+
+        results, _ = await run_parallel_async(
+            {index: lookup(director_name) for index, director_name in enumerate(director_names)},
+            timeout=DIRECTORS_LOOKUP_TIMEOUT
+        )
+
+        return _combine_directors_info(directors_string, director_names, results, language)
+
+    except Exception as e:
+        return {"error": "Erro ao buscar informações dos diretores"}, 500
+
+
+async def _fetch_imdb_page_async(url):
+    """Baixa uma página do IMDB (429/5xx contam como falha do provedor)"""
+    response = await get_async_http_client().get(url, headers=IMDB_HEADERS, timeout=3)
+    response.raise_for_status()
+    return response.text
+
+
+async def _get_director_photo_from_imdb_async(director_name, movie_tconst):
+    """Busca a foto do diretor do IMDB usando o tconst do filme"""
+    try:
+        movie_page = await guarded_call_async("imdb", _fetch_imdb_page_async, _imdb_title_url(movie_tconst))
+        director_id = _parse_director_id(movie_page, director_name)
+
+        if not director_id:
+            return None
+
+        director_page = await guarded_call_async("imdb", _fetch_imdb_page_async, _imdb_name_url(director_id))
+        return _parse_director_photo(director_page)
+
+    except Exception as e:
+        return None
+
+
+async def _generate_director_bio_with_ai_async(director_name, language="pt"):
+    """Gera uma biografia rica do diretor usando OpenAI"""
+    if not OPENAI_API_KEY:
+        return _default_director_bio(director_name, language)
+
+    try:
+        return await chat_completion_async(_director_bio_request(director_name, language))
+    except Exception as e:
+        return None
@@ -1,23 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+import re
 import requests
-from openai import OpenAI
-from config import get_mongo_collection, OPENAI_API_KEY
+from pymongo import ReturnDocument
+from config import (
+    get_mongo_collection,
+    OPENAI_API_KEY,
+    DIRECTORS_LOOKUP_TIMEOUT,
+    DIRECTORS_LOOKUP_WORKERS,
+)
+from utils.clients import chat_completion, get_http_session
+from utils.export import ndjson_response, since_filter
+from utils.metrics import count_cache, span
+from utils.negative_cache import is_known_missing, record_missing, clear_missing
+from utils.orchestration import run_parallel
+from utils.resilience import guarded_call
+from utils.translations import translate_text
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+# Cabeçalhos das páginas do IMDB
+IMDB_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Pool próprio para diretores (as buscas podem partir de etapas do pool de orquestração)
+_directors_executor = ThreadPoolExecutor(
+    max_workers=DIRECTORS_LOOKUP_WORKERS,
+    thread_name_prefix="directors"
+)
+
+
 def get_director_info(director_name, movie_tconst=None, language="pt"):
     """Busca informações do diretor incluindo biografia e foto"""
-    collection = get_mongo_collection("directors")
-    
     try:
         # Verifica se há múltiplos diretores separados por vírgula
         if ',' in director_name:
             return _get_multiple_directors_info(director_name, movie_tconst, language)
         
         # Primeiro tenta buscar no banco de dados
-        director_data = collection.find_one({"name": director_name})
+        director_data = _find_director(director_name)
+        count_cache("directors_mongo", director_data is not None)
         
+        return _resolve_director_info(director_name, director_data, movie_tconst, language)
+        
+    except Exception as e:
+        return {"error": "Erro ao buscar informações do diretor"}, 500
+
+
+def _resolve_director_info(director_name, director_data, movie_tconst=None, language="pt"):
+    """Completa o diretor já buscado no banco ou cria um novo a partir das fontes externas"""
+    try:
         if director_data:
             # Converte ObjectId para string
             director_data["_id"] = str(director_data["_id"])
@@ -28,19 +64,21 @@ def get_director_info(director_name, movie_tconst=None, language="pt"):
                 
                 if imdb_photo:
                     # Atualiza a foto no banco
-                    collection.update_one(
-                        {"name": director_name},
-                        {"$set": {"photo": imdb_photo}}
-                    )
+                    _set_director_photo(director_name, imdb_photo)
                     director_data["photo"] = imdb_photo
             
             # Gera biografia no idioma solicitado se necessário
             if language != "pt" and director_data.get("bio"):
-                # Tradução simples sem cache
-                director_data["bio"] = _translate_director_bio(director_data["bio"], language)
+                director_data["bio"] = translate_text(
+                    "director_bio", director_data["bio"], language, _bio_translation_request
+                )
             
             return director_data, 200
         
+        # Diretor que falhou recentemente: responde com dados básicos sem chamar os provedores
+        if is_known_missing("director", director_name):
+            return _fallback_director(director_name, language), 200
+        
         # Se não encontrou no banco, busca no TMDB
         tmdb_data = _fetch_director_from_tmdb(director_name, language)
         
@@ -52,73 +90,155 @@ def get_director_info(director_name, movie_tconst=None, language="pt"):
                     tmdb_data["photo"] = imdb_photo
             
             # Salva no banco para futuras consultas
-            result = collection.insert_one(tmdb_data)
-            tmdb_data["_id"] = str(result.inserted_id)
-            return tmdb_data, 200
+            director = _save_director(director_name, tmdb_data)
+            clear_missing("director", director_name)
+            return director, 200
         
         # Se não encontrou no TMDB, gera biografia com OpenAI
         ai_bio = _generate_director_bio_with_ai(director_name, language)
         
+        if not ai_bio:
+            # Não salva a biografia genérica; tenta de novo depois do backoff
+            record_missing("director", director_name)
+            return _fallback_director(director_name, language), 200
+        
         # Tenta buscar foto do IMDB se temos o tconst
         imdb_photo = None
         if movie_tconst:
             imdb_photo = _get_director_photo_from_imdb(director_name, movie_tconst)
         
-        basic_data = {
-            "name": director_name,
-            "bio": ai_bio,
-            "photo": imdb_photo
-        }
-        
         # Salva dados gerados pela IA no banco
-        result = collection.insert_one(basic_data)
-        basic_data["_id"] = str(result.inserted_id)
-        return basic_data, 200
+        director = _save_director(director_name, _ai_director(director_name, ai_bio, imdb_photo))
+        clear_missing("director", director_name)
+        return director, 200
         
     except Exception as e:
         return {"error": "Erro ao buscar informações do diretor"}, 500
 
 
+def _ai_director(director_name, ai_bio, imdb_photo=None):
+    """Diretor criado a partir da biografia gerada pela OpenAI"""
+    return {
+        "name": director_name,
+        "bio": ai_bio,
+        "photo": imdb_photo
+    }
+
+
+def _fallback_director(director_name, language="pt"):
+    """Dados básicos do diretor quando não foi possível gerar a biografia"""
+    if language == "en":
+        bio = f"Film director known for {director_name}. A filmmaker who contributed significantly to the art of cinema with their unique style and creative vision."
+    else:
+        bio = f"Diretor de cinema conhecido por {director_name}. Um cineasta que contribuiu significativamente para a arte cinematográfica com seu estilo único e visão criativa."
+    
+    return {
+        "name": director_name,
+        "bio": bio,
+        "photo": None,
+        "fallback": True
+    }
+
+
+def _default_director_bio(director_name, language="pt"):
+    """Biografia curta usada quando não há OpenAI configurada"""
+    if language == "en":
+        return f"Film director known for {director_name}."
+    return f"Diretor de cinema conhecido por {director_name}."
+
+
 def _get_multiple_directors_info(directors_string, movie_tconst=None, language="pt"):
     """Busca informações para múltiplos diretores"""
     try:
-        # Separa os diretores por vírgula e remove espaços extras
-        director_names = [name.strip() for name in directors_string.split(',')]
-        
-        directors_info = []
+        director_names = _split_director_names(directors_string)
+        
+        # Uma única consulta para todos os diretores já salvos
+        saved_directors = _find_directors(director_names)
+        
+        # Busca informações de cada diretor em paralelo, no pool próprio e com prazo compartilhado
+        results, _ = run_parallel(
+            {
+                index: partial(
+                    _resolve_director_info, director_name, saved_directors.get(director_name), movie_tconst, language
+                )
+                for index, director_name in enumerate(director_names)
+            },
+            timeout=DIRECTORS_LOOKUP_TIMEOUT,
+            executor=_directors_executor
+        )
         
-        for director_name in director_names:
-            if director_name:  # Verifica se o nome não está vazio
-                # Busca informações para cada diretor individualmente
-                director_info, status_code = get_director_info(director_name, movie_tconst, language)
-                
-                if status_code == 200 and director_info:
-                    directors_info.append(director_info)
-                else:
-                    # Se não encontrou informações, cria um diretor básico
-                    basic_director = {
-                        "name": director_name,
-                        "bio": f"Diretor de cinema conhecido por {director_name}." if language == "pt" else f"Film director known for {director_name}.",
-                        "photo": None
-                    }
-                    directors_info.append(basic_director)
-        
-        # Retorna informações combinadas de todos os diretores
-        if directors_info:
-            combined_info = {
-                "name": directors_string,  # Nome completo com todos os diretores
-                "bio": _create_combined_directors_bio(directors_info, language),
-                "photo": directors_info[0].get("photo") if directors_info else None,  # Usa a foto do primeiro diretor
-                "directors": directors_info  # Lista de todos os diretores individuais
-            }
-            return combined_info, 200
-        else:
-            return {"error": "Nenhum diretor encontrado"}, 404
+        return _combine_directors_info(directors_string, director_names, results, language)
             
     except Exception as e:
         return {"error": "Erro ao buscar informações dos diretores"}, 500
 
 
+def _split_director_names(directors_string):
+    """Separa os diretores por vírgula e remove espaços extras"""
+    return [name.strip() for name in directors_string.split(',') if name.strip()]
+
+
+def _combine_directors_info(directors_string, director_names, results, language="pt"):
+    """Resposta com todos os diretores a partir dos resultados ({índice: (dados, status)})"""
+    directors_info = []
+    
+    for index, director_name in enumerate(director_names):
+        director_info, status_code = results.get(index) or (None, None)
+        
+        if status_code == 200 and director_info:
+            directors_info.append(director_info)
+        else:
+            # Se não encontrou informações (ou estourou o prazo), cria um diretor básico
+            basic_director = {
+                "name": director_name,
+                "bio": f"Diretor de cinema conhecido por {director_name}." if language == "pt" else f"Film director known for {director_name}.",
+                "photo": None
+            }
+            directors_info.append(basic_director)
+    
+    # Retorna informações combinadas de todos os diretores
+    if directors_info:
+        combined_info = {
+            "name": directors_string,  # Nome completo com todos os diretores
+            "bio": _create_combined_directors_bio(directors_info, language),
+            "photo": directors_info[0].get("photo") if directors_info else None,  # Usa a foto do primeiro diretor
+            "directors": directors_info  # Lista de todos os diretores individuais
+        }
+        return combined_info, 200
+    else:
+        return {"error": "Nenhum diretor encontrado"}, 404
+
+
+def _get_director_photo_from_imdb(director_name, movie_tconst):
+    """Busca a foto do diretor do IMDB usando o tconst do filme"""
+    try:
+        # Primeiro, busca o ID do diretor na página do filme
+        movie_page = guarded_call("imdb", _fetch_imdb_page, _imdb_title_url(movie_tconst))
+        director_id = _parse_director_id(movie_page, director_name)
+        
+        if not director_id:
+            return None
+        
+        # Agora busca a foto diretamente da página do diretor
+        director_page = guarded_call("imdb", _fetch_imdb_page, _imdb_name_url(director_id))
+        return _parse_director_photo(director_page)
+        
+    except Exception as e:
+        return None
+
+
+def _generate_director_bio_with_ai(director_name, language="pt"):
+    """Gera uma biografia rica do diretor usando OpenAI"""
+    if not OPENAI_API_KEY:
+        return _default_director_bio(director_name, language)
+    
+    try:
+        return chat_completion(_director_bio_request(director_name, language))
+    except Exception as e:
+        # Quem chama usa _fallback_director e registra no cache negativo
+        return None
+
+
 def _create_combined_directors_bio(directors_info, language="pt"):
     """Cria uma biografia combinada para múltiplos diretores"""
     try:
@@ -177,8 +297,9 @@ def _fetch_director_from_tmdb(director_name, language="pt"):
             "language": tmdb_language
         }
         
-        response = requests.get(search_url, params=params, timeout=3)
-        response.raise_for_status()
+        with span("tmdb", "search_person"):
+            response = get_http_session().get(search_url, params=params, timeout=3)
+            response.raise_for_status()
         
         data = response.json()
         
@@ -193,8 +314,9 @@ def _fetch_director_from_tmdb(director_name, language="pt"):
                 "language": tmdb_language
             }
             
-            details_response = requests.get(details_url, params=details_params, timeout=3)
-            details_response.raise_for_status()
+            with span("tmdb", "person_details"):
+                details_response = get_http_session().get(details_url, params=details_params, timeout=3)
+                details_response.raise_for_status()
             
             details_data = details_response.json()
             
@@ -217,211 +339,138 @@ def _fetch_director_from_tmdb(director_name, language="pt"):
         return None
 
 
-def get_all_directors():
-    """Retorna todos os diretores salvos no banco"""
+def get_all_directors(since=None, stream=False):
+    """Retorna todos os diretores salvos no banco (ou só os alterados depois de `since`)"""
     collection = get_mongo_collection("directors")
+    filters = since_filter(since)
     
     try:
-        directors = list(collection.find({}, {"_id": 0}))
+        if stream:
+            return ndjson_response(collection, filters, {"_id": 0})
+
+        with span("mongo", "directors.find"):
+            directors = list(collection.find(filters, {"_id": 0}))
         return {"directors": directors}, 200
     except Exception as e:
         return {"error": "Erro ao buscar diretores"}, 500
 
 
-def _get_director_photo_from_imdb(director_name, movie_tconst):
-    """Busca a foto do diretor do IMDB usando o tconst do filme"""
-    try:
-        # Primeiro, busca o ID do diretor na página do filme
-        director_id = _get_director_id_from_movie_page(director_name, movie_tconst)
-        
-        if not director_id:
-            return None
-        
-        # Agora busca a foto diretamente da página do diretor
-        return _get_director_photo_from_director_page(director_id)
-        
-    except Exception as e:
-        return None
+def _parse_director_id(html, director_name):
+    """Extrai o ID do diretor (ex: nm0000419) do HTML da página do filme"""
+    # Padrão: <a href="/name/nm0000419/?ref_=tt_ov_1_1">Jean-Luc Godard</a>
+    director_link_pattern = rf'<a[^>]*href="/name/(nm\d+)/[^"]*"[^>]*>{re.escape(director_name)}</a>'
+    match = re.search(director_link_pattern, html, re.IGNORECASE)
+    
+    if match:
+        return match.group(1)
+    
+    return None
 
 
-def _get_director_id_from_movie_page(director_name, movie_tconst):
-    """Extrai o ID do diretor da página do filme no IMDB"""
-    try:
-        # Constrói a URL da página do filme no IMDB
-        imdb_url = f"https://www.imdb.com/title/{movie_tconst}/"
-        
-        # Faz a requisição para a página do filme
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(imdb_url, headers=headers, timeout=3)
-        response.raise_for_status()
-        
-        import re
-        
-        # Procura pelo link do diretor na página do filme
-        # Padrão: <a href="/name/nm0000419/?ref_=tt_ov_1_1">Jean-Luc Godard</a>
-        director_link_pattern = rf'<a[^>]*href="/name/(nm\d+)/[^"]*"[^>]*>{re.escape(director_name)}</a>'
-        match = re.search(director_link_pattern, response.text, re.IGNORECASE)
-        
-        if match:
-            return match.group(1)  # Retorna o ID (ex: nm0000419)
-        
-        return None
-        
-    except requests.RequestException as e:
-        return None
-    except Exception as e:
-        return None
+def _parse_director_photo(html):
+    """Extrai a foto principal do HTML da página do diretor"""
+    # Padrão comum: https://m.media-amazon.com/images/M/[ID]_V1_UX[WIDTH]_CR0,0,[WIDTH],[HEIGHT]_AL_.jpg
+    photo_patterns = [
+        r'https://m\.media-amazon\.com/images/M/[^"]*_V1_UX\d+_CR0,0,\d+,\d+_AL_\.jpg',
+        r'https://m\.media-amazon\.com/images/M/[^"]*\.jpg'
+    ]
+    
+    for pattern in photo_patterns:
+        matches = re.findall(pattern, html)
+        if matches:
+            # Retorna a primeira imagem encontrada (geralmente a principal)
+            return matches[0]
+    
+    return None
 
 
-def _get_director_photo_from_director_page(director_id):
-    """Busca a foto do diretor diretamente da página do diretor no IMDB"""
-    try:
-        # Constrói a URL da página do diretor no IMDB
-        director_url = f"https://www.imdb.com/name/{director_id}/"
-        
-        # Faz a requisição para a página do diretor
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(director_url, headers=headers, timeout=3)
-        response.raise_for_status()
-        
-        import re
-        
-        # Procura pela foto principal do diretor na página
-        # Padrão comum: https://m.media-amazon.com/images/M/[ID]_V1_UX[WIDTH]_CR0,0,[WIDTH],[HEIGHT]_AL_.jpg
-        photo_patterns = [
-            r'https://m\.media-amazon\.com/images/M/[^"]*_V1_UX\d+_CR0,0,\d+,\d+_AL_\.jpg',
-            r'https://m\.media-amazon\.com/images/M/[^"]*\.jpg'
-        ]
-        
-        for pattern in photo_patterns:
-            matches = re.findall(pattern, response.text)
-            if matches:
-                # Retorna a primeira imagem encontrada (geralmente a principal)
-                return matches[0]
-        
-        return None
-        
-    except requests.RequestException as e:
-        return None
-    except Exception as e:
-        return None
+def _imdb_title_url(movie_tconst):
+    return f"https://www.imdb.com/title/{movie_tconst}/"
 
 
-def _generate_director_bio_with_ai(director_name, language="pt"):
-    """Gera uma biografia rica do diretor usando OpenAI"""
-    try:
-        if not OPENAI_API_KEY:
-            if language == "en":
-                return f"Film director known for {director_name}."
-            return f"Diretor de cinema conhecido por {director_name}."
-        
-        # Configura a API da OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        if language == "en":
-            prompt = f"""
-            Write a rich and detailed biography about film director {director_name}. 
-            The biography should be similar to Shazam's style for musical artists - engaging, 
-            informative and highlighting the importance and contributions of the director to cinema.
-            
-            Include:
-            - Unique cinematic style
-            - Most important and influential films
-            - Innovative techniques or distinctive characteristics
-            - Impact on the film industry
-            - Important awards or recognitions
-            - Influences and legacy
-            
-            The biography should be between 150-250 words, be in English, 
-            and have a respectful and informative tone, similar to what you see on platforms 
-            like Shazam for musical artists.
-            
-            If you don't know specific information about the director, be honest but 
-            maintain a positive tone about their contribution to cinema.
-            """
-        else:
-            prompt = f"""
-            Escreva uma biografia rica e detalhada sobre o diretor de cinema {director_name}. 
-            A biografia deve ser similar ao estilo do Shazam para artistas musicais - envolvente, 
-            informativa e que destaque a importância e contribuições do diretor para o cinema.
-            
-            Inclua:
-            - Estilo cinematográfico único
-            - Filmes mais importantes e influentes
-            - Técnicas inovadoras ou características marcantes
-            - Impacto na indústria cinematográfica
-            - Prêmios ou reconhecimentos importantes
-            - Influências e legado
-            
-            A biografia deve ter entre 150-250 palavras, ser em português brasileiro, 
-            e ter um tom respeitoso e informativo, similar ao que se vê em plataformas 
-            como Shazam para artistas musicais.
-            
-            Se não souber informações específicas sobre o diretor, seja honesto mas 
-            mantenha um tom positivo sobre sua contribuição para o cinema.
-            """
-        
-        system_message = "You are a cinema expert and write engaging biographies about film directors." if language == "en" else "Você é um especialista em cinema e escreve biografias envolventes sobre diretores de cinema."
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,  # Reduzido para resposta mais rápida
-            temperature=0.7,
-            timeout=5  # Timeout de 5 segundos
-        )
-        
-        bio = response.choices[0].message.content.strip()
-        return bio
-        
-    except Exception as e:
-        if language == "en":
-            return f"Film director known for {director_name}. A filmmaker who contributed significantly to the art of cinema with their unique style and creative vision."
-        return f"Diretor de cinema conhecido por {director_name}. Um cineasta que contribuiu significativamente para a arte cinematográfica com seu estilo único e visão criativa."
+def _imdb_name_url(director_id):
+    return f"https://www.imdb.com/name/{director_id}/"
 
 
-def _translate_director_bio(bio, language):
-    """Traduz a biografia do diretor para o idioma solicitado"""
-    try:
-        if not OPENAI_API_KEY or language == "pt":
-            return bio
-        
-        # Configura a API da OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
+def _director_bio_request(director_name, language="pt"):
+    """Parâmetros da chamada à OpenAI que gera a biografia do diretor"""
+    if language == "en":
         prompt = f"""
-        Translate the following film director biography to English. 
-        Maintain the same style, tone, and level of detail. 
-        Keep it engaging and informative, similar to Shazam's style for musical artists.
-        
-        Biography to translate:
-        {bio}
+        Write a rich and detailed biography about film director {director_name}. 
+        The biography should be similar to Shazam's style for musical artists - engaging, 
+        informative and highlighting the importance and contributions of the director to cinema.
+        
+        Include:
+        - Unique cinematic style
+        - Most important and influential films
+        - Innovative techniques or distinctive characteristics
+        - Impact on the film industry
+        - Important awards or recognitions
+        - Influences and legacy
+        
+        The biography should be between 150-250 words, be in English, 
+        and have a respectful and informative tone, similar to what you see on platforms 
+        like Shazam for musical artists.
+        
+        If you don't know specific information about the director, be honest but 
+        maintain a positive tone about their contribution to cinema.
         """
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional translator specializing in film and entertainment content."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.3
-        )
-        
-        translated_bio = response.choices[0].message.content.strip()
-        return translated_bio
-        
-    except Exception as e:
-        return bio  # Retorna a biografia original em caso de erro
+    else:
+        prompt = f"""
+        Escreva uma biografia rica e detalhada sobre o diretor de cinema {director_name}. 
+        A biografia deve ser similar ao estilo do Shazam para artistas musicais - envolvente, 
+        informativa e que destaque a importância e contribuições do diretor para o cinema.
+        
+        Inclua:
+        - Estilo cinematográfico único
+        - Filmes mais importantes e influentes
+        - Técnicas inovadoras ou características marcantes
+        - Impacto na indústria cinematográfica
+        - Prêmios ou reconhecimentos importantes
+        - Influências e legado
+        
+        A biografia deve ter entre 150-250 palavras, ser em português brasileiro, 
+        e ter um tom respeitoso e informativo, similar ao que se vê em plataformas 
+        como Shazam para artistas musicais.
+        
+        Se não souber informações específicas sobre o diretor, seja honesto mas 
+        mantenha um tom positivo sobre sua contribuição para o cinema.
+        """
+    
+    system_message = "You are a cinema expert and write engaging biographies about film directors." if language == "en" else "Você é um especialista em cinema e escreve biografias envolventes sobre diretores de cinema."
+    
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 300,  # Reduzido para resposta mais rápida
+        "temperature": 0.7,
+        "timeout": 5  # Timeout de 5 segundos
+    }
+
+
+def _bio_translation_request(bio):
+    """Parâmetros da chamada à OpenAI que traduz a biografia"""
+    prompt = f"""
+    Translate the following film director biography to English. 
+    Maintain the same style, tone, and level of detail. 
+    Keep it engaging and informative, similar to Shazam's style for musical artists.
+    
+    Biography to translate:
+    {bio}
+    """
+    
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are a professional translator specializing in film and entertainment content."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 400,
+        "temperature": 0.3
+    }
 
 
 def delete_director(director_name):
@@ -437,3 +486,49 @@ def delete_director(director_name):
             return {"message": f"Diretor {director_name} não encontrado"}, 404
     except Exception as e:
         return {"error": "Erro ao deletar diretor"}, 500
+
+
+# Acesso ao MongoDB e ao IMDB (o async_controller reaproveita o MongoDB numa thread)
+def _find_director(director_name):
+    """Diretor salvo no MongoDB"""
+    with span("mongo", "directors.find_one"):
+        return get_mongo_collection("directors").find_one({"name": director_name})
+
+
+def _find_directors(director_names):
+    """Diretores já salvos, por nome"""
+    with span("mongo", "directors.find"):
+        return {
+            director["name"]: director
+            for director in get_mongo_collection("directors").find({"name": {"$in": director_names}})
+        }
+
+
+def _set_director_photo(director_name, photo):
+    """Atualiza a foto do diretor no banco"""
+    with span("mongo", "directors.update_one"):
+        get_mongo_collection("directors").update_one(
+            {"name": director_name},
+            {"$set": {"photo": photo, "updated_at": datetime.utcnow()}}
+        )
+
+
+def _save_director(director_name, director_data):
+    """Salva o diretor uma única vez; se outro processo salvou antes, retorna o existente"""
+    now = datetime.utcnow()
+    with span("mongo", "directors.find_one_and_update"):
+        director_data = get_mongo_collection("directors").find_one_and_update(
+            {"name": director_name},
+            {"$setOnInsert": {**director_data, "name": director_name, "created_at": now, "updated_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    director_data["_id"] = str(director_data["_id"])
+    return director_data
+
+
+def _fetch_imdb_page(url):
+    """Baixa uma página do IMDB (429/5xx contam como falha do provedor)"""
+    response = get_http_session().get(url, headers=IMDB_HEADERS, timeout=3)
+    response.raise_for_status()
+    return response.text
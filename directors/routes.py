@@ -6,6 +6,9 @@ from directors.controller import (
     get_all_directors,
     delete_director,
 )
+from utils.export import parse_since, wants_ndjson
+from config import HTTP_CACHE_POLICIES
+from utils.http_cache import conditional_get
 
 directors_bp = Blueprint("directors", __name__)
 api = Namespace("directors", description="Operações relacionadas aos diretores")
@@ -42,6 +45,7 @@ class DirectorItem(Resource):
     @api.doc("get_director_info")
     @api.response(200, "Informações do diretor")
     @api.response(500, "Erro ao buscar informações do diretor")
+    @conditional_get(**HTTP_CACHE_POLICIES["directors"])
     def get(self, director_name):
         """Retorna informações de um diretor específico"""
         # Pega o parâmetro tconst da query string se disponível
@@ -62,11 +66,21 @@ class DirectorItem(Resource):
 
 @api.route("/all")
 class AllDirectors(Resource):
-    @api.doc("get_all_directors")
+    @api.doc(
+        "get_all_directors",
+        params={
+            "since": "Exporta apenas documentos criados/alterados depois desta data ISO 8601 (ou ObjectId)",
+            "format": "ndjson para exportar em streaming, um documento por linha",
+        },
+    )
     @api.response(200, "Lista de todos os diretores")
     def get(self):
         """Retorna todos os diretores salvos no banco"""
-        return get_all_directors()
+        try:
+            since = parse_since(request.args.get("since"))
+        except ValueError:
+            return {"error": "Parâmetro since inválido"}, 400
+        return get_all_directors(since, wants_ndjson(request.args, request.headers))
 
 
 directors_bp.api = api
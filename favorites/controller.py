@@ -1,7 +1,54 @@
+import json
 import math
-from config import get_mongo_collection
+from config import get_mongo_collection, FAVORITES_FACETS_TTL
+from utils.cache import TTLCache
+from utils.metrics import register_cache
+from utils.pagination import paginate_by_cursor, InvalidCursor
 
-def get_favorited_movies(filters={}, sorters=["_id", -1], page=1, page_size=10, search_term=""):
+# Facetas (países, anos) e totais por filtro; são as mesmas em todas as páginas da listagem.
+# O cache é por processo, sem invalidação: alterações em favoritelist aparecem em até
+# FAVORITES_FACETS_TTL segundos em todos os workers
+_favorites_cache = TTLCache(max_size=256, ttl_seconds=FAVORITES_FACETS_TTL)
+register_cache("favorites_facets", _favorites_cache)
+_FACETS_KEY = "facets"
+
+
+def _get_facets(collection):
+    """Países e anos disponíveis, calculados uma vez e reaproveitados"""
+    facets = _favorites_cache.get(_FACETS_KEY)
+    if facets is not None:
+        return facets
+    
+    try:
+        countries = collection.distinct("country")
+    except Exception:
+        countries = []
+    
+    try:
+        years = sorted([
+            int(year) for year in collection.distinct("startYear") 
+            if year is not None and str(year).isdigit()
+        ])
+    except Exception:
+        years = []
+    
+    facets = {"countries": countries, "years": years}
+    _favorites_cache.set(_FACETS_KEY, facets)
+    return facets
+
+
+def _count_documents(collection, search_filters):
+    """Total de documentos do filtro, em cache junto com as facetas"""
+    count_key = "count:" + json.dumps(search_filters, sort_keys=True, default=str)
+    total_documents = _favorites_cache.get(count_key)
+    
+    if total_documents is None:
+        total_documents = collection.count_documents(search_filters)
+        _favorites_cache.set(count_key, total_documents)
+    
+    return total_documents
+
+def get_favorited_movies(filters={}, sorters=["_id", -1], page=1, page_size=10, search_term="", cursor=None, count="exact"):
     try:
         collection = get_mongo_collection("favoritelist")
         
@@ -24,44 +71,31 @@ def get_favorited_movies(filters={}, sorters=["_id", -1], page=1, page_size=10,
                 {"director": {"$regex": search_term, "$options": "i"}},
             ]
 
-        total_documents = collection.count_documents(search_filters)
+        if cursor is not None:
+            return _get_favorited_movies_page_by_cursor(
+                collection, search_filters, sorters, page_size, cursor, count
+            )
+
+        total_documents = _count_documents(collection, search_filters)
         skip = (page - 1) * page_size
 
-        cursor = collection.find(search_filters)
+        query = collection.find(search_filters)
         
         if sorters:
-            cursor = cursor.sort(sorters[0], sorters[1])
-        
-        cursor = cursor.skip(skip).limit(page_size)
-        items = list(cursor)
-
-        for item in items:
-            item["_id"] = str(item["_id"])
-            if "startYear" in item and item["startYear"]:
-                try:
-                    item["startYear"] = int(item["startYear"])
-                except (ValueError, TypeError):
-                    # Se não conseguir converter, mantém o valor original
-                    pass
-
-        try:
-            countries = collection.distinct("country")
-        except Exception:
-            countries = []
+            query = query.sort(sorters[0], sorters[1])
         
-        try:
-            years = sorted([
-                int(year) for year in collection.distinct("startYear") 
-                if year is not None and str(year).isdigit()
-            ])
-        except Exception:
-            years = []
+        query = query.skip(skip).limit(page_size)
+        items = list(query)
+
+        _format_items(items)
+
+        facets = _get_facets(collection)
 
         response = {
             "total_documents": total_documents,
             "entries": items,
-            "countries": countries,
-            "years": years,
+            "countries": facets["countries"],
+            "years": facets["years"],
             "current_page": page,
             "total_pages": math.ceil(total_documents / page_size),
             "page_size": page_size
@@ -69,9 +103,46 @@ def get_favorited_movies(filters={}, sorters=["_id", -1], page=1, page_size=10,
 
         return response, 200 if items else 404
 
+    except InvalidCursor as e:
+        return {"status": 400, "message": str(e)}, 400
+
     except Exception as e:
         return {
             "status": 500,
             "message": "Erro interno do servidor",
             "error": str(e)
-        }, 500 
\ No newline at end of file
+        }, 500
+
+
+def _get_favorited_movies_page_by_cursor(collection, search_filters, sorters, page_size, cursor, count):
+    """Página da listagem de favoritos usando cursor em vez de skip"""
+    sort = [(sorters[0], sorters[1])] if sorters else [("_id", -1)]
+    if sort[-1][0] != "_id":
+        # Desempate para que o cursor seja único
+        sort.append(("_id", sort[0][1]))
+
+    if count == "exact":
+        # Reaproveita o total em cache da paginação por página
+        result = paginate_by_cursor(collection, search_filters, sort, page_size, cursor, "none")
+        result["total_documents"] = _count_documents(collection, search_filters)
+    else:
+        result = paginate_by_cursor(collection, search_filters, sort, page_size, cursor, count)
+
+    _format_items(result["entries"])
+
+    facets = _get_facets(collection)
+    result["countries"] = facets["countries"]
+    result["years"] = facets["years"]
+
+    return result, 200 if result["entries"] else 404
+
+
+def _format_items(items):
+    """Converte startYear para inteiro"""
+    for item in items:
+        if "startYear" in item and item["startYear"]:
+            try:
+                item["startYear"] = int(item["startYear"])
+            except (ValueError, TypeError):
+                # Se não conseguir converter, mantém o valor original
+                pass 
\ No newline at end of file
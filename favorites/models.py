@@ -13,4 +13,7 @@ favorite_search_model = {
     "page": fields.Integer(description="Número da página", default=1),
     "page_size": fields.Integer(description="Tamanho da página", default=10),
     "search_term": fields.String(description="Termo de busca", default=""),
+    "pagination": fields.String(description="Use 'cursor' para paginação por cursor"),
+    "cursor": fields.String(description="Cursor retornado em next_cursor"),
+    "count": fields.String(description="Total no modo cursor: exact, estimated ou none", default="exact"),
 } 
\ No newline at end of file
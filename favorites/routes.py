@@ -1,9 +1,8 @@
 from flask import Blueprint, request
 from flask_restx import Namespace, Resource
 from favorites.models import favorite_movie_model, favorite_search_model
-from favorites.controller import (
-    get_favorited_movies
-)
+from favorites.controller import get_favorited_movies
+from utils.pagination import requested_cursor
 
 favorites_bp = Blueprint("favorites", __name__)
 api = Namespace("favorites", description="Operações relacionadas aos filmes favoritos")
@@ -36,7 +35,9 @@ class FavoriteMovieSearch(Resource):
                 filters=filters,
                 page=page,
                 page_size=page_size,
-                search_term=search_term
+                search_term=search_term,
+                cursor=requested_cursor(request_data),
+                count=request_data.get("count", "exact")
             )
 
             return result, status_code
@@ -46,4 +47,5 @@ class FavoriteMovieSearch(Resource):
                 "status": 500,
                 "message": "Erro interno do servidor",
                 "error": str(e)
-            }, 500 
\ No newline at end of file
+            }, 500
+
@@ -1,4 +1,14 @@
 from config import get_mongo_collection
+from utils.indexes import BLOGPOST_CONTENT_LANGUAGES
+from utils.pagination import paginate_by_cursor, requested_cursor, InvalidCursor
+from utils.text import highlight_snippet, query_terms
+
+# Campos longos servidos pelo índice de texto em vez de $regex
+TEXT_SEARCH_FIELDS = ["title", "introduction", "historical_context",
+                      "cultural_importance", "technical_analysis", "conclusion"]
+# Campos curtos que continuam aceitando busca parcial
+REGEX_FIELDS = ["tconst", "primaryTitle"]
+MAX_SNIPPETS = 3
 
 
 def search_blog_post(request_data):
@@ -6,21 +16,29 @@ def search_blog_post(request_data):
     filters = request_data.get("filters", {})
     page = request_data.get("page", 1)
     page_size = request_data.get("page_size", 10)
+    cursor = requested_cursor(request_data)
 
     try:
         collection = get_mongo_collection("blogposts")
         
         # Construir filtros de busca
-        search_filters = {}
-        text_fields = ["tconst", "primaryTitle", "title", "introduction", 
-                      "historical_context", "cultural_importance", 
-                      "technical_analysis", "conclusion"]
-        
-        for key, value in filters.items():
-            if key in text_fields and isinstance(value, str):
-                search_filters[key] = {"$regex": value, "$options": "i"}
-            else:
-                search_filters[key] = value
+        search_filters, text_search, filter_phrases = _build_search_filters(filters, request_data.get("query"))
+
+        if text_search:
+            return _search_by_relevance(collection, search_filters, text_search, page, page_size)
+
+        if filter_phrases:
+            result = _search_by_relevance(collection, search_filters, filter_phrases, page, page_size)
+            if result[0]["total_documents"] > 0:
+                return result
+            # Nenhuma palavra inteira encontrada (ex.: "Godar"): busca parcial só pelo $regex
+
+        if cursor is not None:
+            result = paginate_by_cursor(
+                collection, search_filters, [("_id", -1)], page_size, cursor,
+                request_data.get("count", "estimated")
+            )
+            return result, 200 if result["entries"] else 404
 
         # Contar total de documentos
         total_documents = collection.count_documents(search_filters)
@@ -34,18 +52,96 @@ def search_blog_post(request_data):
             .limit(page_size)
         )
 
-        # Processar documentos
-        for post in posts:
-            post["_id"] = str(post["_id"])
-
         return {
             "total_documents": total_documents,
             "entries": posts if posts else []
         }, 200 if total_documents > 0 else 404
 
+    except InvalidCursor as e:
+        return {"status": 400, "message": str(e)}, 400
     except Exception as e:
         return {"status": 500, "message": str(e)}, 500
 
+def _build_search_filters(filters, query=None):
+    """
+    Separa os filtros em consulta Mongo, texto da busca (query) e frases dos filtros.
+    Filtros nos campos longos ficam restritos ao próprio campo por um $regex (na raiz ou em
+    content.<idioma>). Sem query, as frases servem de pré-filtro pelo índice de texto; como o
+    $text só encontra palavras inteiras, quem chama volta ao $regex puro se nada for encontrado.
+    """
+    search_filters = {}
+    field_clauses = []
+    phrases = []
+    text_search = query.strip() if isinstance(query, str) else ""
+
+    for key, value in filters.items():
+        if key in TEXT_SEARCH_FIELDS and isinstance(value, str):
+            if value.strip():
+                phrases.append('"%s"' % value.replace('"', " ").strip())
+                regex = {"$regex": value, "$options": "i"}
+                field_clauses.append({"$or": [{path: regex} for path in _field_paths(key)]})
+        elif key in REGEX_FIELDS and isinstance(value, str):
+            search_filters[key] = {"$regex": value, "$options": "i"}
+        else:
+            search_filters[key] = value
+
+    if field_clauses:
+        search_filters["$and"] = field_clauses
+
+    return search_filters, text_search, " ".join(phrases)
+
+def _field_paths(field):
+    """Caminhos de um campo do post: na raiz e no conteúdo de cada idioma"""
+    return [field] + [f"content.{language}.{field}" for language in BLOGPOST_CONTENT_LANGUAGES]
+
+def _search_by_relevance(collection, search_filters, text_search, page, page_size):
+    """Busca pelo índice de texto, ordenada por relevância e com trechos destacados"""
+    query = dict(search_filters, **{"$text": {"$search": text_search}})
+    score = {"score": {"$meta": "textScore"}}
+
+    total_documents = collection.count_documents(query)
+
+    skip = (page - 1) * page_size
+    posts = list(
+        collection.find(query, score)
+        .sort([("score", {"$meta": "textScore"}), ("_id", -1)])
+        .skip(skip)
+        .limit(page_size)
+    )
+
+    terms = query_terms(text_search.replace('"', " "))
+    for post in posts:
+        post["highlights"] = _build_highlights(post, terms)
+
+    return {
+        "total_documents": total_documents,
+        "entries": posts
+    }, 200 if total_documents > 0 else 404
+
+def _build_highlights(post, terms):
+    """Trechos com os termos encontrados, por campo (caminhos com ponto para conteúdo aninhado)"""
+    highlights = {}
+    for path, text in _iter_text_fields(post):
+        snippet = highlight_snippet(text, terms)
+        if snippet:
+            highlights[path] = snippet
+            if len(highlights) >= MAX_SNIPPETS:
+                break
+    return highlights
+
+def _iter_text_fields(value, prefix=""):
+    """Percorre os textos do documento na ordem dos campos"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("_id", "score", "tconst", "images", "poster_url", "references", "soundtrack"):
+                continue
+            yield from _iter_text_fields(item, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _iter_text_fields(item, f"{prefix}.{index}")
+    elif isinstance(value, str) and prefix:
+        yield prefix, value
+
 def get_blog_post(tconst):
     """Recupera um post específico do blog"""
     try:
@@ -1,9 +1,13 @@
 from flask_restx import fields
 
 blogpost_search_model = {
+    "query": fields.String(description="Busca textual, ordenada por relevância e com trechos destacados"),
     "filters": fields.Raw(description="Filtros para a busca"),
     "page": fields.Integer(description="Número da página", default=1),
     "page_size": fields.Integer(description="Tamanho da página", default=10),
+    "pagination": fields.String(description="Use 'cursor' para paginação por cursor"),
+    "cursor": fields.String(description="Cursor retornado em next_cursor"),
+    "count": fields.String(description="Total no modo cursor: exact, estimated ou none", default="estimated"),
 }
 
 blogpost_model = {
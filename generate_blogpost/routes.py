@@ -6,6 +6,8 @@ from generate_blogpost.controller import (
     search_blog_post,
     get_blog_post
 )
+from config import HTTP_CACHE_POLICIES
+from utils.http_cache import conditional_get
 
 generate_blogpost_bp = Blueprint("generate_blogpost", __name__)
 api = Namespace(
@@ -36,6 +38,7 @@ class BlogPost(Resource):
     @api.doc("get_blog_post")
     @api.response(200, "Sucesso")
     @api.response(404, "Post não encontrado")
+    @conditional_get(**HTTP_CACHE_POLICIES["blogposts"])
     def get(self, tconst):
         """Recupera um post do blog específico"""
         return get_blog_post(tconst)
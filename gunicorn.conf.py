@@ -0,0 +1,58 @@
+# Configuração do Gunicorn (carregada automaticamente a partir da raiz do projeto)
+#   WSGI: gunicorn app:app
+#   ASGI: gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+import multiprocessing
+import os
+
+from config import MOVIE_DETAIL_BUILD_TIMEOUT, PREPOPULATE_MOVIE_TIMEOUT
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+
+# As requisições passam a maior parte do tempo esperando MongoDB, OpenAI, Spotify, IMDB e S3:
+# gthread atende várias por processo sem exigir monkey patching (gevent também funciona,
+# com GUNICORN_WORKER_CLASS=gevent, se o gevent estiver instalado)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+# Cada processo tem seu próprio índice de busca e caches em memória; por isso poucos
+# processos (um por CPU) e mais threads por processo
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 200))
+
+# Importa a aplicação (e cria os índices do MongoDB) uma vez no processo mestre;
+# os workers herdam a memória por copy-on-write e recriam as conexões em post_fork
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Acima do prazo mais longo de uma requisição (pré-população de um filme, com as chamadas
+# ao GPT) para que nenhum worker seja encerrado no meio de uma resposta
+_longest_deadline = max(MOVIE_DETAIL_BUILD_TIMEOUT, PREPOPULATE_MOVIE_TIMEOUT)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", _longest_deadline + 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", _longest_deadline + 15))
+
+# Maior que o tempo ocioso do balanceador (60 s em geral), para que ele não reutilize
+# uma conexão que o gunicorn acabou de fechar
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 75))
+
+# Reciclagem periódica dos workers; o jitter evita que todos reiniciem ao mesmo tempo
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """O MongoClient e os pools HTTP não podem ser compartilhados entre processos"""
+    import config
+    from utils.clients import reset_clients
+
+    config.reset_mongo_client()
+    reset_clients()
+
+
+def worker_exit(server, worker):
+    """Jobs de pré-população deste worker são marcados como falhos (e podem ser retomados)"""
+    from movie_prepopulate.jobs import stop_running_jobs
+
+    stop_running_jobs()
@@ -0,0 +1,10 @@
+# Imagens dos filmes para o modo ASGI (asgi.py): o S3 (boto3) e o MongoDB só têm clientes síncronos
+# aqui, então a função do controller.py roda inteira numa thread, com os mesmos caches
+import asyncio
+
+from images.controller import get_all_image_urls
+
+
+async def get_all_image_urls_async(bucket_name, tconst, refresh=False):
+    """Retorna todas as URLs de imagens associadas a um post"""
+    return await asyncio.to_thread(get_all_image_urls, bucket_name, tconst, refresh)
@@ -1,98 +1,309 @@
-from config import get_mongo_collection, BUCKET_NAME
-import boto3
-from botocore.exceptions import ClientError
+from config import (
+    get_mongo_collection,
+    BUCKET_NAME,
+    S3_REGION,
+    IMAGE_MANIFEST_CHECK_SECONDS,
+    IMAGE_MANIFEST_MEMORY_CACHE_SIZE,
+    IMAGE_MANIFEST_REFRESH_WORKERS,
+    IMAGE_TAG_FETCH_WORKERS,
+    IMAGE_SUBTITLE_TTL_SECONDS,
+)
+from botocore.exceptions import BotoCoreError, ClientError
+from pymongo.errors import PyMongoError
+import concurrent.futures
 import logging
-from config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY
+import threading
+from datetime import datetime, timedelta, timezone
 
+from utils.cache import TTLCache, SingleFlight
+from utils.clients import get_s3_client
+from utils.metrics import count_cache, register_cache, span, submit
 
-def get_all_image_urls(bucket_name, tconst):
+logger = logging.getLogger(__name__)
+
+# Erros do S3: respostas de erro (ClientError) e falhas de conexão, timeout ou credenciais (BotoCoreError)
+S3_ERRORS = (ClientError, BotoCoreError)
+
+MANIFESTS_COLLECTION = "image_manifests"
+
+# Manifesto (lista de objetos + legendas) por filme: memória -> MongoDB -> S3
+_manifest_cache = TTLCache(
+    max_size=IMAGE_MANIFEST_MEMORY_CACHE_SIZE,
+    ttl_seconds=IMAGE_MANIFEST_CHECK_SECONDS
+)
+register_cache("image_manifests_memory", _manifest_cache)
+_manifest_refreshes = SingleFlight()
+_tag_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=IMAGE_TAG_FETCH_WORKERS,
+    thread_name_prefix="s3-tags"
+)
+# Pool separado do das tags: a revalidação espera pelas tags e não pode ocupar as mesmas threads
+_refresh_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=IMAGE_MANIFEST_REFRESH_WORKERS,
+    thread_name_prefix="image-manifests"
+)
+_background_refreshes = set()
+_background_lock = threading.Lock()
+
+
+def get_all_image_urls(bucket_name, tconst, refresh=False):
     """Retorna todas as URLs de imagens associadas a um post"""
     try:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name='us-east-2'
-        )
+        manifest = _get_manifest(bucket_name, tconst, refresh)
+        return {"images": _image_urls(manifest)}, 200
 
-        response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix=f"{tconst}/")
-        images = []
-        for obj in response.get('Contents', []):
-            object_name = obj['Key']
-            filename = object_name.split('/')[-1]
-            
-            # Adicionar log para debug
-
-            # Busca as tags do objeto
-            tag_response = s3_client.get_object_tagging(
-                Bucket=bucket_name,
-                Key=object_name
-            )
-            
-            # Adicionar log para debug
-            
-            # Procura pelas tags de legenda
-            subtitle_pt = ""
-            subtitle_en = ""
-            for tag in tag_response.get('TagSet', []):
-                if tag['Key'] == 'subtitle_pt':
-                    subtitle_pt = tag['Value']
-                elif tag['Key'] == 'subtitle_en':
-                    subtitle_en = tag['Value']
-
-            url = f"https://{BUCKET_NAME}.s3.us-east-2.amazonaws.com/{object_name}"
-            images.append({
-                "url": url,
-                "filename": filename,
-                "subtitle_pt": subtitle_pt,
-                "subtitle_en": subtitle_en,
-                "last_modified": obj['LastModified']
-            })
-        
-        images.sort(key=lambda x: x['last_modified'])
-        
-        for image in images:
-            del image['last_modified']
-        
-        return {"images": images}, 200
-
-    except ClientError as e:
-        return {"status": 500, "message": "Erro ao listar imagens"}, 500 
-    
-
-def get_image_url(bucket_name, tconst, filename):
+    except S3_ERRORS as e:
+        logger.warning("Erro ao listar imagens de %s no S3: %s", tconst, e)
+        return {"status": 502, "message": "Erro ao listar imagens"}, 502
+
+
+def _image_urls(manifest):
+    """URLs públicas e legendas dos objetos do manifesto"""
+    return [
+        {
+            "url": f"https://{BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{obj['key']}",
+            "filename": obj["filename"],
+            "subtitle_pt": obj["subtitle_pt"],
+            "subtitle_en": obj["subtitle_en"],
+        }
+        for obj in manifest["objects"]
+    ]
+
+
+def get_image_url(bucket_name, tconst, filename, refresh=False):
     """Retorna a URL pública direta e a legenda de um arquivo no S3"""
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name='us-east-2'
-    )
-    
     try:
         object_name = f"{tconst}/{filename}"
-        
-        # Busca as tags do objeto
-        response = s3_client.get_object_tagging(
-            Bucket=bucket_name,
-            Key=object_name
-        )
-        
-        # Procura pelas tags de legenda
-        subtitle_pt = ""
-        subtitle_en = ""
-        for tag in response.get('TagSet', []):
-            if tag['Key'] == 'subtitle_pt':
-                subtitle_pt = tag['Value']
-            elif tag['Key'] == 'subtitle_en':
-                subtitle_en = tag['Value']
-        
-        url = f"https://{bucket_name}.s3.us-east-2.amazonaws.com/{object_name}"
+
+        # Usa o manifesto do filme se ainda for válido. Sem ele, busca só as tags deste arquivo
+        # e revalida o manifesto em segundo plano, em vez de listar o filme inteiro na requisição
+        manifest, stored = (None, None) if refresh else _find_manifest(_manifest_key(bucket_name, tconst))
+        entry = None
+        if manifest is not None:
+            entry = next((obj for obj in manifest["objects"] if obj["key"] == object_name), None)
+
+        # Também consulta as tags se o arquivo não estiver no manifesto
+        # ou se as legendas salvas já passaram de IMAGE_SUBTITLE_TTL_SECONDS
+        if entry is None or not _subtitles_fresh(entry):
+            subtitle_pt, subtitle_en = _fetch_subtitles(bucket_name, object_name)
+        else:
+            subtitle_pt, subtitle_en = entry["subtitle_pt"], entry["subtitle_en"]
+
+        if manifest is None:
+            _refresh_manifest_in_background(bucket_name, tconst, stored)
+
+        url = f"https://{bucket_name}.s3.{S3_REGION}.amazonaws.com/{object_name}"
         return {
             "url": url,
             "filename": filename,
             "subtitle_pt": subtitle_pt,
             "subtitle_en": subtitle_en
         }, 200
+    except S3_ERRORS as e:
+        if isinstance(e, ClientError) and e.response.get("Error", {}).get("Code") == "NoSuchKey":
+            return {"status": 404, "message": "Imagem não encontrada"}, 404
+        logger.warning("Erro ao buscar legenda de %s/%s no S3: %s", tconst, filename, e)
+        return {"status": 502, "message": "Erro ao buscar legenda"}, 502
     except Exception as e:
-        return {"status": 500, "message": "Erro ao buscar legenda"}, 500
\ No newline at end of file
+        return {"status": 500, "message": "Erro ao buscar legenda"}, 500
+
+
+def invalidate_image_manifest(bucket_name, tconst):
+    """Descarta o manifesto de um filme (memória e MongoDB)"""
+    cache_key = _manifest_key(bucket_name, tconst)
+    _manifest_cache.delete(cache_key)
+    try:
+        get_mongo_collection(MANIFESTS_COLLECTION).delete_one({"cache_key": cache_key})
+    except PyMongoError as e:
+        logger.warning("Erro ao remover manifesto de imagens %s: %s", cache_key, e)
+
+
+def _manifest_key(bucket_name, tconst):
+    return f"{bucket_name}:{tconst}"
+
+
+def _get_manifest(bucket_name, tconst, refresh=False):
+    """
+    Manifesto do filme. Dentro de IMAGE_MANIFEST_CHECK_SECONDS é servido sem chamar o S3;
+    depois disso é revalidado com uma listagem (ETag/LastModified), buscando de novo as tags
+    lidas há mais de IMAGE_SUBTITLE_TTL_SECONDS.
+    refresh=True busca de novo todas as tags (alterar só as tags não muda ETag nem LastModified).
+    O MongoDB é só um cache: se estiver indisponível o manifesto vem direto do S3.
+    """
+    cache_key = _manifest_key(bucket_name, tconst)
+    stored = None
+
+    if not refresh:
+        manifest, stored = _find_manifest(cache_key)
+        if manifest is not None:
+            return manifest
+
+    # Uma revalidação no S3 por filme; quem chega depois aguarda o resultado
+    manifest, _ = _manifest_refreshes.do(cache_key, _refresh_manifest, bucket_name, tconst, stored)
+    return manifest
+
+
+def _find_manifest(cache_key):
+    """
+    Manifesto ainda dentro de IMAGE_MANIFEST_CHECK_SECONDS (memória -> MongoDB).
+    Retorna (manifesto válido ou None, documento salvo no MongoDB, mesmo vencido).
+    """
+    manifest = _manifest_cache.get(cache_key)
+    if manifest is not None:
+        return manifest, manifest
+
+    stored = None
+    try:
+        with span("mongo", "image_manifests.find_one"):
+            stored = get_mongo_collection(MANIFESTS_COLLECTION).find_one({"cache_key": cache_key})
+    except PyMongoError as e:
+        logger.warning("Erro ao ler manifesto de imagens %s, listando no S3: %s", cache_key, e)
+
+    if stored is not None:
+        remaining = (
+            stored["checked_at"] + timedelta(seconds=IMAGE_MANIFEST_CHECK_SECONDS) - datetime.utcnow()
+        ).total_seconds()
+        if remaining > 0:
+            count_cache("image_manifests_mongo", True)
+            _manifest_cache.set(cache_key, stored, ttl_seconds=remaining)
+            return stored, stored
+    count_cache("image_manifests_mongo", False)
+
+    return None, stored
+
+
+def _refresh_manifest_in_background(bucket_name, tconst, stored):
+    """Agenda a revalidação do manifesto sem esperar por ela (no máximo uma na fila por filme)"""
+    cache_key = _manifest_key(bucket_name, tconst)
+    with _background_lock:
+        if cache_key in _background_refreshes:
+            return
+        _background_refreshes.add(cache_key)
+
+    try:
+        _refresh_executor.submit(_run_background_refresh, bucket_name, tconst, stored)
+    except RuntimeError:
+        # Pool encerrado (desligamento do processo)
+        with _background_lock:
+            _background_refreshes.discard(cache_key)
+
+
+def _run_background_refresh(bucket_name, tconst, stored):
+    """Revalida o manifesto; erros só são registrados, a requisição já foi respondida"""
+    cache_key = _manifest_key(bucket_name, tconst)
+    try:
+        _manifest_refreshes.do(cache_key, _refresh_manifest, bucket_name, tconst, stored)
+    except Exception as e:
+        logger.warning("Erro ao revalidar manifesto de imagens %s em segundo plano: %s", cache_key, e)
+    finally:
+        with _background_lock:
+            _background_refreshes.discard(cache_key)
+
+
+def _subtitles_fresh(entry):
+    """Se as legendas da entrada foram lidas das tags há menos de IMAGE_SUBTITLE_TTL_SECONDS"""
+    fetched_at = entry.get("tags_fetched_at")
+    return (
+        fetched_at is not None
+        and datetime.utcnow() - fetched_at < timedelta(seconds=IMAGE_SUBTITLE_TTL_SECONDS)
+    )
+
+
+def _refresh_manifest(bucket_name, tconst, stored):
+    """Lista os objetos do filme e busca, em paralelo, apenas as tags de objetos novos ou alterados"""
+    cache_key = _manifest_key(bucket_name, tconst)
+    previous = {obj["key"]: obj for obj in stored["objects"]} if stored else {}
+
+    try:
+        listed = _list_objects(bucket_name, f"{tconst}/")
+    except S3_ERRORS as e:
+        if stored is None:
+            raise
+        # S3 indisponível: serve o manifesto antigo
+        logger.warning("Erro ao revalidar imagens de %s, usando manifesto salvo: %s", tconst, e)
+        return stored
+
+    objects = []
+    to_fetch = []
+    for obj in listed:
+        entry = {
+            "key": obj["Key"],
+            "filename": obj["Key"].split("/")[-1],
+            "etag": obj.get("ETag"),
+            "last_modified": obj["LastModified"].astimezone(timezone.utc).replace(tzinfo=None),
+        }
+        old = previous.get(entry["key"])
+        if (
+            old is not None
+            and _subtitles_fresh(old)
+            and old["etag"] == entry["etag"]
+            and old["last_modified"] == entry["last_modified"]
+        ):
+            entry["subtitle_pt"] = old["subtitle_pt"]
+            entry["subtitle_en"] = old["subtitle_en"]
+            entry["tags_fetched_at"] = old["tags_fetched_at"]
+        else:
+            to_fetch.append(entry)
+        objects.append(entry)
+
+    futures = {
+        submit(_tag_executor, _fetch_subtitles, bucket_name, entry["key"]): entry
+        for entry in to_fetch
+    }
+    for future, entry in futures.items():
+        try:
+            entry["subtitle_pt"], entry["subtitle_en"] = future.result()
+            entry["tags_fetched_at"] = datetime.utcnow()
+        except S3_ERRORS as e:
+            # Sem tags_fetched_at: as tags são buscadas de novo na próxima revalidação
+            logger.warning("Erro ao buscar tags de %s: %s", entry["key"], e)
+            entry["subtitle_pt"], entry["subtitle_en"] = "", ""
+
+    objects.sort(key=lambda x: x["last_modified"])
+
+    manifest = {
+        "cache_key": cache_key,
+        "bucket": bucket_name,
+        "tconst": tconst,
+        "objects": objects,
+        "checked_at": datetime.utcnow(),
+    }
+    try:
+        with span("mongo", "image_manifests.replace_one"):
+            get_mongo_collection(MANIFESTS_COLLECTION).replace_one(
+                {"cache_key": cache_key}, manifest, upsert=True
+            )
+    except PyMongoError as e:
+        logger.warning("Erro ao salvar manifesto de imagens %s: %s", cache_key, e)
+    manifest.pop("_id", None)
+    _manifest_cache.set(cache_key, manifest)
+    return manifest
+
+
+def _list_objects(bucket_name, prefix):
+    """Todos os objetos do prefixo, seguindo os continuation tokens (1000 por página)"""
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    objects = []
+    with span("s3", "list_objects_v2"):
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            objects.extend(page.get("Contents", []))
+    return objects
+
+
+def _fetch_subtitles(bucket_name, object_name):
+    """Legendas (subtitle_pt, subtitle_en) guardadas nas tags do objeto"""
+    with span("s3", "get_object_tagging"):
+        tag_response = get_s3_client().get_object_tagging(
+            Bucket=bucket_name,
+            Key=object_name
+        )
+
+    # Procura pelas tags de legenda
+    subtitle_pt = ""
+    subtitle_en = ""
+    for tag in tag_response.get('TagSet', []):
+        if tag['Key'] == 'subtitle_pt':
+            subtitle_pt = tag['Value']
+        elif tag['Key'] == 'subtitle_en':
+            subtitle_en = tag['Value']
+    return subtitle_pt, subtitle_en
@@ -4,7 +4,8 @@ from images.controller import (
     get_image_url,
     get_all_image_urls
 )
-from config import BUCKET_NAME
+from config import BUCKET_NAME, HTTP_CACHE_POLICIES
+from utils.http_cache import conditional_get
 
 images_bp = Blueprint("images", __name__)
 api = Namespace(
@@ -14,21 +15,27 @@ api = Namespace(
 
 @api.route("/<string:tconst>")
 class Images(Resource):
-    @api.doc("get_images")
+    @api.doc("get_images", params={"refresh": "true para revalidar o manifesto e as legendas no S3"})
     @api.response(200, "Sucesso")
     @api.response(404, "Imagens não encontradas")
+    @api.response(502, "S3 indisponível e sem manifesto salvo")
+    @conditional_get(**HTTP_CACHE_POLICIES["images"])
     def get(self, tconst):
         """Recupera todas as URLs de imagens de um filme"""
         BUCKET_NAME = 'themoviesearch'
-        return get_all_image_urls(BUCKET_NAME, tconst) 
+        refresh = request.args.get("refresh", "false").lower() == "true"
+        return get_all_image_urls(BUCKET_NAME, tconst, refresh)
 
 @api.route("/<string:tconst>/<string:filename>")
 class ImageDetailOperations(Resource):
-    @api.doc("get_image_url")
+    @api.doc("get_image_url", params={"refresh": "true para buscar de novo as legendas (tags) no S3"})
     @api.response(200, "URL gerada com sucesso")
     @api.response(404, "Imagem não encontrada")
     @api.response(500, "Erro interno do servidor")
+    @api.response(502, "S3 indisponível")
+    @conditional_get(**HTTP_CACHE_POLICIES["images"])
     def get(self, tconst, filename):
         """Gera uma URL pública direta para acessar a imagem no S3"""
         BUCKET_NAME = 'themoviesearch'
-        return get_image_url(BUCKET_NAME, tconst, filename)
+        refresh = request.args.get("refresh", "false").lower() == "true"
+        return get_image_url(BUCKET_NAME, tconst, filename, refresh)
@@ -0,0 +1,165 @@
+# Página de detalhes para o modo ASGI (asgi.py): mesma sequência e mesmos caches do controller.py,
+# com diretor e trilha sonora montados em corrotinas. O MongoDB usa as funções do controller.py numa thread
+import asyncio
+from config import MOVIE_DETAIL_BUILD_TIMEOUT
+from directors.async_controller import get_director_info_async
+from directors.controller import _find_director
+from movie_detail_cache.controller import (
+    _as_cache_hit,
+    _bio_translation_request,
+    _build_result,
+    _description_translation_request,
+    _find_valid_cache,
+    _get_movie_data,
+    _memory_cache,
+    _new_cache_document,
+    _remember_built_cache,
+    _save_cache,
+)
+from music.async_controller import get_movie_soundtrack_async
+from music.controller import _find_soundtrack, _soundtrack_cache_key
+from utils.cache import AsyncSingleFlight
+from utils.orchestration import run_parallel_async
+from utils.translations import translate_text_async
+
+# Uma construção por cache_key no event loop do worker
+_cache_builds = AsyncSingleFlight()
+
+
+async def get_movie_detail_cache_async(movie_id, language="pt"):
+    """Busca ou cria cache completo da página de detalhes do filme"""
+    cache_key = f"{movie_id}_{language}"
+
+    try:
+        cache_data = _memory_cache.get(cache_key)
+        if cache_data:
+            return _as_cache_hit(cache_data), 200
+
+        cache_data = await asyncio.to_thread(_find_valid_cache, cache_key)
+        if cache_data:
+            _memory_cache.set(cache_key, cache_data)
+            return _as_cache_hit(cache_data), 200
+
+        (cache_data, status_code), shared = await _cache_builds.do(
+            cache_key, _load_or_create_movie_detail_cache_async, movie_id, language
+        )
+
+        return _build_result(cache_data, status_code, shared)
+
+    except Exception as e:
+        return {"error": "Erro ao buscar cache de detalhes do filme"}, 500
+
+
+async def _load_or_create_movie_detail_cache_async(movie_id, language="pt"):
+    """Reconsulta o MongoDB e, se ainda não houver cache, cria um novo"""
+    cache_key = f"{movie_id}_{language}"
+
+    cache_data = await asyncio.to_thread(_find_valid_cache, cache_key)
+    if cache_data:
+        _memory_cache.set(cache_key, cache_data)
+        return cache_data, 200
+
+    cache_data, status_code = await _create_movie_detail_cache_async(movie_id, language)
+    _remember_built_cache(cache_key, cache_data, status_code)
+
+    return cache_data, status_code
+
+
+async def _create_movie_detail_cache_async(movie_id, language="pt"):
+    """Cria um novo cache com todos os dados da página de detalhes do filme"""
+    try:
+        movie_data = await asyncio.to_thread(_get_movie_data, movie_id)
+
+        if not movie_data:
+            return {"error": "Filme não encontrado"}, 404
+
+        results, timed_out = await run_parallel_async({
+            "director": lambda: _resolve_director_async(movie_data, language),
+            "soundtrack": lambda: _resolve_soundtrack_async(movie_data, language),
+        }, timeout=MOVIE_DETAIL_BUILD_TIMEOUT)
+
+        cache_data = _new_cache_document(movie_id, language, movie_data, results, timed_out)
+        if cache_data.get("partial"):
+            # Resultado parcial não é salvo; as etapas pendentes continuam no event loop
+            return cache_data, 200
+
+        cache_data["_id"] = await asyncio.to_thread(_save_cache, cache_data)
+
+        return cache_data, 200
+
+    except Exception as e:
+        return {"error": "Erro ao criar cache de detalhes do filme"}, 500
+
+
+async def _resolve_director_async(movie_data, language="pt"):
+    """Busca o diretor salvo ou, se não existir, busca um novo"""
+    director_info = await _get_existing_director_data_async(movie_data.get("director"), language)
+
+    if not director_info and movie_data.get("director"):
+        director_data, director_status = await get_director_info_async(
+            movie_data["director"], movie_data.get("tconst"), language
+        )
+        if director_status == 200:
+            director_info = director_data
+
+    return director_info
+
+
+async def _resolve_soundtrack_async(movie_data, language="pt"):
+    """Busca a trilha sonora salva ou, se não existir, busca uma nova"""
+    soundtrack_info = await _get_existing_soundtrack_data_async(movie_data["title"], movie_data.get("year"), language)
+
+    if not soundtrack_info:
+        soundtrack_data, soundtrack_status = await get_movie_soundtrack_async(
+            movie_data["title"], movie_data.get("year"), movie_data.get("director"), language
+        )
+        if soundtrack_status == 200:
+            soundtrack_info = soundtrack_data
+
+    return soundtrack_info
+
+
+async def _get_existing_director_data_async(director_name, language="pt"):
+    """Busca dados do diretor já salvos no MongoDB"""
+    if not director_name:
+        return None
+
+    try:
+        director_data = await asyncio.to_thread(_find_director, director_name)
+
+        if director_data:
+            director_data["_id"] = str(director_data["_id"])
+
+            if language != "pt" and director_data.get("bio"):
+                director_data["bio"] = await translate_text_async(
+                    "director_bio", director_data["bio"], language, _bio_translation_request
+                )
+
+            return director_data
+
+        return None
+
+    except Exception as e:
+        return None
+
+
+async def _get_existing_soundtrack_data_async(movie_title, movie_year, language="pt"):
+    """Busca dados da trilha sonora já salvos no MongoDB"""
+    try:
+        soundtrack_data = await asyncio.to_thread(_find_soundtrack, _soundtrack_cache_key(movie_title, movie_year))
+
+        if soundtrack_data:
+            soundtrack_data["_id"] = str(soundtrack_data["_id"])
+
+            if language != "pt" and soundtrack_data.get("description"):
+                soundtrack_data["description"] = await translate_text_async(
+                    "soundtrack_description", soundtrack_data["description"], language,
+                    lambda description: _description_translation_request(description, language)
+                )
+
+            return soundtrack_data
+
+        return None
+
+    except Exception as e:
+        return None
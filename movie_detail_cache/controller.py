@@ -1,95 +1,142 @@
-import json
 from datetime import datetime, timedelta
-from config import get_mongo_collection, OPENAI_API_KEY
+from pymongo import ReturnDocument
+from config import (
+    get_mongo_collection,
+    MOVIE_DETAIL_CACHE_TTL_HOURS,
+    MOVIE_DETAIL_BUILD_TIMEOUT,
+    MOVIE_DETAIL_MEMORY_CACHE_SIZE,
+    MOVIE_DETAIL_MEMORY_CACHE_TTL,
+)
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importa os controllers existentes
-from directors.controller import get_director_info
-from music.controller import get_movie_soundtrack
+from directors.controller import get_director_info, _find_director
+from music.controller import get_movie_soundtrack, _find_soundtrack, _soundtrack_cache_key
+from utils.cache import TTLCache, SingleFlight
+from utils.metrics import count_cache, register_cache, span
+from utils.orchestration import run_parallel
+from utils.translations import translate_text
+
+# Primeira camada do cache (por processo), na frente da coleção movie_detail_cache
+_memory_cache = TTLCache(
+    max_size=MOVIE_DETAIL_MEMORY_CACHE_SIZE,
+    ttl_seconds=MOVIE_DETAIL_MEMORY_CACHE_TTL
+)
+register_cache("movie_detail_memory", _memory_cache)
+
+# Garante que apenas uma construção de cache rode por cache_key
+_cache_builds = SingleFlight()
 
 
 def get_movie_detail_cache(movie_id, language="pt"):
     """Busca ou cria cache completo da página de detalhes do filme"""
-    collection = get_mongo_collection("movie_detail_cache")
+    cache_key = f"{movie_id}_{language}"
     
     try:
-        # Verifica se existe cache válido (menos de 24 horas)
-        cache_key = f"{movie_id}_{language}"
-        cache_data = collection.find_one({"cache_key": cache_key})
+        # Primeiro tenta o cache em memória
+        cache_data = _memory_cache.get(cache_key)
+        if cache_data:
+            return _as_cache_hit(cache_data), 200
         
+        # Depois o cache no MongoDB
+        cache_data = _find_valid_cache(cache_key)
         if cache_data:
-            # Verifica se o cache ainda é válido (24 horas)
-            cache_time = cache_data.get("created_at")
-            if cache_time and isinstance(cache_time, datetime):
-                if datetime.now() - cache_time < timedelta(hours=24):
-                    # Cache válido, retorna os dados
-                    cache_data["_id"] = str(cache_data["_id"])
-                    cache_data["from_cache"] = True
-                    cache_data["cache_age_hours"] = (datetime.now() - cache_time).total_seconds() / 3600
-                    return cache_data, 200
-                else:
-                    # Cache expirado, remove
-                    collection.delete_one({"cache_key": cache_key})
+            _memory_cache.set(cache_key, cache_data)
+            return _as_cache_hit(cache_data), 200
         
-        # Se não tem cache válido, cria um novo
-        return _create_movie_detail_cache(movie_id, language)
+        # Se não tem cache válido, cria um novo (apenas uma construção por cache_key)
+        (cache_data, status_code), shared = _cache_builds.do(
+            cache_key, _load_or_create_movie_detail_cache, movie_id, language
+        )
+        
+        return _build_result(cache_data, status_code, shared)
         
     except Exception as e:
         return {"error": "Erro ao buscar cache de detalhes do filme"}, 500
 
 
+def _find_valid_cache(cache_key):
+    """Busca o cache no MongoDB (a expiração é feita pelo índice TTL)"""
+    with span("mongo", "movie_detail_cache.find_one"):
+        cache_data = get_mongo_collection("movie_detail_cache").find_one({"cache_key": cache_key})
+    count_cache("movie_detail_mongo", cache_data is not None)
+    
+    if cache_data:
+        cache_data["_id"] = str(cache_data["_id"])
+    
+    return cache_data
+
+
+def _load_or_create_movie_detail_cache(movie_id, language="pt"):
+    """Reconsulta o MongoDB e, se ainda não houver cache, cria um novo"""
+    cache_key = f"{movie_id}_{language}"
+    
+    # Outro builder pode ter acabado de salvar o cache
+    cache_data = _find_valid_cache(cache_key)
+    if cache_data:
+        _memory_cache.set(cache_key, cache_data)
+        return cache_data, 200
+    
+    cache_data, status_code = _create_movie_detail_cache(movie_id, language)
+    _remember_built_cache(cache_key, cache_data, status_code)
+    
+    return cache_data, status_code
+
+
+def _remember_built_cache(cache_key, cache_data, status_code):
+    """Guarda na memória só caches completos (parciais são refeitos na próxima requisição)"""
+    if status_code == 200 and not cache_data.get("partial"):
+        _memory_cache.set(cache_key, cache_data)
+
+
+def _build_result(cache_data, status_code, shared):
+    """
+    Resposta de uma construção do single-flight: sempre uma cópia (o dict do builder pode estar
+    no cache em memória); só quem aguardou um cache completo recebe from_cache=True
+    """
+    if shared and status_code == 200 and not cache_data.get("partial"):
+        return _as_cache_hit(cache_data), 200
+    
+    return dict(cache_data), status_code
+
+
+def _as_cache_hit(cache_data):
+    """Cria uma cópia rasa do cache marcada como vinda do cache"""
+    response = dict(cache_data)
+    response["from_cache"] = True
+    
+    cache_time = cache_data.get("created_at")
+    if cache_time and isinstance(cache_time, datetime):
+        response["cache_age_hours"] = (datetime.utcnow() - cache_time).total_seconds() / 3600
+    
+    return response
+
+
 def _create_movie_detail_cache(movie_id, language="pt"):
     """Cria um novo cache com todos os dados da página de detalhes do filme"""
-    collection = get_mongo_collection("movie_detail_cache")
-    
     try:
         # Busca dados do filme
-        movie_data = _get_movie_data(movie_id, language)
+        movie_data = _get_movie_data(movie_id)
         
         if not movie_data:
             return {"error": "Filme não encontrado"}, 404
         
-        # ✅ OTIMIZAÇÃO: Busca dados já salvos primeiro
-        director_info = _get_existing_director_data(movie_data.get("director"), language)
-        soundtrack_info = _get_existing_soundtrack_data(movie_data["title"], movie_data.get("year"), language)
-        
-        # Se não encontrou dados salvos, busca novos (mas de forma mais rápida)
-        if not director_info and movie_data.get("director"):
-            director_data, director_status = get_director_info(
-                movie_data["director"], 
-                movie_data.get("tconst"), 
-                language
-            )
-            if director_status == 200:
-                director_info = director_data
+        # Diretor e trilha sonora (incluindo traduções) são montados em paralelo
+        results, timed_out = run_parallel({
+            "director": lambda: _resolve_director(movie_data, language),
+            "soundtrack": lambda: _resolve_soundtrack(movie_data, language),
+        }, timeout=MOVIE_DETAIL_BUILD_TIMEOUT)
         
-        if not soundtrack_info:
-            soundtrack_data, soundtrack_status = get_movie_soundtrack(
-                movie_data["title"],
-                movie_data.get("year"),
-                movie_data.get("director"),
-                language
-            )
-            if soundtrack_status == 200:
-                soundtrack_info = soundtrack_data
+        cache_data = _new_cache_document(movie_id, language, movie_data, results, timed_out)
+        if cache_data.get("partial"):
+            # Resultado parcial não é salvo; as etapas pendentes continuam em segundo
+            # plano e salvam diretor/trilha nas próprias coleções
+            return cache_data, 200
         
-        # Monta o cache completo
-        cache_data = {
-            "cache_key": f"{movie_id}_{language}",
-            "movie_id": movie_id,
-            "language": language,
-            "movie": movie_data,
-            "director": director_info,
-            "soundtrack": soundtrack_info,
-            "created_at": datetime.now(),
-            "from_cache": False
-        }
-        
-        # Salva no banco
-        result = collection.insert_one(cache_data)
-        cache_data["_id"] = str(result.inserted_id)
+        # Salva no banco (upsert evita documentos duplicados para o mesmo cache_key)
+        cache_data["_id"] = _save_cache(cache_data)
         
         return cache_data, 200
         
@@ -97,21 +144,71 @@ def _create_movie_detail_cache(movie_id, language="pt"):
         return {"error": "Erro ao criar cache de detalhes do filme"}, 500
 
 
+def _new_cache_document(movie_id, language, movie_data, results, timed_out):
+    """Monta o cache completo (ou parcial, se alguma etapa estourou o prazo)"""
+    cache_data = {
+        "cache_key": f"{movie_id}_{language}",
+        "movie_id": movie_id,
+        "language": language,
+        "movie": movie_data,
+        "director": results.get("director"),
+        "soundtrack": results.get("soundtrack"),
+        "created_at": datetime.utcnow(),
+        "from_cache": False
+    }
+    
+    if timed_out:
+        cache_data["partial"] = True
+        cache_data["timed_out"] = timed_out
+    
+    return cache_data
+
+
+def _resolve_director(movie_data, language="pt"):
+    """Busca o diretor salvo ou, se não existir, busca um novo"""
+    # ✅ OTIMIZAÇÃO: Busca dados já salvos primeiro
+    director_info = _get_existing_director_data(movie_data.get("director"), language)
+    
+    if not director_info and movie_data.get("director"):
+        director_data, director_status = get_director_info(
+            movie_data["director"], movie_data.get("tconst"), language
+        )
+        if director_status == 200:
+            director_info = director_data
+    
+    return director_info
+
+
+def _resolve_soundtrack(movie_data, language="pt"):
+    """Busca a trilha sonora salva ou, se não existir, busca uma nova"""
+    soundtrack_info = _get_existing_soundtrack_data(movie_data["title"], movie_data.get("year"), language)
+    
+    if not soundtrack_info:
+        soundtrack_data, soundtrack_status = get_movie_soundtrack(
+            movie_data["title"], movie_data.get("year"), movie_data.get("director"), language
+        )
+        if soundtrack_status == 200:
+            soundtrack_info = soundtrack_data
+    
+    return soundtrack_info
+
+
 def _get_existing_director_data(director_name, language="pt"):
     """Busca dados do diretor já salvos no MongoDB"""
     if not director_name:
         return None
     
     try:
-        directors_collection = get_mongo_collection("directors")
-        director_data = directors_collection.find_one({"name": director_name})
+        director_data = _find_director(director_name)
         
         if director_data:
             director_data["_id"] = str(director_data["_id"])
             
             # Traduz biografia se necessário
             if language != "pt" and director_data.get("bio"):
-                director_data["bio"] = _translate_director_bio(director_data["bio"], language)
+                director_data["bio"] = translate_text(
+                    "director_bio", director_data["bio"], language, _bio_translation_request
+                )
             
             return director_data
         
@@ -124,18 +221,16 @@ def _get_existing_director_data(director_name, language="pt"):
 def _get_existing_soundtrack_data(movie_title, movie_year, language="pt"):
     """Busca dados da trilha sonora já salvos no MongoDB"""
     try:
-        soundtracks_collection = get_mongo_collection("movie_soundtracks")
-        cache_key = f"{movie_title}_{movie_year}" if movie_year else movie_title
-        soundtrack_data = soundtracks_collection.find_one({"cache_key": cache_key})
+        soundtrack_data = _find_soundtrack(_soundtrack_cache_key(movie_title, movie_year))
         
         if soundtrack_data:
             soundtrack_data["_id"] = str(soundtrack_data["_id"])
             
             # Traduz descrição se necessário
             if language != "pt" and soundtrack_data.get("description"):
-                soundtrack_data["description"] = _translate_soundtrack_description(
-                    soundtrack_data["description"], 
-                    language
+                soundtrack_data["description"] = translate_text(
+                    "soundtrack_description", soundtrack_data["description"], language,
+                    lambda description: _description_translation_request(description, language)
                 )
             
             return soundtrack_data
@@ -146,78 +241,49 @@ def _get_existing_soundtrack_data(movie_title, movie_year, language="pt"):
         return None
 
 
-def _translate_director_bio(bio, language):
-    """Traduz biografia do diretor"""
-    try:
-        if not OPENAI_API_KEY or language == "pt":
-            return bio
-        
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        prompt = f"Translate the following film director biography to English. Maintain the same style and tone: {bio}"
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional translator."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.3,
-            timeout=3
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except Exception as e:
-        return bio
+def _bio_translation_request(bio):
+    """Parâmetros da chamada à OpenAI que traduz a biografia do diretor"""
+    prompt = f"Translate the following film director biography to English. Maintain the same style and tone: {bio}"
+    
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are a professional translator."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 400,
+        "temperature": 0.3,
+        "timeout": 3
+    }
 
 
-def _translate_soundtrack_description(description, language):
-    """Traduz descrição da trilha sonora"""
-    try:
-        if not OPENAI_API_KEY or language == "pt":
-            return description
-        
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        prompt = f"Translate the following soundtrack description to {language}: {description}"
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional translator."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=0.3,
-            timeout=3
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except Exception as e:
-        return description
+def _description_translation_request(description, language):
+    """Parâmetros da chamada à OpenAI que traduz a descrição da trilha sonora"""
+    prompt = f"Translate the following soundtrack description to {language}: {description}"
+    
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are a professional translator."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 150,
+        "temperature": 0.3,
+        "timeout": 3
+    }
 
 
-def _get_movie_data(movie_id, language="pt"):
+def _get_movie_data(movie_id):
     """Busca dados básicos do filme"""
     try:
-        # Importa o controller de recomendações para buscar dados do filme
-        from recommendations.controller import get_all_recommendations
+        # Busca direta pelo tconst no controller de recomendações
+        from recommendations.controller import get_recommendation_by_tconst
         
-        # Busca o filme específico
-        recommendations, status_code = get_all_recommendations(
-            page=1,
-            page_size=1,
-            search_term=movie_id,
-            language=language
-        )
+        with span("mongo", "recommendations.find_one"):
+            movie, status_code = get_recommendation_by_tconst(movie_id)
         
-        if status_code == 200 and recommendations.get("entries") and len(recommendations["entries"]) > 0:
-            return recommendations["entries"][0]
+        if status_code == 200:
+            return movie
         
         return None
         
@@ -226,7 +292,10 @@ def _get_movie_data(movie_id, language="pt"):
 
 
 def invalidate_movie_cache(movie_id, language=None):
-    """Invalida cache de um filme específico"""
+    """
+    Invalida cache de um filme específico. O MongoDB e a memória deste processo são limpos na hora;
+    os outros workers continuam servindo a cópia em memória por até MOVIE_DETAIL_MEMORY_CACHE_TTL segundos
+    """
     collection = get_mongo_collection("movie_detail_cache")
     
     try:
@@ -234,11 +303,18 @@ def invalidate_movie_cache(movie_id, language=None):
             # Invalida cache específico do idioma
             cache_key = f"{movie_id}_{language}"
             result = collection.delete_one({"cache_key": cache_key})
+            _memory_cache.delete(cache_key)
         else:
             # Invalida todos os caches do filme
             result = collection.delete_many({"movie_id": movie_id})
+            _memory_cache.delete_prefix(f"{movie_id}_")
         
-        return {"message": f"Cache invalidado para filme {movie_id}"}, 200
+        return {
+            "message": f"Cache invalidado para filme {movie_id}",
+            # O cache em memória é por processo: outros workers podem servir a versão anterior até expirar
+            "memory_cache_scope": "process",
+            "stale_for_up_to_seconds": MOVIE_DETAIL_MEMORY_CACHE_TTL
+        }, 200
         
     except Exception as e:
         return {"error": "Erro ao invalidar cache"}, 500
@@ -251,12 +327,12 @@ def get_cache_stats():
     try:
         total_caches = collection.count_documents({})
         
-        # Caches válidos (menos de 24 horas)
+        # Caches válidos (dentro do TTL)
         valid_caches = collection.count_documents({
-            "created_at": {"$gte": datetime.now() - timedelta(hours=24)}
+            "created_at": {"$gte": datetime.utcnow() - timedelta(hours=MOVIE_DETAIL_CACHE_TTL_HOURS)}
         })
         
-        # Caches expirados
+        # Caches expirados aguardando remoção pelo índice TTL
         expired_caches = total_caches - valid_caches
         
         # Idiomas mais usados
@@ -269,7 +345,9 @@ def get_cache_stats():
             "total_caches": total_caches,
             "valid_caches": valid_caches,
             "expired_caches": expired_caches,
-            "language_stats": language_stats
+            "language_stats": language_stats,
+            "memory_cache": _memory_cache.stats(),
+            "builds_in_flight": _cache_builds.in_flight()
         }, 200
         
     except Exception as e:
@@ -277,15 +355,27 @@ def get_cache_stats():
 
 
 def cleanup_expired_cache():
-    """Remove caches expirados (mais de 24 horas)"""
+    """Remove caches expirados imediatamente, sem esperar o índice TTL"""
     collection = get_mongo_collection("movie_detail_cache")
     
     try:
         result = collection.delete_many({
-            "created_at": {"$lt": datetime.now() - timedelta(hours=24)}
+            "created_at": {"$lt": datetime.utcnow() - timedelta(hours=MOVIE_DETAIL_CACHE_TTL_HOURS)}
         })
         
         return {"message": f"{result.deleted_count} caches expirados removidos"}, 200
         
     except Exception as e:
         return {"error": "Erro ao limpar cache expirado"}, 500
+
+
+def _save_cache(cache_data):
+    """Salva o cache (upsert evita documentos duplicados para o mesmo cache_key) e retorna o _id"""
+    with span("mongo", "movie_detail_cache.find_one_and_replace"):
+        saved = get_mongo_collection("movie_detail_cache").find_one_and_replace(
+            {"cache_key": cache_data["cache_key"]},
+            cache_data,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    return str(saved["_id"])
@@ -1,4 +1,6 @@
 from flask import Blueprint, request, jsonify
+from config import HTTP_CACHE_POLICIES
+from utils.http_cache import conditional_get
 from .controller import (
     get_movie_detail_cache,
     invalidate_movie_cache,
@@ -9,7 +11,17 @@ from .controller import (
 movie_detail_cache_bp = Blueprint('movie_detail_cache', __name__)
 
 
+def _cache_version(cache_data):
+    """Versão do cache de detalhes: muda só quando o cache é recriado"""
+    return f"{cache_data.get('cache_key')}:{cache_data.get('created_at')}"
+
+
+def _render_json(data, status, headers):
+    return jsonify(data)
+
+
 @movie_detail_cache_bp.route('/movie-detail/<movie_id>', methods=['GET'])
+@conditional_get(**HTTP_CACHE_POLICIES["movie_detail"], version=_cache_version, render=_render_json)
 def get_movie_detail(movie_id):
     """Endpoint para buscar cache completo de detalhes do filme"""
     try:
@@ -18,7 +30,7 @@ def get_movie_detail(movie_id):
         cache_data, status_code = get_movie_detail_cache(movie_id, language)
         
         if status_code == 200:
-            return jsonify(cache_data), 200
+            return cache_data, 200
         else:
             return jsonify(cache_data), status_code
             
@@ -28,7 +40,7 @@ def get_movie_detail(movie_id):
 
 @movie_detail_cache_bp.route('/movie-detail/<movie_id>/invalidate', methods=['POST'])
 def invalidate_cache(movie_id):
-    """Endpoint para invalidar cache de um filme"""
+    """Endpoint para invalidar cache de um filme (a memória dos outros workers expira pelo TTL)"""
     try:
         data = request.get_json() or {}
         language = data.get('language')
@@ -1,7 +1,12 @@
 import asyncio
 import concurrent.futures
 from datetime import datetime
-from config import get_mongo_collection
+from config import (
+    get_mongo_collection,
+    PREPOPULATE_BATCH_SIZE,
+    PREPOPULATE_MOVIE_TIMEOUT,
+    PREPOPULATE_MOVIE_WORKERS,
+)
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -9,42 +14,73 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Importa os controllers existentes
 from directors.controller import get_director_info
 from music.controller import get_movie_soundtrack
+from recommendations.controller import get_recommendation_by_tconst
+from utils.metrics import span, submit
+from utils.negative_cache import count_known_missing
+from utils.orchestration import run_parallel
 
 
-def prepopulate_movie_data(movie_data, language="pt"):
+# Diretor e trilha sonora dos filmes pré-populados; separado do pool da página de detalhes
+_prepopulate_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=PREPOPULATE_MOVIE_WORKERS,
+    thread_name_prefix="prepopulate"
+)
+
+# Campos do filme usados pela pré-população
+PREPOPULATE_MOVIE_FIELDS = {"tconst": 1, "title": 1, "year": 1, "director": 1}
+
+
+def prepopulate_movie_data(movie_data, language="pt", has_director=None, has_soundtrack=None):
     """Pré-popula dados de diretor e trilha sonora para um filme"""
     try:
         
-        # Verifica se já tem dados salvos
-        has_director = _check_existing_director(movie_data.get('director'))
-        has_soundtrack = _check_existing_soundtrack(movie_data.get('title'), movie_data.get('year'))
+        # Verifica se já tem dados salvos (a menos que já tenha sido verificado em lote)
+        if has_director is None:
+            has_director = _check_existing_director(movie_data.get('director'))
+        if has_soundtrack is None:
+            has_soundtrack = _check_existing_soundtrack(movie_data.get('title'), movie_data.get('year'))
         
-        if has_director and has_soundtrack:
+        needs_director = not has_director and bool(movie_data.get('director'))
+        
+        if not needs_director and has_soundtrack:
             return {"status": "already_exists", "message": "Dados já existem"}
         
-        # Pré-popula dados em paralelo
-        results = {}
+        # Pré-popula diretor e trilha sonora em paralelo
+        tasks = {}
         
         # Pré-popula diretor se não existe
-        if not has_director and movie_data.get('director'):
-            director_data, director_status = get_director_info(
+        if needs_director:
+            tasks['director'] = lambda: get_director_info(
                 movie_data['director'], 
                 movie_data.get('tconst'), 
                 language
             )
-            if director_status == 200:
-                results['director'] = director_data
         
         # Pré-popula trilha sonora se não existe
         if not has_soundtrack:
-            soundtrack_data, soundtrack_status = get_movie_soundtrack(
+            tasks['soundtrack'] = lambda: get_movie_soundtrack(
                 movie_data['title'],
                 movie_data.get('year'),
                 movie_data.get('director'),
                 language
             )
-            if soundtrack_status == 200:
-                results['soundtrack'] = soundtrack_data
+        
+        task_results, timed_out = run_parallel(
+            tasks, timeout=PREPOPULATE_MOVIE_TIMEOUT, executor=_prepopulate_executor
+        )
+        
+        results = {}
+        for name, task_result in task_results.items():
+            if task_result and task_result[1] == 200:
+                results[name] = task_result[0]
+        
+        if timed_out:
+            return {
+                "status": "partial",
+                "message": "Tempo esgotado para parte dos dados",
+                "results": results,
+                "timed_out": timed_out
+            }
         
         return {
             "status": "success", 
@@ -59,59 +95,122 @@ def prepopulate_movie_data(movie_data, language="pt"):
 def prepopulate_all_movies(language="pt", max_workers=3):
     """Pré-popula dados para todos os filmes na coleção recommendations"""
     try:
-        collection = get_mongo_collection("recommendations")
+        counts = {"success": 0, "already_exists": 0, "partial": 0, "error": 0}
+        total_movies = 0
         
-        # Busca todos os filmes
-        movies = list(collection.find({}))
-        total_movies = len(movies)
-        
-        
-        # Processa em paralelo
+        # Processa em paralelo, um lote por vez (memória constante)
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            
-            for movie in movies:
-                # Converte ObjectId para string
-                movie["_id"] = str(movie["_id"])
-                future = executor.submit(prepopulate_movie_data, movie, language)
-                futures.append(future)
-            
-            # Coleta resultados
-            results = []
-            for i, future in enumerate(concurrent.futures.as_completed(futures)):
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    results.append({"status": "error", "message": str(e)})
-        
-        # Estatísticas finais
-        success_count = sum(1 for r in results if r.get('status') == 'success')
-        already_exists_count = sum(1 for r in results if r.get('status') == 'already_exists')
-        error_count = sum(1 for r in results if r.get('status') == 'error')
-        
+            for batch in iter_movie_batches():
+                total_movies += len(batch)
+                pending = find_movies_needing_work(batch)
+                counts["already_exists"] += len(batch) - len(pending)
+                
+                futures = [
+                    submit(executor, prepopulate_movie_data, movie, language, has_director, has_soundtrack)
+                    for movie, has_director, has_soundtrack in pending
+                ]
+                
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        status = future.result().get('status')
+                    except Exception as e:
+                        status = 'error'
+                    counts[status if status in counts else 'error'] += 1
         
         return {
             "status": "completed",
             "total_movies": total_movies,
-            "success_count": success_count,
-            "already_exists_count": already_exists_count,
-            "error_count": error_count,
-            "results": results
+            "success_count": counts["success"],
+            "already_exists_count": counts["already_exists"],
+            "partial_count": counts["partial"],
+            "error_count": counts["error"]
         }
         
     except Exception as e:
         return {"status": "error", "message": f"Erro geral: {str(e)}"}
 
 
-def _check_existing_director(director_name):
-    """Verifica se diretor já existe no MongoDB"""
+def iter_movie_batches(batch_size=PREPOPULATE_BATCH_SIZE):
+    """Percorre a coleção recommendations em lotes, só com os campos necessários"""
+    collection = get_mongo_collection("recommendations")
+    cursor = collection.find({}, PREPOPULATE_MOVIE_FIELDS).batch_size(batch_size)
+    
+    batch = []
+    for movie in cursor:
+        # Converte ObjectId para string
+        movie["_id"] = str(movie["_id"])
+        batch.append(movie)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    
+    if batch:
+        yield batch
+
+
+def find_movies_needing_work(movies):
+    """
+    Verifica diretores e trilhas sonoras de um lote com uma consulta $in por coleção.
+    
+    Retorna apenas os filmes que precisam de pré-população, como
+    (filme, tem_diretor, tem_trilha_sonora).
+    """
+    director_names = set()
+    cache_keys = set()
+    for movie in movies:
+        director_names.update(_director_names(movie.get('director')))
+        cache_keys.add(_soundtrack_cache_key(movie.get('title'), movie.get('year')))
+    
+    with span("mongo", "directors.find"):
+        existing_directors = set(
+            director["name"]
+            for director in get_mongo_collection("directors").find(
+                {"name": {"$in": list(director_names)}}, {"name": 1}
+            )
+        )
+    with span("mongo", "movie_soundtracks.find"):
+        existing_soundtracks = set(
+            soundtrack["cache_key"]
+            for soundtrack in get_mongo_collection("movie_soundtracks").find(
+                {"cache_key": {"$in": list(cache_keys)}}, {"cache_key": 1}
+            )
+        )
+    
+    pending = []
+    for movie in movies:
+        names = _director_names(movie.get('director'))
+        has_director = bool(names) and all(name in existing_directors for name in names)
+        has_soundtrack = _soundtrack_cache_key(movie.get('title'), movie.get('year')) in existing_soundtracks
+        
+        needs_director = not has_director and bool(names)
+        if needs_director or not has_soundtrack:
+            pending.append((movie, has_director, has_soundtrack))
+    
+    return pending
+
+
+def _director_names(director_name):
+    """Separa filmes com múltiplos diretores (separados por vírgula)"""
     if not director_name:
+        return []
+    return [name.strip() for name in director_name.split(',') if name.strip()]
+
+
+def _soundtrack_cache_key(movie_title, movie_year):
+    """Mesma chave usada pelo music.controller"""
+    return f"{movie_title}_{movie_year}" if movie_year else movie_title
+
+
+def _check_existing_director(director_name):
+    """Verifica se diretor (ou todos os diretores) já existe no MongoDB"""
+    names = _director_names(director_name)
+    if not names:
         return False
     
     try:
         directors_collection = get_mongo_collection("directors")
-        return directors_collection.find_one({"name": director_name}) is not None
+        with span("mongo", "directors.count_documents"):
+            return directors_collection.count_documents({"name": {"$in": names}}) >= len(set(names))
     except Exception:
         return False
 
@@ -120,8 +219,9 @@ def _check_existing_soundtrack(movie_title, movie_year):
     """Verifica se trilha sonora já existe no MongoDB"""
     try:
         soundtracks_collection = get_mongo_collection("movie_soundtracks")
-        cache_key = f"{movie_title}_{movie_year}" if movie_year else movie_title
-        return soundtracks_collection.find_one({"cache_key": cache_key}) is not None
+        cache_key = _soundtrack_cache_key(movie_title, movie_year)
+        with span("mongo", "movie_soundtracks.find_one"):
+            return soundtracks_collection.find_one({"cache_key": cache_key}, {"_id": 1}) is not None
     except Exception:
         return False
 
@@ -141,6 +241,9 @@ def get_prepopulate_stats():
         recommendations_collection = get_mongo_collection("recommendations")
         total_movies = recommendations_collection.count_documents({})
         
+        # Itens que não foram encontrados e aguardam nova tentativa
+        known_missing = count_known_missing()
+        
         # Cálculo de cobertura
         director_coverage = (total_directors / total_movies * 100) if total_movies > 0 else 0
         soundtrack_coverage = (total_soundtracks / total_movies * 100) if total_movies > 0 else 0
@@ -149,6 +252,8 @@ def get_prepopulate_stats():
             "total_movies": total_movies,
             "total_directors": total_directors,
             "total_soundtracks": total_soundtracks,
+            "known_missing_directors": known_missing.get("director", 0),
+            "known_missing_soundtracks": known_missing.get("soundtrack", 0),
             "director_coverage": round(director_coverage, 1),
             "soundtrack_coverage": round(soundtrack_coverage, 1),
             "overall_coverage": round((director_coverage + soundtrack_coverage) / 2, 1)
@@ -161,13 +266,12 @@ def get_prepopulate_stats():
 def prepopulate_single_movie(movie_id, language="pt"):
     """Pré-popula dados para um filme específico"""
     try:
-        collection = get_mongo_collection("recommendations")
-        movie = collection.find_one({"tconst": movie_id})
+        with span("mongo", "recommendations.find_one"):
+            movie, status_code = get_recommendation_by_tconst(movie_id)
         
-        if not movie:
+        if status_code != 200:
             return {"status": "error", "message": "Filme não encontrado"}
         
-        movie["_id"] = str(movie["_id"])
         return prepopulate_movie_data(movie, language)
         
     except Exception as e:
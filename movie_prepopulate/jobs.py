@@ -0,0 +1,337 @@
+# Jobs de pré-população em segundo plano, com progresso salvo no MongoDB
+import concurrent.futures
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument, UpdateOne
+
+from config import (
+    get_mongo_collection,
+    PREPOPULATE_JOB_RUNNERS,
+    PREPOPULATE_MAX_WORKERS,
+    PREPOPULATE_JOB_STALE_SECONDS,
+)
+from movie_prepopulate.controller import (
+    prepopulate_movie_data,
+    iter_movie_batches,
+    find_movies_needing_work,
+)
+
+JOBS_COLLECTION = "prepopulate_jobs"
+ITEMS_COLLECTION = "prepopulate_job_items"
+
+# Filmes com estes status não são reprocessados ao retomar um job (erros são tentados de novo)
+FINISHED_ITEM_STATUSES = ["success", "already_exists", "partial"]
+ITEM_STATUSES = FINISHED_ITEM_STATUSES + ["error"]
+
+_job_runner = concurrent.futures.ThreadPoolExecutor(
+    max_workers=PREPOPULATE_JOB_RUNNERS,
+    thread_name_prefix="prepopulate-job"
+)
+
+# Jobs em execução neste processo e sinal de encerramento do worker
+_running_jobs = set()
+_stopping = threading.Event()
+
+
+class JobInterrupted(Exception):
+    """O worker está sendo encerrado (ex.: max_requests ou deploy do gunicorn)"""
+
+
+def submit_prepopulate_job(language="pt", max_workers=3):
+    """Cria um job de pré-população de todos os filmes e o coloca na fila"""
+    jobs = get_mongo_collection(JOBS_COLLECTION)
+    
+    try:
+        now = datetime.utcnow()
+        job = {
+            "_id": uuid.uuid4().hex,
+            "status": "queued",
+            "language": language,
+            "max_workers": max_workers,
+            "total_movies": get_mongo_collection("recommendations").estimated_document_count(),
+            "processed": 0,
+            "counts": {status: 0 for status in ITEM_STATUSES},
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        jobs.insert_one(job)
+        
+        return _start_job(job["_id"])
+        
+    except Exception as e:
+        return {"error": f"Erro ao criar job de pré-população: {str(e)}"}, 500
+
+
+def resume_prepopulate_job(job_id):
+    """Retoma um job interrompido, travado ou com erros, pulando os filmes já concluídos"""
+    try:
+        return _start_job(job_id)
+    except Exception as e:
+        return {"error": f"Erro ao retomar job: {str(e)}"}, 500
+
+
+def get_prepopulate_job(job_id, errors_limit=100):
+    """Retorna o progresso de um job e os erros por filme"""
+    try:
+        job = get_mongo_collection(JOBS_COLLECTION).find_one({"_id": job_id})
+        
+        if not job:
+            return {"error": "Job não encontrado"}, 404
+        
+        errors = list(
+            get_mongo_collection(ITEMS_COLLECTION)
+            .find(
+                {"job_id": job_id, "status": "error"},
+                {"_id": 0, "tconst": 1, "title": 1, "message": 1, "updated_at": 1}
+            )
+            .limit(errors_limit)
+        )
+        
+        response = _serialize_job(job)
+        response["errors"] = errors
+        return response, 200
+        
+    except Exception as e:
+        return {"error": f"Erro ao buscar job: {str(e)}"}, 500
+
+
+def _start_job(job_id):
+    """Marca o job como em execução (se ninguém estiver rodando) e envia para o worker"""
+    jobs = get_mongo_collection(JOBS_COLLECTION)
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=PREPOPULATE_JOB_STALE_SECONDS)
+    
+    job = jobs.find_one_and_update(
+        {
+            "_id": job_id,
+            "$or": [
+                # Jobs concluídos podem ser retomados para tentar de novo os filmes com erro
+                {"status": {"$in": ["queued", "failed", "completed"]}},
+                # Job "running" sem progresso recente: o processo que o executava morreu
+                {"status": "running", "updated_at": {"$lt": stale_before}},
+            ],
+        },
+        {"$set": {"status": "running", "owner": _owner(), "updated_at": now}},
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if not job:
+        if jobs.count_documents({"_id": job_id}, limit=1) == 0:
+            return {"error": "Job não encontrado"}, 404
+        return {"error": "Job já está em execução"}, 409
+    
+    _job_runner.submit(_run_job, job_id)
+    
+    response = _serialize_job(job)
+    response["status_url"] = f"/api/prepopulate/jobs/{job_id}"
+    return response, 202
+
+
+def _run_job(job_id):
+    """Processa os filmes do job em lotes, salvando o resultado de cada um"""
+    jobs = get_mongo_collection(JOBS_COLLECTION)
+    job = jobs.find_one({"_id": job_id})
+    _running_jobs.add(job_id)
+    
+    try:
+        jobs.update_one({"_id": job_id, "started_at": None}, {"$set": {"started_at": datetime.utcnow()}})
+        
+        # Jobs criados antes do limite podem ter um valor maior salvo
+        max_workers = min(job["max_workers"], PREPOPULATE_MAX_WORKERS)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch in iter_movie_batches():
+                _heartbeat(job_id)
+                _process_batch(job, batch, executor)
+                if _stopping.is_set():
+                    raise JobInterrupted("Job interrompido pelo encerramento do worker")
+        
+        now = datetime.utcnow()
+        jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "completed", "finished_at": now, "updated_at": now}}
+        )
+        
+    except Exception as e:
+        # Só o dono atual marca a falha (outro processo pode ter retomado o job travado)
+        jobs.update_one(
+            {"_id": job_id, "owner": _owner()},
+            {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.utcnow()}}
+        )
+    
+    finally:
+        _running_jobs.discard(job_id)
+
+
+def _heartbeat(job_id):
+    """Mostra que o job continua vivo mesmo em lotes sem filmes novos"""
+    now = datetime.utcnow()
+    get_mongo_collection(JOBS_COLLECTION).update_one(
+        {"_id": job_id, "owner": _owner()},
+        {"$set": {"updated_at": now, "heartbeat_at": now}}
+    )
+
+
+def stop_running_jobs():
+    """
+    Encerramento do worker (worker_exit do gunicorn.conf.py): interrompe os jobs deste processo e os marca como falhos na hora,
+    em vez de esperar PREPOPULATE_JOB_STALE_SECONDS; os filmes concluídos são pulados ao retomar
+    """
+    _stopping.set()
+    if not _running_jobs:
+        return
+    
+    now = datetime.utcnow()
+    get_mongo_collection(JOBS_COLLECTION).update_many(
+        {"_id": {"$in": list(_running_jobs)}, "status": "running", "owner": _owner()},
+        {"$set": {"status": "failed", "error": "Job interrompido pelo encerramento do worker", "updated_at": now}}
+    )
+
+
+def _process_batch(job, batch, executor):
+    """Pré-popula um lote de filmes, pulando os já concluídos numa execução anterior"""
+    items = get_mongo_collection(ITEMS_COLLECTION)
+    
+    previous_status = {
+        item["tconst"]: item["status"]
+        for item in items.find(
+            {"job_id": job["_id"], "tconst": {"$in": [movie.get("tconst") for movie in batch]}},
+            {"tconst": 1, "status": 1}
+        )
+    }
+    
+    batch = [
+        movie for movie in batch
+        if previous_status.get(movie.get("tconst")) not in FINISHED_ITEM_STATUSES
+    ]
+    if not batch:
+        return
+    
+    # Uma consulta por coleção para saber o que já existe no lote
+    pending = find_movies_needing_work(batch)
+    pending_tconsts = set(movie.get("tconst") for movie, _, _ in pending)
+    
+    already_exists = []
+    for movie in batch:
+        if movie.get("tconst") in pending_tconsts:
+            continue
+        if movie.get("tconst") in previous_status:
+            # Falhou antes e agora já existe: ajusta os contadores individualmente
+            _record_item(job["_id"], movie, {"status": "already_exists"})
+        else:
+            already_exists.append(movie)
+    
+    _record_already_exists(job["_id"], already_exists)
+    
+    futures = {
+        executor.submit(prepopulate_movie_data, movie, job["language"], has_director, has_soundtrack): movie
+        for movie, has_director, has_soundtrack in pending
+    }
+    
+    for future in concurrent.futures.as_completed(futures):
+        if _stopping.is_set():
+            # Filmes ainda não iniciados ficam para quando o job for retomado
+            for pending_future in futures:
+                pending_future.cancel()
+        
+        if future.cancelled():
+            continue
+        
+        movie = futures[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+        
+        _record_item(job["_id"], movie, result)
+
+
+def _record_already_exists(job_id, movies):
+    """Registra de uma vez os filmes do lote que não precisavam de pré-população"""
+    if not movies:
+        return
+    
+    now = datetime.utcnow()
+    result = get_mongo_collection(ITEMS_COLLECTION).bulk_write([
+        UpdateOne(
+            {"job_id": job_id, "tconst": movie.get("tconst")},
+            {"$setOnInsert": {"title": movie.get("title"), "status": "already_exists", "updated_at": now}},
+            upsert=True
+        )
+        for movie in movies
+    ], ordered=False)
+    
+    get_mongo_collection(JOBS_COLLECTION).update_one(
+        {"_id": job_id},
+        {
+            "$inc": {"processed": result.upserted_count, "counts.already_exists": result.upserted_count},
+            "$set": {"updated_at": now}
+        }
+    )
+
+
+def _record_item(job_id, movie, result):
+    """Salva o resultado de um filme e atualiza os contadores do job"""
+    items = get_mongo_collection(ITEMS_COLLECTION)
+    jobs = get_mongo_collection(JOBS_COLLECTION)
+    now = datetime.utcnow()
+    
+    status = result.get("status")
+    if status not in ITEM_STATUSES:
+        status = "error"
+    
+    previous = items.find_one_and_update(
+        {"job_id": job_id, "tconst": movie.get("tconst")},
+        {"$set": {
+            "title": movie.get("title"),
+            "status": status,
+            "message": result.get("message"),
+            "updated_at": now,
+        }},
+        projection={"status": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    
+    # Um filme que falhou antes e foi reprocessado não conta duas vezes
+    increments = {f"counts.{status}": 1}
+    if previous:
+        previous_key = f"counts.{previous['status']}"
+        increments[previous_key] = increments.get(previous_key, 0) - 1
+    else:
+        increments["processed"] = 1
+    
+    jobs.update_one({"_id": job_id}, {"$inc": increments, "$set": {"updated_at": now}})
+
+
+def _serialize_job(job):
+    """Formata o job para a resposta da API"""
+    counts = job.get("counts", {})
+    return {
+        "job_id": job["_id"],
+        "status": job.get("status"),
+        "language": job.get("language"),
+        "max_workers": job.get("max_workers"),
+        "total_movies": job.get("total_movies", 0),
+        "processed": job.get("processed", 0),
+        "success_count": counts.get("success", 0),
+        "already_exists_count": counts.get("already_exists", 0),
+        "partial_count": counts.get("partial", 0),
+        "error_count": counts.get("error", 0),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "updated_at": job.get("updated_at"),
+        "heartbeat_at": job.get("heartbeat_at"),
+    }
+
+
+def _owner():
+    """Identifica o processo que está executando o job"""
+    return f"{socket.gethostname()}:{os.getpid()}"
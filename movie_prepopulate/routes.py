@@ -1,33 +1,61 @@
 from flask import Blueprint, request, jsonify
+from config import PREPOPULATE_MAX_WORKERS
 from .controller import (
     prepopulate_movie_data,
-    prepopulate_all_movies,
     prepopulate_single_movie,
     get_prepopulate_stats
 )
+from .jobs import (
+    submit_prepopulate_job,
+    get_prepopulate_job,
+    resume_prepopulate_job
+)
 
 movie_prepopulate_bp = Blueprint('movie_prepopulate', __name__)
 
 
 @movie_prepopulate_bp.route('/prepopulate/all', methods=['POST'])
 def prepopulate_all():
-    """Endpoint para pré-popular dados de todos os filmes"""
+    """Endpoint para criar um job em segundo plano que pré-popula todos os filmes"""
     try:
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         language = data.get('language', 'pt')
         max_workers = data.get('max_workers', 3)
         
-        result = prepopulate_all_movies(language, max_workers)
+        # bool é subclasse de int, mas true/false não são um número de threads
+        if not isinstance(max_workers, int) or isinstance(max_workers, bool) or max_workers < 1:
+            return jsonify({"error": "max_workers deve ser um inteiro positivo"}), 400
+        max_workers = min(max_workers, PREPOPULATE_MAX_WORKERS)
         
-        if result.get('status') == 'completed':
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 500
+        result, status_code = submit_prepopulate_job(language, max_workers)
+        return jsonify(result), status_code
             
     except Exception as e:
         return jsonify({"error": "Erro interno do servidor"}), 500
 
 
+@movie_prepopulate_bp.route('/prepopulate/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Endpoint para acompanhar o progresso de um job de pré-população"""
+    try:
+        result, status_code = get_prepopulate_job(job_id)
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({"error": "Erro interno do servidor"}), 500
+
+
+@movie_prepopulate_bp.route('/prepopulate/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """Endpoint para retomar um job interrompido"""
+    try:
+        result, status_code = resume_prepopulate_job(job_id)
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({"error": "Erro interno do servidor"}), 500
+
+
 @movie_prepopulate_bp.route('/prepopulate/<movie_id>', methods=['POST'])
 def prepopulate_single(movie_id):
     """Endpoint para pré-popular dados de um filme específico"""
@@ -37,7 +65,7 @@ def prepopulate_single(movie_id):
         
         result = prepopulate_single_movie(movie_id, language)
         
-        if result.get('status') in ['success', 'already_exists']:
+        if result.get('status') in ['success', 'already_exists', 'partial']:
             return jsonify(result), 200
         else:
             return jsonify(result), 500
@@ -74,7 +102,7 @@ def prepopulate_movie():
         
         result = prepopulate_movie_data(data, language)
         
-        if result.get('status') in ['success', 'already_exists']:
+        if result.get('status') in ['success', 'already_exists', 'partial']:
             return jsonify(result), 200
         else:
             return jsonify(result), 500
@@ -0,0 +1,99 @@
+# Trilhas sonoras para o modo ASGI (asgi.py): mesma sequência do controller.py, com a OpenAI
+# assíncrona. MongoDB e Spotify (spotipy é síncrono) usam as funções do controller.py numa thread
+import asyncio
+from config import OPENAI_API_KEY
+from music.controller import (
+    _build_soundtrack,
+    _description_translation_request,
+    _find_soundtrack,
+    _new_soundtrack_document,
+    _parse_track_info,
+    _save_soundtrack,
+    _search_tracks_on_spotify,
+    _serialize_soundtrack,
+    _soundtrack_cache_key,
+    _soundtrack_error,
+    _soundtrack_not_found,
+    _track_info_request,
+)
+from utils.clients import chat_completion_async
+from utils.metrics import count_cache
+from utils.negative_cache import is_known_missing, record_missing, clear_missing
+from utils.translations import translate_text_async
+
+
+async def get_movie_soundtrack_async(movie_title, movie_year=None, movie_director=None, language="pt"):
+    """Busca a trilha sonora de um filme usando GPT e Spotify"""
+    try:
+        cache_key = _soundtrack_cache_key(movie_title, movie_year)
+        soundtrack_data = await asyncio.to_thread(_find_soundtrack, cache_key)
+        count_cache("soundtracks_mongo", soundtrack_data is not None)
+
+        if soundtrack_data:
+            _serialize_soundtrack(soundtrack_data)
+
+            if language != "pt" and soundtrack_data.get("description"):
+                soundtrack_data["description"] = await _translate_description_async(
+                    soundtrack_data["description"], language
+                )
+
+            return soundtrack_data, 200
+
+        if await asyncio.to_thread(is_known_missing, "soundtrack", cache_key):
+            return _soundtrack_not_found(language, known_missing=True), 404
+
+        soundtrack_info = await _search_soundtrack_with_gpt_and_spotify_async(
+            movie_title, movie_year, movie_director, language
+        )
+
+        if soundtrack_info:
+            await asyncio.to_thread(clear_missing, "soundtrack", cache_key)
+
+            soundtrack_info = await asyncio.to_thread(
+                _save_soundtrack, cache_key, _new_soundtrack_document(cache_key, soundtrack_info)
+            )
+            return _serialize_soundtrack(soundtrack_info), 200
+
+        await asyncio.to_thread(record_missing, "soundtrack", cache_key)
+        return _soundtrack_not_found(language), 404
+
+    except Exception as e:
+        return _soundtrack_error(language), 500
+
+
+async def _translate_description_async(description, target_language):
+    """Traduz a descrição, reaproveitando traduções já salvas"""
+    return await translate_text_async(
+        "soundtrack_description", description, target_language,
+        lambda description: _description_translation_request(description, target_language)
+    )
+
+
+async def _search_soundtrack_with_gpt_and_spotify_async(movie_title, movie_year=None, movie_director=None, language="pt"):
+    """Usa GPT para identificar as principais músicas do filme e busca no Spotify"""
+    try:
+        track_info = await _get_track_info_from_gpt_async(movie_title, movie_year, movie_director, language)
+
+        if not track_info or not track_info.get("tracks"):
+            return None
+
+        # As buscas no Spotify (já paralelas e com prazo) rodam numa thread
+        spotify_tracks = await asyncio.to_thread(_search_tracks_on_spotify, track_info["tracks"])
+
+        return _build_soundtrack(movie_title, movie_year, movie_director, track_info, spotify_tracks)
+
+    except Exception as e:
+        return None
+
+
+async def _get_track_info_from_gpt_async(movie_title, movie_year=None, movie_director=None, language="pt"):
+    """Usa GPT para identificar as principais músicas do filme"""
+    if not OPENAI_API_KEY:
+        return None
+
+    try:
+        content = await chat_completion_async(_track_info_request(movie_title, movie_year, movie_director, language))
+        return _parse_track_info(content)
+
+    except Exception as e:
+        return None
@@ -1,87 +1,146 @@
-import requests
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from openai import OpenAI
-from config import get_mongo_collection, OPENAI_API_KEY, SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pymongo import ReturnDocument
+from config import (
+    get_mongo_collection,
+    OPENAI_API_KEY,
+    SPOTIFY_CLIENT_ID,
+    SPOTIFY_CLIENT_SECRET,
+    SPOTIFY_SEARCH_WORKERS,
+    SPOTIFY_TRACK_TIMEOUT,
+    SPOTIFY_TRACK_CACHE_SIZE,
+    SPOTIFY_TRACK_CACHE_TTL,
+)
+from utils.cache import TTLCache
+from utils.clients import chat_completion, get_spotify_client
+from utils.export import ndjson_response, since_filter
+from utils.metrics import count_cache, register_cache, span, submit
+from utils.negative_cache import is_known_missing, record_missing, clear_missing
+from utils.resilience import guarded_call
+from utils.translations import translate_text
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-def _translate_soundtrack_description(description, target_language):
-    """Traduz a descrição da trilha sonora"""
-    try:
-        if not OPENAI_API_KEY or target_language == "pt":
-            return description
-        
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        prompt = f"Translate the following soundtrack description to {target_language}: {description}"
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional translator. Translate movie soundtrack descriptions accurately."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,  # Reduzido para resposta mais rápida
-            temperature=0.3,
-            timeout=3  # Timeout de 3 segundos
-        )
-        
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return description
+# Pool compartilhado para as buscas de músicas no Spotify
+_spotify_search_executor = ThreadPoolExecutor(
+    max_workers=SPOTIFY_SEARCH_WORKERS,
+    thread_name_prefix="spotify-search"
+)
+
+# Cache das buscas por título + artista (as mesmas músicas aparecem em vários filmes)
+_spotify_track_cache = TTLCache(
+    max_size=SPOTIFY_TRACK_CACHE_SIZE,
+    ttl_seconds=SPOTIFY_TRACK_CACHE_TTL
+)
+register_cache("spotify_tracks", _spotify_track_cache)
+_NOT_CACHED = object()
+
+
+def _description_translation_request(description, target_language):
+    """Parâmetros da chamada à OpenAI que traduz a descrição da trilha sonora"""
+    prompt = f"Translate the following soundtrack description to {target_language}: {description}"
+    
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You are a professional translator. Translate movie soundtrack descriptions accurately."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 150,  # Reduzido para resposta mais rápida
+        "temperature": 0.3,
+        "timeout": 3  # Timeout de 3 segundos
+    }
+
+
+def _serialize_soundtrack(soundtrack):
+    """Converte _id e created_at do documento para string"""
+    soundtrack["_id"] = str(soundtrack["_id"])
+    if isinstance(soundtrack.get("created_at"), datetime):
+        soundtrack["created_at"] = soundtrack["created_at"].isoformat()
+    return soundtrack
+
+
+def _soundtrack_cache_key(movie_title, movie_year=None):
+    """Chave da trilha sonora no MongoDB (título e ano, quando houver)"""
+    return f"{movie_title}_{movie_year}" if movie_year else movie_title
 
 
 def get_movie_soundtrack(movie_title, movie_year=None, movie_director=None, language="pt"):
     """Busca a trilha sonora de um filme usando GPT e Spotify"""
-    collection = get_mongo_collection("movie_soundtracks")
-    
     try:
         # Primeiro tenta buscar no banco de dados
-        cache_key = f"{movie_title}_{movie_year}" if movie_year else movie_title
-        soundtrack_data = collection.find_one({"cache_key": cache_key})
+        cache_key = _soundtrack_cache_key(movie_title, movie_year)
+        soundtrack_data = _find_soundtrack(cache_key)
+        count_cache("soundtracks_mongo", soundtrack_data is not None)
         
         if soundtrack_data:
-            # Converte ObjectId para string
-            soundtrack_data["_id"] = str(soundtrack_data["_id"])
+            # Converte ObjectId e datas para tipos serializáveis em JSON
+            _serialize_soundtrack(soundtrack_data)
             
             # Traduz a descrição se necessário
             if language != "pt" and soundtrack_data.get("description"):
-                # Tradução simples sem cache
-                soundtrack_data["description"] = _translate_soundtrack_description(
-                    soundtrack_data["description"], 
-                    language
-                )
+                soundtrack_data["description"] = _translate_description(soundtrack_data["description"], language)
             
             return soundtrack_data, 200
         
+        # Trilha sonora que não foi encontrada recentemente: não tenta de novo até o backoff
+        if is_known_missing("soundtrack", cache_key):
+            return _soundtrack_not_found(language, known_missing=True), 404
+        
         # Se não encontrou no banco, busca usando GPT + Spotify
-        soundtrack_info = _get_soundtrack_with_gpt_and_spotify(movie_title, movie_year, movie_director, language)
+        soundtrack_info = _search_soundtrack_with_gpt_and_spotify(movie_title, movie_year, movie_director, language)
         
         if soundtrack_info:
-            # Adiciona cache_key para futuras consultas
-            soundtrack_info["cache_key"] = cache_key
+            clear_missing("soundtrack", cache_key)
             
-            # Salva no banco para futuras consultas
-            result = collection.insert_one(soundtrack_info)
-            soundtrack_info["_id"] = str(result.inserted_id)
-            return soundtrack_info, 200
+            # Salva no banco para futuras consultas (se outro processo salvou antes, usa o existente)
+            soundtrack_info = _save_soundtrack(cache_key, _new_soundtrack_document(cache_key, soundtrack_info))
+            return _serialize_soundtrack(soundtrack_info), 200
         
-        error_message = "Não foi possível encontrar a trilha sonora do filme" if language == "pt" else "Could not find movie soundtrack"
-        return {"error": error_message}, 404
+        record_missing("soundtrack", cache_key)
+        return _soundtrack_not_found(language), 404
         
     except Exception as e:
-        error_message = "Erro ao buscar trilha sonora" if language == "pt" else "Error searching soundtrack"
-        return {"error": error_message}, 500
+        return _soundtrack_error(language), 500
+
+
+def _new_soundtrack_document(cache_key, soundtrack_info):
+    """Adiciona cache_key (para futuras consultas) e created_at (índice TTL) à trilha encontrada"""
+    soundtrack_info["cache_key"] = cache_key
+    soundtrack_info["created_at"] = datetime.utcnow()
+    return soundtrack_info
+
+
+def _soundtrack_not_found(language="pt", known_missing=False):
+    """Resposta 404 de trilha sonora não encontrada"""
+    error_message = "Não foi possível encontrar a trilha sonora do filme" if language == "pt" else "Could not find movie soundtrack"
+    if known_missing:
+        return {"error": error_message, "known_missing": True}
+    return {"error": error_message}
 
 
-def _get_soundtrack_with_gpt_and_spotify(movie_title, movie_year=None, movie_director=None, language="pt"):
+def _soundtrack_error(language="pt"):
+    """Resposta 500 de erro na busca da trilha sonora"""
+    error_message = "Erro ao buscar trilha sonora" if language == "pt" else "Error searching soundtrack"
+    return {"error": error_message}
+
+
+def _translate_description(description, target_language):
+    """Traduz a descrição, reaproveitando traduções já salvas"""
+    return translate_text(
+        "soundtrack_description", description, target_language,
+        lambda description: _description_translation_request(description, target_language)
+    )
+
+
+def _search_soundtrack_with_gpt_and_spotify(movie_title, movie_year=None, movie_director=None, language="pt"):
     """Usa GPT para identificar as principais músicas do filme e busca no Spotify"""
     try:
         # 1. Usa GPT para identificar as principais músicas do filme
-        track_info = _get_track_info_with_gpt(movie_title, movie_year, movie_director, language)
+        track_info = _get_track_info_from_gpt(movie_title, movie_year, movie_director, language)
         
         if not track_info or not track_info.get("tracks"):
             return None
@@ -89,122 +148,133 @@ def _get_soundtrack_with_gpt_and_spotify(movie_title, movie_year=None, movie_dir
         # 2. Busca as músicas no Spotify
         spotify_tracks = _search_tracks_on_spotify(track_info["tracks"])
         
-        return {
-            "movie_title": movie_title,
-            "movie_year": movie_year,
-            "movie_director": movie_director,
-            "tracks": spotify_tracks,
-            "description": track_info.get("description", ""),
-            "source": "gpt_spotify"
-        }
+        return _build_soundtrack(movie_title, movie_year, movie_director, track_info, spotify_tracks)
         
     except Exception as e:
         return None
 
 
-def _get_track_info_with_gpt(movie_title, movie_year=None, movie_director=None, language="pt"):
+def _build_soundtrack(movie_title, movie_year, movie_director, track_info, spotify_tracks):
+    """Trilha sonora com as músicas sugeridas pelo GPT e os dados do Spotify"""
+    return {
+        "movie_title": movie_title,
+        "movie_year": movie_year,
+        "movie_director": movie_director,
+        "tracks": spotify_tracks,
+        "description": track_info.get("description", ""),
+        "source": "gpt_spotify"
+    }
+
+
+def _get_track_info_from_gpt(movie_title, movie_year=None, movie_director=None, language="pt"):
     """Usa GPT para identificar as principais músicas do filme"""
+    if not OPENAI_API_KEY:
+        return None
+    
     try:
-        if not OPENAI_API_KEY:
-            return None
-        
-        # Configura a API da OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        # Monta o prompt
-        movie_info = f"Filme: {movie_title}"
-        if movie_year:
-            movie_info += f" ({movie_year})"
-        if movie_director:
-            movie_info += f" - Diretor: {movie_director}"
-        
-        if language == "en":
-            prompt = f"""
-            Identify the main songs/soundtracks from the movie "{movie_title}".
-            
-            {movie_info}
-            
-            Please provide:
-            1. A list of the 5-8 most important/iconic songs from the movie
-            2. For each song, include: song name, artist/composer
-            3. A brief description of the importance of the soundtrack in the movie
-            
-            Response format (JSON):
-            {{
-                "tracks": [
-                    {{
-                        "title": "Song name",
-                        "artist": "Artist/composer name",
-                        "description": "Brief description of the song in the movie"
-                    }}
-                ],
-                "description": "General soundtrack description"
-            }}
-            
-            If you don't know specific information about the movie, be honest but try 
-            to identify known songs associated with the movie.
-            """
-        else:
-            prompt = f"""
-            Identifique as principais músicas/trilhas sonoras do filme "{movie_title}".
-            
-            {movie_info}
-            
-            Por favor, forneça:
-            1. Uma lista das 5-8 músicas mais importantes/icônicas do filme
-            2. Para cada música, inclua: nome da música, artista/compositor
-            3. Uma breve descrição da importância da trilha sonora no filme
-            
-            Formato de resposta (JSON):
-            {{
-                "tracks": [
-                    {{
-                        "title": "Nome da música",
-                        "artist": "Nome do artista/compositor",
-                        "description": "Breve descrição da música no filme"
-                    }}
-                ],
-                "description": "Descrição geral da trilha sonora"
-            }}
-            
-            Se não souber informações específicas sobre o filme, seja honesto mas tente 
-            identificar músicas conhecidas associadas ao filme.
-            """
-        
-        system_message = "You are a cinema and music expert. Identifies iconic movie soundtracks." if language == "en" else "Você é um especialista em cinema e música. Identifica trilhas sonoras icônicas de filmes."
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,  # Reduzido para resposta mais rápida
-            temperature=0.7,
-            timeout=5  # Timeout de 5 segundos
-        )
-        
-        # Tenta extrair JSON da resposta
-        import json
-        import re
-        
-        content = response.choices[0].message.content.strip()
-        
-        # Procura por JSON na resposta
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
-        
-        # Se não conseguiu extrair JSON, tenta uma abordagem mais simples
-        return _parse_gpt_response_manually(content)
+        content = chat_completion(_track_info_request(movie_title, movie_year, movie_director, language))
+        return _parse_track_info(content)
         
     except Exception as e:
         return None
 
 
+def _track_info_request(movie_title, movie_year=None, movie_director=None, language="pt"):
+    """Parâmetros da chamada à OpenAI que identifica as músicas do filme"""
+    # Monta o prompt
+    movie_info = f"Filme: {movie_title}"
+    if movie_year:
+        movie_info += f" ({movie_year})"
+    if movie_director:
+        movie_info += f" - Diretor: {movie_director}"
+    
+    if language == "en":
+        prompt = f"""
+        Identify the main songs/soundtracks from the movie "{movie_title}".
+        
+        {movie_info}
+        
+        Please provide:
+        1. A list of the 5-8 most important/iconic songs from the movie
+        2. For each song, include: song name, artist/composer
+        3. A brief description of the importance of the soundtrack in the movie
+        
+        Response format (JSON):
+        {{
+            "tracks": [
+                {{
+                    "title": "Song name",
+                    "artist": "Artist/composer name",
+                    "description": "Brief description of the song in the movie"
+                }}
+            ],
+            "description": "General soundtrack description"
+        }}
+        
+        If you don't know specific information about the movie, be honest but try 
+        to identify known songs associated with the movie.
+        """
+    else:
+        prompt = f"""
+        Identifique as principais músicas/trilhas sonoras do filme "{movie_title}".
+        
+        {movie_info}
+        
+        Por favor, forneça:
+        1. Uma lista das 5-8 músicas mais importantes/icônicas do filme
+        2. Para cada música, inclua: nome da música, artista/compositor
+        3. Uma breve descrição da importância da trilha sonora no filme
+        
+        Formato de resposta (JSON):
+        {{
+            "tracks": [
+                {{
+                    "title": "Nome da música",
+                    "artist": "Nome do artista/compositor",
+                    "description": "Breve descrição da música no filme"
+                }}
+            ],
+            "description": "Descrição geral da trilha sonora"
+        }}
+        
+        Se não souber informações específicas sobre o filme, seja honesto mas tente 
+        identificar músicas conhecidas associadas ao filme.
+        """
+    
+    system_message = "You are a cinema and music expert. Identifies iconic movie soundtracks." if language == "en" else "Você é um especialista em cinema e música. Identifica trilhas sonoras icônicas de filmes."
+    
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 500,  # Reduzido para resposta mais rápida
+        "temperature": 0.7,
+        "timeout": 5  # Timeout de 5 segundos
+    }
+
+
+def _parse_track_info(content):
+    """Extrai {tracks, description} da resposta do GPT"""
+    # Tenta extrair JSON da resposta
+    import json
+    import re
+    
+    content = content.strip()
+    
+    # Procura por JSON na resposta
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if json_match:
+        try:
+            return json.loads(json_match.group())
+        except json.JSONDecodeError:
+            pass
+    
+    # Se não conseguiu extrair JSON, tenta uma abordagem mais simples
+    return _parse_gpt_response_manually(content)
+
+
 def _parse_gpt_response_manually(content):
     """Parse manual da resposta do GPT quando não consegue extrair JSON"""
     try:
@@ -239,67 +309,32 @@ def _parse_gpt_response_manually(content):
 
 
 def _search_tracks_on_spotify(tracks_info):
-    """Busca as músicas no Spotify"""
+    """Busca as músicas no Spotify em paralelo, mantendo a ordem original"""
     try:
         if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
             return []
         
-        # Configura autenticação do Spotify
-        client_credentials_manager = SpotifyClientCredentials(
-            client_id=SPOTIFY_CLIENT_ID,
-            client_secret=SPOTIFY_CLIENT_SECRET
-        )
-        sp = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
+        # Cliente Spotify compartilhado (reaproveita conexões e token)
+        sp = get_spotify_client()
+        
+        # Dispara as buscas ao mesmo tempo; todas compartilham o mesmo prazo
+        futures = [
+            submit(_spotify_search_executor, _find_track_on_spotify, sp, track_info)
+            for track_info in tracks_info
+        ]
+        deadline = time.monotonic() + SPOTIFY_TRACK_TIMEOUT
         
         spotify_tracks = []
         
-        for track_info in tracks_info:
+        for track_info, future in zip(tracks_info, futures):
             try:
-                # Busca a música no Spotify
-                query = f"track:{track_info['title']} artist:{track_info['artist']}"
-                results = sp.search(q=query, type='track', limit=1)
-                
-                if results['tracks']['items']:
-                    track = results['tracks']['items'][0]
-                    
-                    spotify_tracks.append({
-                        "title": track['name'],
-                        "artist": track['artists'][0]['name'],
-                        "spotify_id": track['id'],
-                        "preview_url": track.get('preview_url'),
-                        "external_urls": track.get('external_urls', {}),
-                        "album": {
-                            "name": track['album']['name'],
-                            "images": track['album']['images']
-                        },
-                        "duration_ms": track['duration_ms'],
-                        "description": track_info.get('description', '')
-                    })
-                else:
-                    # Se não encontrou, adiciona sem dados do Spotify
-                    spotify_tracks.append({
-                        "title": track_info['title'],
-                        "artist": track_info['artist'],
-                        "spotify_id": None,
-                        "preview_url": None,
-                        "external_urls": {},
-                        "album": None,
-                        "duration_ms": None,
-                        "description": track_info.get('description', '')
-                    })
-                    
+                remaining = max(deadline - time.monotonic(), 0)
+                match = future.result(timeout=remaining)
             except Exception as e:
-                # Adiciona sem dados do Spotify
-                spotify_tracks.append({
-                    "title": track_info['title'],
-                    "artist": track_info['artist'],
-                    "spotify_id": None,
-                    "preview_url": None,
-                    "external_urls": {},
-                    "album": None,
-                    "duration_ms": None,
-                    "description": track_info.get('description', '')
-                })
+                # Timeout ou erro: adiciona sem dados do Spotify
+                match = None
+            
+            spotify_tracks.append(_build_track(track_info, match))
         
         return spotify_tracks
         
@@ -307,12 +342,74 @@ def _search_tracks_on_spotify(tracks_info):
         return []
 
 
-def get_all_soundtracks():
-    """Retorna todas as trilhas sonoras salvas no banco"""
+def _track_cache_key(title, artist):
+    """Normaliza título + artista para o cache de buscas"""
+    def normalize(value):
+        return " ".join(str(value or "").casefold().split())
+    
+    return f"{normalize(title)}|{normalize(artist)}"
+
+
+def _find_track_on_spotify(sp, track_info):
+    """Busca uma música no Spotify, usando o cache de buscas anteriores"""
+    cache_key = _track_cache_key(track_info.get('title'), track_info.get('artist'))
+    
+    cached = _spotify_track_cache.get(cache_key, _NOT_CACHED)
+    if cached is not _NOT_CACHED:
+        return cached
+    
+    query = f"track:{track_info['title']} artist:{track_info['artist']}"
+    results = guarded_call("spotify", sp.search, q=query, type='track', limit=1)
+    
+    match = None
+    if results['tracks']['items']:
+        track = results['tracks']['items'][0]
+        match = {
+            "title": track['name'],
+            "artist": track['artists'][0]['name'],
+            "spotify_id": track['id'],
+            "preview_url": track.get('preview_url'),
+            "external_urls": track.get('external_urls', {}),
+            "album": {
+                "name": track['album']['name'],
+                "images": track['album']['images']
+            },
+            "duration_ms": track['duration_ms'],
+        }
+    
+    # Guarda também buscas sem resultado, para não repetir a consulta
+    _spotify_track_cache.set(cache_key, match)
+    return match
+
+
+def _build_track(track_info, match):
+    """Monta a música com os dados do Spotify (ou sem eles, se não encontrada)"""
+    if match:
+        return {**match, "description": track_info.get('description', '')}
+    
+    return {
+        "title": track_info['title'],
+        "artist": track_info['artist'],
+        "spotify_id": None,
+        "preview_url": None,
+        "external_urls": {},
+        "album": None,
+        "duration_ms": None,
+        "description": track_info.get('description', '')
+    }
+
+
+def get_all_soundtracks(since=None, stream=False):
+    """Retorna todas as trilhas sonoras salvas no banco (ou só as alteradas depois de `since`)"""
     collection = get_mongo_collection("movie_soundtracks")
+    filters = since_filter(since)
     
     try:
-        soundtracks = list(collection.find({}, {"_id": 0}))
+        if stream:
+            return ndjson_response(collection, filters, {"_id": 0})
+
+        with span("mongo", "movie_soundtracks.find"):
+            soundtracks = list(collection.find(filters, {"_id": 0}))
         return {"soundtracks": soundtracks}, 200
     except Exception as e:
         return {"error": "Erro ao buscar trilhas sonoras"}, 500
@@ -323,7 +420,7 @@ def delete_soundtrack(movie_title, movie_year=None):
     collection = get_mongo_collection("movie_soundtracks")
     
     try:
-        cache_key = f"{movie_title}_{movie_year}" if movie_year else movie_title
+        cache_key = _soundtrack_cache_key(movie_title, movie_year)
         result = collection.delete_one({"cache_key": cache_key})
         
         if result.deleted_count == 1:
@@ -332,3 +429,21 @@ def delete_soundtrack(movie_title, movie_year=None):
             return {"message": f"Trilha sonora de {movie_title} não encontrada"}, 404
     except Exception as e:
         return {"error": "Erro ao deletar trilha sonora"}, 500
+
+
+# Acesso ao MongoDB (o async_controller reaproveita estas funções numa thread)
+def _find_soundtrack(cache_key):
+    """Trilha sonora salva no MongoDB"""
+    with span("mongo", "movie_soundtracks.find_one"):
+        return get_mongo_collection("movie_soundtracks").find_one({"cache_key": cache_key})
+
+
+def _save_soundtrack(cache_key, soundtrack_info):
+    """Salva a trilha uma única vez; se outro processo salvou antes, retorna a existente"""
+    with span("mongo", "movie_soundtracks.find_one_and_update"):
+        return get_mongo_collection("movie_soundtracks").find_one_and_update(
+            {"cache_key": cache_key},
+            {"$setOnInsert": soundtrack_info},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
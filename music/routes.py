@@ -6,6 +6,9 @@ from music.controller import (
     get_all_soundtracks,
     delete_soundtrack,
 )
+from utils.export import parse_since, wants_ndjson
+from config import HTTP_CACHE_POLICIES
+from utils.http_cache import conditional_get
 
 music_bp = Blueprint("music", __name__)
 api = Namespace("music", description="Operações relacionadas às trilhas sonoras dos filmes")
@@ -64,6 +67,7 @@ class SoundtrackResource(Resource):
     @api.response(200, "Trilha sonora do filme", soundtrack_model)
     @api.response(404, "Trilha sonora não encontrada")
     @api.response(500, "Erro ao buscar trilha sonora")
+    @conditional_get(**HTTP_CACHE_POLICIES["soundtracks"])
     def get(self):
         """Retorna a trilha sonora de um filme específico"""
         movie_title = request.args.get('title')
@@ -98,11 +102,21 @@ class SoundtrackResource(Resource):
 
 @api.route("/all")
 class AllSoundtracks(Resource):
-    @api.doc("get_all_soundtracks")
+    @api.doc(
+        "get_all_soundtracks",
+        params={
+            "since": "Exporta apenas documentos criados/alterados depois desta data ISO 8601 (ou ObjectId)",
+            "format": "ndjson para exportar em streaming, um documento por linha",
+        },
+    )
     @api.response(200, "Lista de todas as trilhas sonoras")
     def get(self):
         """Retorna todas as trilhas sonoras salvas no banco"""
-        return get_all_soundtracks()
+        try:
+            since = parse_since(request.args.get("since"))
+        except ValueError:
+            return {"error": "Parâmetro since inválido"}, 400
+        return get_all_soundtracks(since, wants_ndjson(request.args, request.headers))
 
 
 music_bp.api = api
@@ -1,8 +1,12 @@
+from datetime import datetime
+
 from config import get_mongo_collection
+from utils.export import ndjson_response, since_filter
+from utils.pagination import paginate_by_cursor, InvalidCursor
 
 COLLECTION_NAME = "personal_opinions"
 
-def search_personal_opinions(filters, page=1, page_size=10):
+def search_personal_opinions(filters, page=1, page_size=10, cursor=None, count="estimated"):
     """Pesquisa opiniões pessoais com base em filtros e paginação"""
     try:
         personal_opinions_collection = get_mongo_collection(COLLECTION_NAME)
@@ -16,6 +20,12 @@ def search_personal_opinions(filters, page=1, page_size=10):
             else:
                 search_filters[key] = value
         
+        if cursor is not None:
+            result = paginate_by_cursor(
+                personal_opinions_collection, search_filters, [("_id", -1)], page_size, cursor, count
+            )
+            return result, 200
+        
         total_documents = personal_opinions_collection.count_documents(search_filters)
         skip = (page - 1) * page_size
         
@@ -26,13 +36,12 @@ def search_personal_opinions(filters, page=1, page_size=10):
             .limit(page_size)
         )
         
-        for opinion in opinions:
-            opinion["_id"] = str(opinion["_id"])
-        
         return {
             "total_documents": total_documents,
             "entries": opinions
         }, 200
+    except InvalidCursor as e:
+        return {"status": 400, "message": str(e)}, 400
     except Exception as e:
         return {"status": 500, "message": "Erro ao pesquisar opiniões pessoais"}, 500
 
@@ -52,14 +61,15 @@ def get_personal_opinion(tconst):
         return {"status": 500, "message": "Erro ao recuperar opinião pessoal"}, 500
 
 
-def get_all_personal_opinions():
-    """Recupera todas as opiniões pessoais"""
+def get_all_personal_opinions(since=None, stream=False):
+    """Recupera todas as opiniões pessoais (ou só as alteradas depois de `since`)"""
+    filters = since_filter(since)
     try:
+        if stream:
+            return ndjson_response(get_mongo_collection(COLLECTION_NAME), filters)
+
         personal_opinions_collection = get_mongo_collection(COLLECTION_NAME)
-        opinions = list(personal_opinions_collection.find({}))
-        
-        for opinion in opinions:
-            opinion["_id"] = str(opinion["_id"])
+        opinions = list(personal_opinions_collection.find(filters))
         
         return {"data": opinions}, 200
     except Exception as e:
@@ -78,6 +88,9 @@ def update_personal_opinion(tconst, update_data):
         
         allowed_fields = ["opinion", "enjoying_1", "enjoying_2"]
         update_fields = {k: v for k, v in update_data.items() if k in allowed_fields}
+        if update_fields:
+            # Usado pela exportação incremental (since)
+            update_fields["updated_at"] = datetime.utcnow()
         
         result = personal_opinions_collection.update_one(
             {"tconst": tconst},
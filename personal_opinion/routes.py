@@ -2,6 +2,8 @@ from flask import Blueprint, request
 from flask_restx import Namespace, Resource, fields
 
 from .controller import get_all_personal_opinions, get_personal_opinion, search_personal_opinions, update_personal_opinion
+from utils.pagination import requested_cursor
+from utils.export import parse_since, wants_ndjson
 
 
 personal_opinion_bp = Blueprint("personal_opinion", __name__)
@@ -22,12 +24,22 @@ opinion_model = api.model(
 
 @api.route("/")
 class AllPersonalOpinions(Resource):
-    @api.doc("get_all_personal_opinions")
+    @api.doc(
+        "get_all_personal_opinions",
+        params={
+            "since": "Exporta apenas documentos criados/alterados depois desta data ISO 8601 (ou ObjectId)",
+            "format": "ndjson para exportar em streaming, um documento por linha",
+        },
+    )
     @api.response(200, "Sucesso")
     @api.response(500, "Erro interno do servidor")
     def get(self):
         """Recupera todas as opiniões pessoais"""
-        return get_all_personal_opinions()
+        try:
+            since = parse_since(request.args.get("since"))
+        except ValueError:
+            return {"status": 400, "message": "Parâmetro since inválido"}, 400
+        return get_all_personal_opinions(since, wants_ndjson(request.args, request.headers))
 
     @api.doc("search_personal_opinions")
     @api.response(200, "Sucesso")
@@ -43,7 +55,9 @@ class AllPersonalOpinions(Resource):
         page = data.get("page", 1)
         page_size = data.get("page_size", 10)
         
-        return search_personal_opinions(filters, page, page_size)
+        return search_personal_opinions(
+            filters, page, page_size, requested_cursor(data), data.get("count", "estimated")
+        )
 
 
 @api.route("/<string:tconst>")
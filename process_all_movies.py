@@ -9,6 +9,7 @@ import json
 from datetime import datetime
 
 BASE_URL = "http://localhost:5001/api"
+POLL_INTERVAL = 5
 
 def process_all_existing_movies():
     """Processa todos os filmes existentes para pré-popular dados"""
@@ -31,7 +32,7 @@ def process_all_existing_movies():
     else:
         print("⚠️ Não foi possível obter estatísticas")
     
-    # 2. Inicia pré-população
+    # 2. Inicia pré-população (job em segundo plano)
     print(f"\n🚀 Iniciando pré-população...")
     prepopulate_start = time.time()
     
@@ -41,18 +42,41 @@ def process_all_existing_movies():
                                            "max_workers": 3
                                        })
     
+    if prepopulate_response.status_code != 202:
+        print(f"❌ Erro na pré-população: {prepopulate_response.status_code}")
+        print(prepopulate_response.text)
+        return
+    
+    job_id = prepopulate_response.json().get("job_id")
+    print(f"   🆔 Job: {job_id}")
+    
+    # Acompanha o progresso do job
+    while True:
+        time.sleep(POLL_INTERVAL)
+        job_response = requests.get(f"{BASE_URL}/prepopulate/jobs/{job_id}")
+        
+        if job_response.status_code != 200:
+            print(f"⚠️ Não foi possível consultar o job: {job_response.status_code}")
+            continue
+        
+        result = job_response.json()
+        print(f"   ⏳ {result.get('processed', 0)}/{result.get('total_movies', 0)} processados")
+        
+        if result.get("status") in ["completed", "failed"]:
+            break
+    
     prepopulate_time = time.time() - prepopulate_start
     
-    if prepopulate_response.status_code == 200:
-        result = prepopulate_response.json()
+    if result.get("status") == "completed":
         print(f"✅ Pré-população concluída em {prepopulate_time:.2f}s")
-        print(f"   📊 Total processados: {result.get('total_movies', 0)}")
+        print(f"   📊 Total processados: {result.get('processed', 0)}")
         print(f"   ✅ Sucessos: {result.get('success_count', 0)}")
         print(f"   ⚠️ Já existiam: {result.get('already_exists_count', 0)}")
+        print(f"   ⏱️ Parciais: {result.get('partial_count', 0)}")
         print(f"   ❌ Erros: {result.get('error_count', 0)}")
     else:
-        print(f"❌ Erro na pré-população: {prepopulate_response.status_code}")
-        print(prepopulate_response.text)
+        print(f"❌ Erro na pré-população: {result.get('error')}")
+        print(f"   Retome com: POST {BASE_URL}/prepopulate/jobs/{job_id}/resume")
         return
     
     # 3. Verifica estatísticas finais
@@ -1,34 +1,64 @@
 from config import get_mongo_collection
+from utils.pagination import paginate_by_cursor, InvalidCursor
+from utils.serialization import stream_json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 def get_random_recommendations():
-    """Retorna todas as recomendações da watchlist"""
+    """Retorna todas as recomendações da watchlist (em streaming, direto do cursor)"""
     collection = get_mongo_collection("recommendations")
     
     try:
         # Conta total de documentos
-        total_count = collection.count_documents({})
+        total_count = collection.estimated_document_count()
         
         if total_count == 0:
             return {"data": [], "total": 0}, 200
         
         # Retorna todos os registros ordenados por posição
-        recommendations = list(collection.find({}).sort("position", 1))
+        cursor = collection.find({}).sort("position", 1)
         
-        # Converte ObjectId para string
-        for rec in recommendations:
-            rec["_id"] = str(rec["_id"])
-        
-        return {"data": recommendations, "total": total_count}, 200
+        return stream_json(cursor, key="data", envelope={"total": total_count})
     except Exception as e:
         return {"status": 500, "message": "Erro ao buscar recomendações"}, 500
 
 
-def get_all_recommendations(page=1, page_size=10, search_term="", language="pt"):
-    """Retorna todas as recomendações com paginação e busca"""
+# Campos usados pela página de detalhes e pela pré-população
+MOVIE_DETAIL_FIELDS = [
+    "tconst",
+    "title",
+    "original_title",
+    "year",
+    "director",
+    "genres",
+    "imdb_rating",
+    "runtime",
+    "position",
+    "url",
+]
+
+
+def get_recommendation_by_tconst(tconst, fields=MOVIE_DETAIL_FIELDS):
+    """Busca um único filme pelo tconst (índice), retornando apenas os campos pedidos"""
+    collection = get_mongo_collection("recommendations")
+    
+    try:
+        projection = {field: 1 for field in fields} if fields else None
+        movie = collection.find_one({"tconst": tconst}, projection)
+        
+        if not movie:
+            return {"status": 404, "message": "Filme não encontrado"}, 404
+        
+        movie["_id"] = str(movie["_id"])
+        return movie, 200
+    except Exception as e:
+        return {"status": 500, "message": "Erro ao buscar filme"}, 500
+
+
+def get_all_recommendations(page=1, page_size=10, search_term="", language="pt", cursor=None, count="estimated"):
+    """Retorna todas as recomendações com paginação (por página ou cursor) e busca"""
     collection = get_mongo_collection("recommendations")
     
     filters = {}
@@ -42,6 +72,13 @@ def get_all_recommendations(page=1, page_size=10, search_term="", language="pt")
         ]
     
     try:
+        if cursor is not None:
+            # Paginação por cursor: posição da watchlist + _id como desempate
+            result = paginate_by_cursor(
+                collection, filters, [("position", 1), ("_id", 1)], page_size, cursor, count
+            )
+            return result, 200
+        
         total_documents = collection.count_documents(filters)
         skip = (page - 1) * page_size
         
@@ -52,13 +89,12 @@ def get_all_recommendations(page=1, page_size=10, search_term="", language="pt")
             .limit(page_size)
         )
         
-        for item in items:
-            item["_id"] = str(item["_id"])
-        
         return {
             "total_documents": total_documents,
             "entries": items,
         }, 200
+    except InvalidCursor as e:
+        return {"status": 400, "message": str(e)}, 400
     except Exception as e:
         return {"status": 500, "message": "Erro ao buscar recomendações"}, 500
 
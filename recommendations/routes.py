@@ -9,6 +9,9 @@ from recommendations.controller import (
     add_recommendation,
     bulk_add_recommendations,
 )
+from utils.pagination import requested_cursor
+from config import HTTP_CACHE_POLICIES
+from utils.http_cache import conditional_get
 
 recommendations_bp = Blueprint("recommendations", __name__)
 api = Namespace("recommendations", description="Operações relacionadas às recomendações de filmes")
@@ -64,19 +67,26 @@ class AllRecommendations(Resource):
     @api.param("page_size", "Tamanho da página", type=int, default=10)
     @api.param("search_term", "Termo de busca", type=str)
     @api.param("language", "Idioma (pt ou en)", type=str, default="pt")
+    @api.param("pagination", "Use 'cursor' para paginação por cursor", type=str)
+    @api.param("cursor", "Cursor retornado em next_cursor", type=str)
+    @api.param("count", "Total no modo cursor: exact, estimated ou none", type=str, default="estimated")
     @api.response(200, "Sucesso")
+    @api.response(400, "Cursor inválido")
+    @conditional_get(**HTTP_CACHE_POLICIES["recommendations"])
     def get(self):
         """Retorna todas as recomendações com paginação"""
         page = request.args.get("page", default=1, type=int)
         page_size = request.args.get("page_size", default=10, type=int)
         search_term = request.args.get("search_term", default="", type=str)
         language = request.args.get("language", default="pt", type=str)
+        cursor = requested_cursor(request.args)
+        count = request.args.get("count", default="estimated", type=str)
         
         # Valida o idioma
         if language not in ['pt', 'en']:
             language = 'pt'
             
-        return get_all_recommendations(page, page_size, search_term, language)
+        return get_all_recommendations(page, page_size, search_term, language, cursor, count)
 
 
 @api.route("/<string:tconst>")
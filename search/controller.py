@@ -0,0 +1,226 @@
+# Busca unificada (typeahead) sobre filmes, favoritos, blog posts, reviews e opiniões
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config import (
+    get_mongo_collection,
+    SEARCH_INDEX_CHANGE_STREAMS,
+    SEARCH_INDEX_MAX_PREFIX_EXPANSIONS,
+    SEARCH_INDEX_READY_TIMEOUT,
+    SEARCH_INDEX_REFRESH_SECONDS,
+)
+from utils.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Campos indexados por coleção e seus pesos (títulos e tconst pesam mais que textos longos).
+# Campos com objetos (ex.: content.{en,pt}) têm todos os textos aninhados indexados
+SEARCH_SOURCES = {
+    "recommendations": {
+        "tconst": 10, "title": 5, "primaryTitle": 5, "originalTitle": 4, "director": 3,
+    },
+    "favoritelist": {
+        "tconst": 10, "primaryTitle": 5, "originalTitle": 4, "director": 3,
+    },
+    "blogposts": {
+        "tconst": 10, "primaryTitle": 5, "title": 4, "introduction": 1, "content": 1,
+    },
+    "authoralreviewslist": {
+        "tconst": 10, "primaryTitle": 5, "content": 1,
+    },
+    "personal_opinions": {
+        "tconst": 10, "opinion": 1, "enjoying_1": 1, "enjoying_2": 1,
+    },
+}
+MAX_SEARCH_LIMIT = 50
+
+# 40573 = change streams exigem replica set ou cluster
+_CHANGE_STREAMS_UNSUPPORTED = 40573
+
+_state = {
+    "index": SearchIndex(SEARCH_INDEX_MAX_PREFIX_EXPANSIONS),
+    "pid": None,
+    "mode": None,
+    "built_at": None,
+    "build_seconds": None,
+    "last_event_at": None,
+    "error": None,
+}
+_ready = threading.Event()
+_start_lock = threading.Lock()
+
+
+def search_all(query, limit=10, collections=None):
+    """Busca por prefixo em todas as coleções indexadas"""
+    query = (query or "").strip()
+    if not query:
+        return {"status": 400, "message": "Informe o termo de busca (q)"}, 400
+
+    limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+    if collections:
+        unknown = [name for name in collections if name not in SEARCH_SOURCES]
+        if unknown:
+            return {"status": 400, "message": f"Coleções inválidas: {', '.join(unknown)}"}, 400
+
+    if not _ensure_index_ready():
+        return {"status": 503, "message": "Índice de busca em construção, tente novamente"}, 503
+
+    started = time.perf_counter()
+    accept = (lambda doc_key: doc_key[0] in collections) if collections else None
+    total, matches = _state["index"].search(query, limit, accept)
+    took_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "query": query,
+        "total": total,
+        "took_ms": round(took_ms, 3),
+        "entries": [dict(display, score=score) for score, display in matches],
+    }, 200
+
+
+def get_search_index_stats():
+    """Estado do índice de busca deste processo"""
+    built_at = _state["built_at"]
+    last_event_at = _state["last_event_at"]
+    return {
+        **_state["index"].stats(),
+        "ready": _ready.is_set(),
+        "mode": _state["mode"],
+        "built_at": built_at.isoformat() if built_at else None,
+        "build_seconds": _state["build_seconds"],
+        "last_event_at": last_event_at.isoformat() if last_event_at else None,
+        "refresh_seconds": SEARCH_INDEX_REFRESH_SECONDS,
+        "error": _state["error"],
+    }, 200
+
+
+def rebuild_search_index():
+    """Reconstrói o índice a partir do MongoDB e troca o índice em uso"""
+    started = time.perf_counter()
+    index = SearchIndex(SEARCH_INDEX_MAX_PREFIX_EXPANSIONS)
+    for collection_name in SEARCH_SOURCES:
+        collection = get_mongo_collection(collection_name)
+        projection = {field: 1 for field in _projected_fields(collection_name)}
+        for doc in collection.find({}, projection):
+            _index_document(index, collection_name, doc)
+
+    _state["index"] = index
+    _state["built_at"] = datetime.utcnow()
+    _state["build_seconds"] = round(time.perf_counter() - started, 3)
+    _ready.set()
+    return index
+
+
+def _projected_fields(collection_name):
+    return list(SEARCH_SOURCES[collection_name]) + ["director"]
+
+
+def _index_document(index, collection_name, doc):
+    """Indexa um documento com os campos e pesos da coleção"""
+    weights = SEARCH_SOURCES[collection_name]
+    display = {
+        "collection": collection_name,
+        "id": str(doc["_id"]),
+        "tconst": doc.get("tconst"),
+        "title": doc.get("primaryTitle") or doc.get("title"),
+        "director": doc.get("director"),
+    }
+    weighted_texts = [
+        (text, weight)
+        for field, weight in weights.items()
+        for text in _iter_texts(doc.get(field))
+    ]
+    index.upsert((collection_name, display["id"]), display, weighted_texts)
+
+
+def _iter_texts(value):
+    """Textos de um campo, incluindo os aninhados por idioma ({"en": {"text": ...}, "pt": ...})"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_texts(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_texts(item)
+
+
+def _ensure_index_ready():
+    """Inicia a atualização em segundo plano (uma vez por processo) e aguarda a primeira carga"""
+    if _state["pid"] != os.getpid():
+        with _start_lock:
+            if _state["pid"] != os.getpid():
+                _ready.clear()
+                _state["pid"] = os.getpid()
+                threading.Thread(
+                    target=_refresh_loop, name="search-index", daemon=True
+                ).start()
+    return _ready.wait(SEARCH_INDEX_READY_TIMEOUT)
+
+
+def _refresh_loop():
+    """Mantém o índice atualizado: change streams se disponíveis, senão recarga periódica"""
+    use_change_streams = SEARCH_INDEX_CHANGE_STREAMS
+    while True:
+        try:
+            if use_change_streams:
+                _follow_change_stream()
+            else:
+                _state["mode"] = "periodic"
+                rebuild_search_index()
+                _state["error"] = None
+                time.sleep(SEARCH_INDEX_REFRESH_SECONDS)
+                continue
+        except OperationFailure as e:
+            if e.code == _CHANGE_STREAMS_UNSUPPORTED:
+                logger.info("Change streams indisponíveis, usando recarga periódica do índice de busca")
+                use_change_streams = False
+                continue
+            _state["error"] = str(e)
+            logger.warning("Erro ao atualizar índice de busca: %s", e)
+        except PyMongoError as e:
+            _state["error"] = str(e)
+            logger.warning("Erro ao atualizar índice de busca: %s", e)
+        except Exception as e:
+            _state["error"] = str(e)
+            logger.exception("Erro inesperado no índice de busca")
+        time.sleep(min(SEARCH_INDEX_REFRESH_SECONDS, 30))
+
+
+def _follow_change_stream():
+    """Abre o change stream antes da carga completa para não perder alterações no meio"""
+    db = get_mongo_collection("recommendations").database
+    pipeline = [{"$match": {"ns.coll": {"$in": list(SEARCH_SOURCES)}}}]
+
+    with db.watch(pipeline, full_document="updateLookup") as stream:
+        _state["mode"] = "change_stream"
+        rebuild_search_index()
+        _state["error"] = None
+        for change in stream:
+            if not _apply_change(change):
+                # drop/rename/invalidate: recarrega tudo num novo stream
+                return
+
+
+def _apply_change(change):
+    """Aplica um evento do change stream no índice; False se o stream precisa ser reaberto"""
+    operation = change.get("operationType")
+    collection_name = change.get("ns", {}).get("coll")
+    _state["last_event_at"] = datetime.utcnow()
+
+    if operation in ("insert", "update", "replace"):
+        doc = change.get("fullDocument")
+        if doc is not None:
+            _index_document(_state["index"], collection_name, doc)
+        else:
+            _state["index"].remove((collection_name, str(change["documentKey"]["_id"])))
+        return True
+    if operation == "delete":
+        _state["index"].remove((collection_name, str(change["documentKey"]["_id"])))
+        return True
+    return operation not in ("drop", "rename", "dropDatabase", "invalidate")
@@ -0,0 +1,45 @@
+from flask import Blueprint, request
+from flask_restx import Namespace, Resource
+
+from search.controller import search_all, get_search_index_stats
+
+search_bp = Blueprint("search", __name__)
+api = Namespace("search", description="Busca unificada sobre filmes, favoritos, blog posts, reviews e opiniões")
+
+
+@api.route("/")
+class Search(Resource):
+    @api.doc(
+        "search_all",
+        params={
+            "q": "Termo de busca (cada palavra casa por prefixo, sem diferenciar acentos; prefixos com "
+                 "mais de SEARCH_INDEX_MAX_PREFIX_EXPANSIONS palavras usam só as mais frequentes)",
+            "limit": "Quantidade máxima de resultados (padrão 10, máximo 50)",
+            "collections": "Coleções separadas por vírgula (padrão: todas)",
+        },
+    )
+    @api.response(200, "Sucesso")
+    @api.response(400, "Parâmetros inválidos")
+    @api.response(503, "Índice de busca em construção")
+    def get(self):
+        """Busca (typeahead) em todas as coleções"""
+        try:
+            limit = int(request.args.get("limit", 10))
+        except ValueError:
+            return {"status": 400, "message": "limit deve ser um número"}, 400
+
+        collections = [
+            name.strip()
+            for name in request.args.get("collections", "").split(",")
+            if name.strip()
+        ]
+        return search_all(request.args.get("q", ""), limit, collections)
+
+
+@api.route("/stats")
+class SearchStats(Resource):
+    @api.doc("get_search_index_stats")
+    @api.response(200, "Sucesso")
+    def get(self):
+        """Estado do índice de busca em memória"""
+        return get_search_index_stats()
@@ -0,0 +1,10 @@
+# Configuração mínima para importar os módulos sem MongoDB nem provedores externos
+import os
+import sys
+
+os.environ.setdefault("MONGODB_CONNECTION_STRING", "mongodb://127.0.0.1:1")
+os.environ.setdefault("MONGODB_DATABASE", "test")
+os.environ.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", "100")
+os.environ.setdefault("SEARCH_INDEX_CHANGE_STREAMS", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+# Modo ASGI: asgi.py precisa importar e atender requisições sem MongoDB nem provedores externos
+import asyncio
+
+import httpx
+
+import asgi
+
+
+def _get(path):
+    async def request():
+        transport = httpx.ASGITransport(app=asgi.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.get(path)
+
+    return asyncio.run(request())
+
+
+def test_async_route():
+    """Rota assíncrona (validação antes de qualquer I/O)"""
+    response = _get("/api/music/soundtrack")
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "Título do filme é obrigatório"}
+
+
+def test_flask_fallback():
+    """Rotas sem versão assíncrona continuam atendidas pelo Flask"""
+    response = _get("/swagger.json")
+
+    assert response.status_code == 200
+    assert "/api/music/soundtrack" in response.json()["paths"]
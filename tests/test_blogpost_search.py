@@ -0,0 +1,93 @@
+# Filtros por campo da busca de blog posts: índice de texto quando há palavra inteira, $regex senão
+import pytest
+
+from generate_blogpost import controller
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, *args):
+        return self
+
+    def skip(self, count):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self.documents)
+
+
+class FakeCollection:
+    """$text só encontra os documentos de `text_matches`; o resto da consulta devolve `regex_matches`"""
+
+    def __init__(self, text_matches, regex_matches):
+        self.text_matches = text_matches
+        self.regex_matches = regex_matches
+        self.queries = []
+
+    def _matches(self, query):
+        self.queries.append(query)
+        return self.text_matches if "$text" in query else self.regex_matches
+
+    def count_documents(self, query):
+        return len(self._matches(query))
+
+    def find(self, query, projection=None):
+        return FakeCursor(list(self._matches(query)))
+
+
+@pytest.fixture
+def use_collection(monkeypatch):
+    def use(collection):
+        monkeypatch.setattr(controller, "get_mongo_collection", lambda name: collection)
+        return collection
+    return use
+
+
+def test_field_filter_stays_on_its_field():
+    filters, text_search, phrases = controller._build_search_filters({"title": "Parasite", "tconst": "tt1"})
+
+    assert text_search == ""
+    assert phrases == '"Parasite"'
+    assert filters["tconst"] == {"$regex": "tt1", "$options": "i"}
+    assert {"title": {"$regex": "Parasite", "$options": "i"}} in filters["$and"][0]["$or"]
+    assert {"content.pt.title": {"$regex": "Parasite", "$options": "i"}} in filters["$and"][0]["$or"]
+
+
+def test_whole_word_filter_uses_text_index(use_collection):
+    post = {"_id": "1", "title": "Parasite"}
+    collection = use_collection(FakeCollection(text_matches=[post], regex_matches=[post]))
+
+    body, status = controller.search_blog_post({"filters": {"title": "Parasite"}})
+
+    assert status == 200
+    assert body["total_documents"] == 1
+    assert all("$text" in query for query in collection.queries)
+
+
+def test_partial_filter_falls_back_to_regex(use_collection):
+    post = {"_id": "1", "title": "Parasite"}
+    collection = use_collection(FakeCollection(text_matches=[], regex_matches=[post]))
+
+    body, status = controller.search_blog_post({"filters": {"title": "Parasit"}})
+
+    assert status == 200
+    assert body == {"total_documents": 1, "entries": [post]}
+    assert "$text" not in collection.queries[-1]
+    assert collection.queries[-1]["$and"][0]["$or"][0] == {"title": {"$regex": "Parasit", "$options": "i"}}
+
+
+def test_query_drives_text_search_and_filters_stay_regex(use_collection):
+    collection = use_collection(FakeCollection(text_matches=[], regex_matches=[]))
+
+    controller.search_blog_post({"query": "cinema novo", "filters": {"title": "Parasit"}})
+
+    query = collection.queries[0]
+    assert query["$text"] == {"$search": "cinema novo"}
+    assert query["$and"][0]["$or"][0] == {"title": {"$regex": "Parasit", "$options": "i"}}
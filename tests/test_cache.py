@@ -0,0 +1,116 @@
+# SingleFlight e TTLCache usados entre as threads do worker
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import utils.cache
+from utils.cache import AsyncSingleFlight, SingleFlight, TTLCache
+
+
+def _run_concurrently(flight, fn, callers):
+    """Líder bloqueado em fn enquanto as outras threads chamam a mesma chave"""
+    results = []
+    errors = []
+
+    def call():
+        try:
+            results.append(flight.do("chave", fn))
+        except Exception as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+
+    followers = [threading.Thread(target=call) for _ in range(callers - 1)]
+    for thread in followers:
+        thread.start()
+    return [leader, *followers], results, errors
+
+
+def test_single_flight_runs_once():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(threading.get_ident())
+        release.wait(5)
+        return "valor"
+
+    threads, results, errors = _run_concurrently(flight, fn, callers=8)
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert errors == []
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert {value for value, _ in results} == {"valor"}
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_shares_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise RuntimeError("falhou")
+
+    threads, results, errors = _run_concurrently(flight, fn, callers=4)
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert len(errors) == 4 and all(str(e) == "falhou" for e in errors)
+
+
+def test_single_flight_runs_again_after_finishing():
+    flight = SingleFlight()
+    calls = []
+
+    flight.do("chave", calls.append, 1)
+    flight.do("chave", calls.append, 2)
+
+    assert calls == [1, 2]
+
+
+def test_async_single_flight_runs_once():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "valor"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("chave", fn) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert calls == [1]
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(utils.cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=30)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert cache.stats()["size"] == 0
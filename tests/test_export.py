@@ -0,0 +1,132 @@
+# Exportação NDJSON: parâmetro since, filtro incremental e erros antes/durante o streaming
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+
+from utils.export import NEXT_SINCE_HEADER, ndjson_response, parse_since, since_filter, wants_ndjson
+
+app = Flask(__name__)
+
+
+class FakeCursor:
+    """Cursor que falha ao abrir (`fail_at=0`) ou depois de `fail_at` documentos"""
+
+    def __init__(self, documents, fail_at=None):
+        self.documents = documents
+        self.fail_at = fail_at
+        self.position = 0
+        self.closed = False
+
+    def sort(self, field, direction):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.position == self.fail_at:
+            raise RuntimeError("cursor perdido")
+        if self.position >= len(self.documents):
+            raise StopIteration
+        self.position += 1
+        return self.documents[self.position - 1]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCollection:
+    name = "directors"
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.queries = []
+
+    def find(self, filters, projection=None):
+        self.queries.append(filters)
+        return self.cursor
+
+
+def _read(response):
+    lines = b"".join(response.response).decode().splitlines()
+    response.close()
+    return [json.loads(line) for line in lines]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-05-01T10:00:00Z", datetime(2024, 5, 1, 10)),
+    ("2024-05-01T10:00:00-03:00", datetime(2024, 5, 1, 13)),
+    ("2024-05-01", datetime(2024, 5, 1)),
+    (str(ObjectId.from_datetime(datetime(2024, 5, 1, 10))), datetime(2024, 5, 1, 10)),
+    ("", None),
+    (None, None),
+])
+def test_parse_since(value, expected):
+    assert parse_since(value) == expected
+
+
+def test_parse_since_invalid():
+    with pytest.raises(ValueError):
+        parse_since("ontem")
+
+
+def test_since_filter():
+    since = datetime(2024, 5, 1, 10)
+
+    clauses = since_filter(since)["$or"]
+
+    assert {"updated_at": {"$gt": since}} in clauses
+    assert {"created_at": {"$gt": since}} in clauses
+    assert clauses[2]["_id"]["$gt"].generation_time.replace(tzinfo=None) == since
+    assert since_filter(None) == {}
+
+
+def test_wants_ndjson():
+    assert wants_ndjson({"format": "NDJSON"})
+    assert wants_ndjson({}, {"Accept": "application/x-ndjson"})
+    assert not wants_ndjson({}, {"Accept": "application/json"})
+
+
+def test_streams_documents_in_order():
+    cursor = FakeCursor([{"_id": 1, "name": "A"}, {"_id": 2, "name": "B"}])
+    collection = FakeCollection(cursor)
+
+    with app.test_request_context():
+        response = ndjson_response(collection, {"name": "A"})
+        documents = _read(response)
+
+    assert documents == [{"_id": 1, "name": "A"}, {"_id": 2, "name": "B"}]
+    assert collection.queries == [{"name": "A"}]
+    assert response.headers[NEXT_SINCE_HEADER].endswith("Z")
+    assert cursor.closed
+
+
+def test_empty_export():
+    with app.test_request_context():
+        assert _read(ndjson_response(FakeCollection(FakeCursor([])))) == []
+
+
+def test_error_before_streaming_is_raised():
+    """Erro ao abrir o cursor sobe antes da resposta, para o controller responder 500"""
+    cursor = FakeCursor([{"_id": 1}], fail_at=0)
+
+    with app.test_request_context(), pytest.raises(RuntimeError):
+        ndjson_response(FakeCollection(cursor))
+    assert cursor.closed
+
+
+def test_error_mid_stream_adds_error_line():
+    cursor = FakeCursor([{"_id": 1}, {"_id": 2}, {"_id": 3}], fail_at=2)
+
+    with app.test_request_context():
+        documents = _read(ndjson_response(FakeCollection(cursor)))
+
+    assert documents[:2] == [{"_id": 1}, {"_id": 2}]
+    assert set(documents[2]) == {"error"}
+    assert cursor.closed
@@ -0,0 +1,154 @@
+# Manifesto de imagens com S3 e MongoDB falsos
+from datetime import datetime, timedelta
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+import images.controller as controller
+
+BUCKET = "bucket"
+
+
+class FakeS3:
+    """Objetos e tags em memória; `down` simula falha de conexão"""
+
+    def __init__(self, tags):
+        self.tags = tags
+        self.down = False
+        self.calls = []
+
+    def _check(self, operation):
+        self.calls.append(operation)
+        if self.down:
+            raise EndpointConnectionError(endpoint_url="https://s3.test")
+
+    def get_paginator(self, name):
+        s3 = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                s3._check("list_objects_v2")
+                yield {"Contents": [
+                    {"Key": key, "ETag": f'"{key}"', "LastModified": datetime(2024, 1, 1)}
+                    for key in s3.tags if key.startswith(Prefix)
+                ]}
+
+        return Paginator()
+
+    def get_object_tagging(self, Bucket, Key):
+        self._check("get_object_tagging")
+        if Key not in self.tags:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObjectTagging")
+        return {"TagSet": [{"Key": "subtitle_pt", "Value": self.tags[Key]}]}
+
+
+class FakeManifests:
+    def __init__(self):
+        self.documents = {}
+
+    def find_one(self, query):
+        return self.documents.get(query["cache_key"])
+
+    def replace_one(self, query, document, upsert=False):
+        self.documents[query["cache_key"]] = dict(document)
+
+    def delete_one(self, query):
+        self.documents.pop(query["cache_key"], None)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3({"tt1/a.jpg": "legenda a", "tt1/b.jpg": "legenda b"})
+    manifests = FakeManifests()
+    monkeypatch.setattr(controller, "get_s3_client", lambda: fake)
+    monkeypatch.setattr(controller, "get_mongo_collection", lambda name: manifests)
+    monkeypatch.setattr(controller, "_manifest_cache", controller.TTLCache(max_size=16, ttl_seconds=60))
+    monkeypatch.setattr(controller, "_background_refreshes", set())
+    fake.manifests = manifests
+    return fake
+
+
+def test_lists_images_with_subtitles(s3):
+    result, status = controller.get_all_image_urls(BUCKET, "tt1")
+
+    assert status == 200
+    assert [image["subtitle_pt"] for image in result["images"]] == ["legenda a", "legenda b"]
+
+
+def test_s3_down_without_manifest(s3):
+    """Sem manifesto salvo, falha de conexão vira 502"""
+    s3.down = True
+
+    result, status = controller.get_all_image_urls(BUCKET, "tt1")
+
+    assert status == 502
+
+
+def test_s3_down_serves_stale_manifest(s3):
+    """Manifesto vencido é servido quando a revalidação no S3 falha"""
+    controller.get_all_image_urls(BUCKET, "tt1")
+    controller._manifest_cache.clear()
+    stored = s3.manifests.documents[controller._manifest_key(BUCKET, "tt1")]
+    stored["checked_at"] -= timedelta(seconds=controller.IMAGE_MANIFEST_CHECK_SECONDS + 1)
+    s3.down = True
+
+    result, status = controller.get_all_image_urls(BUCKET, "tt1")
+
+    assert status == 200
+    assert len(result["images"]) == 2
+
+
+def test_single_image_s3_down(s3, monkeypatch):
+    monkeypatch.setattr(controller, "_refresh_executor", InlineExecutor(run=False))
+    s3.down = True
+
+    result, status = controller.get_image_url(BUCKET, "tt1", "a.jpg")
+
+    assert status == 502
+
+
+class InlineExecutor:
+    """Executa na hora o que seria enviado ao pool de revalidação"""
+
+    def __init__(self, run=True):
+        self.run = run
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        if self.run:
+            fn(*args)
+
+
+def test_single_image_cold_manifest(s3, monkeypatch):
+    """Sem manifesto, a requisição só lê as tags do arquivo; a listagem fica em segundo plano"""
+    executor = InlineExecutor(run=False)
+    monkeypatch.setattr(controller, "_refresh_executor", executor)
+
+    result, status = controller.get_image_url(BUCKET, "tt1", "b.jpg")
+
+    assert status == 200
+    assert result["subtitle_pt"] == "legenda b"
+    assert s3.calls == ["get_object_tagging"]
+    assert executor.submitted == 1
+
+
+def test_single_image_background_refresh(s3, monkeypatch):
+    """A revalidação em segundo plano salva o manifesto usado pelas próximas requisições"""
+    monkeypatch.setattr(controller, "_refresh_executor", InlineExecutor())
+    controller.get_image_url(BUCKET, "tt1", "a.jpg")
+    s3.calls.clear()
+
+    result, status = controller.get_image_url(BUCKET, "tt1", "b.jpg")
+
+    assert status == 200
+    assert result["subtitle_pt"] == "legenda b"
+    assert s3.calls == []
+
+
+def test_single_image_missing_object(s3, monkeypatch):
+    monkeypatch.setattr(controller, "_refresh_executor", InlineExecutor(run=False))
+
+    result, status = controller.get_image_url(BUCKET, "tt1", "c.jpg")
+
+    assert status == 404
@@ -0,0 +1,130 @@
+# Backoff do cache negativo: o pipeline de record_missing avaliado por uma coleção falsa
+from datetime import datetime, timedelta
+
+import pytest
+
+import utils.negative_cache as negative_cache
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+def _evaluate(expression, document):
+    """Subconjunto dos operadores de agregação usados por _record_update"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return document.get(expression[1:])
+    if isinstance(expression, list):
+        return [_evaluate(item, document) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+
+    (operator, arguments), = expression.items()
+    values = [_evaluate(argument, document) for argument in arguments]
+    if operator == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if operator == "$add":
+        total = values[0]
+        for value in values[1:]:
+            total = total + (timedelta(milliseconds=value) if isinstance(total, datetime) else value)
+        return total
+    if operator == "$subtract":
+        return values[0] - values[1]
+    if operator == "$multiply":
+        return values[0] * values[1]
+    if operator == "$min":
+        return min(values)
+    if operator == "$arrayElemAt":
+        return values[0][values[1]]
+    raise AssertionError(f"operador não suportado: {operator}")
+
+
+class FakeNegativeCache:
+    def __init__(self):
+        self.documents = {}
+        self.updates = 0
+
+    def update_one(self, query, pipeline, upsert=False):
+        self.updates += 1
+        assert upsert and isinstance(pipeline, list)
+        document = dict(self.documents.get(query["key"], query))
+        for stage in pipeline:
+            (operator, fields), = stage.items()
+            assert operator == "$set"
+            document.update({field: _evaluate(value, document) for field, value in fields.items()})
+        self.documents[query["key"]] = document
+
+    def find_one(self, query, projection=None):
+        document = self.documents.get(query["key"])
+        if document and document["retry_at"] > query["retry_at"]["$gt"]:
+            return document
+        return None
+
+    def delete_one(self, query):
+        self.documents.pop(query["key"], None)
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeNegativeCache()
+    monkeypatch.setattr(negative_cache, "get_mongo_collection", lambda name: fake)
+    monkeypatch.setattr(negative_cache, "NEGATIVE_CACHE_BACKOFF_MINUTES", [15, 60, 360])
+    monkeypatch.setattr(negative_cache, "NEGATIVE_CACHE_TTL_DAYS", 7)
+    return fake
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [NOW]
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return now[0]
+
+    monkeypatch.setattr(negative_cache, "datetime", FakeDatetime)
+    return now
+
+
+def test_backoff_grows_and_repeats_last_step(collection, clock):
+    intervals = []
+    for _ in range(5):
+        negative_cache.record_missing("director", "Fulano")
+        entry = collection.documents["director:Fulano"]
+        intervals.append((entry["retry_at"] - entry["last_attempt_at"]) / timedelta(minutes=1))
+
+    assert intervals == [15, 60, 360, 360, 360]
+    assert entry["attempts"] == 5
+    assert entry["kind"] == "director"
+    assert entry["expires_at"] == NOW + timedelta(days=7)
+    assert collection.updates == 5
+
+
+def test_known_missing_until_retry_at(collection, clock):
+    negative_cache.record_missing("soundtrack", "Filme_1999")
+
+    assert negative_cache.is_known_missing("soundtrack", "Filme_1999")
+    assert not negative_cache.is_known_missing("director", "Filme_1999")
+
+    clock[0] = NOW + timedelta(minutes=15)
+    assert not negative_cache.is_known_missing("soundtrack", "Filme_1999")
+
+
+def test_clear_missing_restarts_backoff(collection, clock):
+    negative_cache.record_missing("director", "Fulano")
+    negative_cache.record_missing("director", "Fulano")
+
+    negative_cache.clear_missing("director", "Fulano")
+    negative_cache.record_missing("director", "Fulano")
+
+    entry = collection.documents["director:Fulano"]
+    assert entry["attempts"] == 1
+    assert entry["retry_at"] == NOW + timedelta(minutes=15)
+
+
+def test_mongo_errors_are_ignored(monkeypatch):
+    def unavailable(name):
+        raise ConnectionError("MongoDB fora do ar")
+
+    monkeypatch.setattr(negative_cache, "get_mongo_collection", unavailable)
+
+    negative_cache.record_missing("director", "Fulano")
+    assert not negative_cache.is_known_missing("director", "Fulano")
@@ -0,0 +1,130 @@
+# Paginação por cursor com uma coleção falsa que segue a ordenação do MongoDB (null primeiro)
+import base64
+
+import pytest
+from bson import ObjectId
+
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate_by_cursor
+
+SORT = [("year", -1), ("_id", 1)]
+
+
+def _matches(document, query):
+    """Subconjunto dos operadores usados por _after_cursor_filter"""
+    for field, condition in query.items():
+        if field == "$or":
+            ok = any(_matches(document, option) for option in condition)
+        elif field == "$and":
+            ok = all(_matches(document, option) for option in condition)
+        elif isinstance(condition, dict):
+            value = document.get(field)
+            ok = all(
+                value is not None and value > argument if operator == "$gt"
+                else value is not None and value < argument if operator == "$lt"
+                else value != argument
+                for operator, argument in condition.items()
+            )
+        else:
+            ok = document.get(field) == condition
+        if not ok:
+            return False
+    return True
+
+
+def _sorted(documents, sort):
+    """Ordena como o MongoDB: null/ausente antes de qualquer valor na ordem crescente"""
+    documents = list(documents)
+    for field, direction in reversed(sort):
+        documents.sort(
+            key=lambda document: (document.get(field) is not None, document.get(field) or 0),
+            reverse=direction == -1
+        )
+    return documents
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, sort):
+        self.documents = _sorted(self.documents, sort)
+        return self
+
+    def limit(self, limit):
+        return self.documents[:limit]
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor([document for document in self.documents if _matches(document, query)])
+
+    def count_documents(self, query):
+        return sum(1 for document in self.documents if _matches(document, query))
+
+
+def _all_pages(collection, sort, page_size):
+    pages = []
+    cursor = None
+    while True:
+        result = paginate_by_cursor(collection, {}, sort, page_size, cursor, "none")
+        pages.append([document["_id"] for document in result["entries"]])
+        cursor = result["next_cursor"]
+        if not result["has_more"]:
+            return pages
+
+
+def test_cursor_round_trip():
+    document = {"_id": ObjectId(), "year": 1999, "title": "ignorado"}
+
+    values = decode_cursor(encode_cursor(document, SORT), SORT)
+
+    assert values == {"_id": document["_id"], "year": 1999}
+
+
+@pytest.mark.parametrize("cursor", [
+    "%%%",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'{"_id": {"$oid": "123"}, "year": 1}').decode(),
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, SORT)
+
+
+def test_cursor_from_other_sort():
+    cursor = encode_cursor({"_id": 1, "title": "x"}, [("title", 1), ("_id", 1)])
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, SORT)
+
+
+@pytest.mark.parametrize("sort", [
+    [("year", 1), ("_id", 1)],
+    [("year", -1), ("_id", 1)],
+    [("year", -1), ("_id", -1)],
+])
+def test_pages_cover_nulls_once(sort):
+    """Documentos com o campo nulo ou ausente aparecem uma vez, na posição do MongoDB"""
+    documents = [{"_id": index, "year": year} for index, year in enumerate(
+        [2001, None, 1999, 2001, None, 1980, 2001, None, 1999, 2010]
+    )]
+    del documents[4]["year"]
+    expected = [document["_id"] for document in _sorted(documents, sort)]
+
+    pages = _all_pages(FakeCollection(documents), sort, page_size=3)
+
+    assert [_id for page in pages for _id in page] == expected
+    assert all(len(page) == 3 for page in pages[:-1])
+
+
+def test_exact_count_ignores_cursor():
+    collection = FakeCollection([{"_id": index, "year": 2000} for index in range(5)])
+
+    first = paginate_by_cursor(collection, {}, SORT, 2, count="exact")
+    second = paginate_by_cursor(collection, {}, SORT, 2, first["next_cursor"], count="exact")
+
+    assert first["total_documents"] == second["total_documents"] == 5
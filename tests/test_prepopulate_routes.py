@@ -0,0 +1,44 @@
+# Validação do corpo de /prepopulate/all antes de criar o job
+import pytest
+
+import movie_prepopulate.routes as routes
+from app import app
+from config import PREPOPULATE_MAX_WORKERS
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Registra os argumentos passados para a criação do job"""
+    calls = []
+
+    def fake_submit(language, max_workers):
+        calls.append((language, max_workers))
+        return {"job_id": "job", "status": "queued"}, 202
+
+    monkeypatch.setattr(routes, "submit_prepopulate_job", fake_submit)
+    return calls
+
+
+@pytest.mark.parametrize("max_workers", ["4", 2.5, 0, -1, True, None])
+def test_invalid_max_workers(submitted, max_workers):
+    """Valores que não são inteiros positivos retornam 400 sem criar o job"""
+    response = app.test_client().post("/api/prepopulate/all", json={"max_workers": max_workers})
+
+    assert response.status_code == 400
+    assert submitted == []
+
+
+def test_max_workers_is_clamped(submitted):
+    """Valores acima do limite configurado são reduzidos"""
+    response = app.test_client().post("/api/prepopulate/all", json={"max_workers": 10_000})
+
+    assert response.status_code == 202
+    assert submitted == [("pt", PREPOPULATE_MAX_WORKERS)]
+
+
+def test_default_max_workers(submitted):
+    """Sem corpo, usa o padrão"""
+    response = app.test_client().post("/api/prepopulate/all")
+
+    assert response.status_code == 202
+    assert submitted == [("pt", 3)]
@@ -0,0 +1,106 @@
+# Transições do circuit breaker com relógio controlado pelo teste
+from types import SimpleNamespace
+
+import pytest
+
+import utils.resilience as resilience
+from utils.resilience import CircuitBreaker, ProviderGuard, ProviderUnavailable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.monotonic do módulo avança só quando o teste manda"""
+    now = [1000.0]
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: now[0], sleep=lambda seconds: None))
+    return now
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock[0] += 29
+    assert not breaker.allow()
+
+    clock[0] += 1
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_half_open_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_release_frees_trial(clock):
+    """Erro que não é do provedor libera a chamada de teste sem reabrir o circuito"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    breaker.allow()
+
+    breaker.release()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_guard_rejects_while_open(clock):
+    guard = ProviderGuard("teste", rate=100, burst=100)
+    guard.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+
+    def fail():
+        raise TimeoutError("sem resposta")
+
+    with pytest.raises(TimeoutError):
+        guard.call(fail)
+    with pytest.raises(ProviderUnavailable):
+        guard.call(lambda: "ok")
+
+    assert (guard.calls, guard.failures, guard.rejected) == (1, 1, 1)
@@ -0,0 +1 @@
+# Utilitários compartilhados entre os módulos
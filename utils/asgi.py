@@ -0,0 +1,175 @@
+# Modo ASGI: rotas assíncronas para os endpoints que passam a maior parte do tempo esperando
+# provedores externos; as demais rotas seguem para a aplicação Flask num pool de threads
+import logging
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags, quote_etag
+
+from utils import metrics
+from utils.http_cache import cache_control_value, etag_for
+from utils.serialization import JSON_MIMETYPE, dumps
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequest:
+    """Requisição entregue às rotas assíncronas (args com a mesma interface do Flask)"""
+
+    def __init__(self, scope):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query_string = scope.get("query_string", b"").decode("latin-1")
+        self.headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]
+        }
+        self.args = MultiDict(parse_qsl(self.query_string, keep_blank_values=True))
+
+    @property
+    def full_path(self):
+        # Mesmo formato do request.full_path do Flask (faz parte dos ETags)
+        return f"{self.path}?{self.query_string}"
+
+
+class AsyncRoutes:
+    """
+    Rotas assíncronas identificadas pela regra da rota Flask que substituem
+    (ex.: "/api/movie-detail/<movie_id>"). O roteamento continua sendo o do Flask.
+    """
+
+    def __init__(self):
+        self._routes = {}
+
+    def route(self, rule, cache_policy=None, version=None):
+        """
+        Registra `async def handler(request, **view_args) -> (dados, status)` para GET/HEAD.
+        cache_policy e version seguem as regras do utils.http_cache.conditional_get.
+        """
+        def decorator(fn):
+            self._routes[rule] = (fn, cache_policy, version)
+            return fn
+
+        return decorator
+
+    def get(self, rule):
+        return self._routes.get(rule)
+
+
+def create_asgi_app(flask_app, routes, wsgi_workers=10, cors_expose_headers=(), on_shutdown=()):
+    """
+    Aplicação ASGI: GET/HEAD das rotas registradas em `routes` rodam no event loop;
+    todo o resto (outros métodos, Swagger, Flask-RESTX) vai para o Flask via WSGI.
+    `on_shutdown` são corrotinas chamadas no encerramento do worker.
+    """
+    fallback = WSGIMiddleware(flask_app, workers=wsgi_workers)
+    url_adapter = flask_app.url_map.bind("localhost")
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send, on_shutdown)
+            return
+
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            try:
+                rule, view_args = url_adapter.match(scope["path"], "GET", return_rule=True)
+            except HTTPException:
+                rule = None
+
+            route = routes.get(rule.rule) if rule is not None else None
+            if route is not None:
+                await _dispatch(route, rule.rule, view_args, scope, send, cors_expose_headers)
+                return
+
+        await fallback(scope, receive, send)
+
+    return app
+
+
+async def _dispatch(route, rule, view_args, scope, send, cors_expose_headers):
+    handler, cache_policy, version = route
+    request = AsyncRequest(scope)
+
+    token = metrics.start_request()
+    try:
+        try:
+            data, status = await handler(request, **view_args)
+        except Exception:
+            logger.exception("Erro na rota assíncrona %s", rule)
+            data, status = {"error": "Erro interno do servidor"}, 500
+
+        status, headers, body = _render(request, data, status, cache_policy, version)
+        server_timing = metrics.finish_request(request.method, rule, status, request.full_path.rstrip("?"))
+    finally:
+        metrics.end_request(token)
+
+    if server_timing:
+        headers.append(("Server-Timing", server_timing))
+    headers.extend(_cors_headers(request, cors_expose_headers))
+    headers.append(("Content-Length", str(len(body))))
+
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+    await send({"type": "http.response.body", "body": body if request.method != "HEAD" else b""})
+
+
+def _render(request, data, status, cache_policy, version):
+    """(status, cabeçalhos, corpo) com as mesmas regras de ETag e Cache-Control do conditional_get"""
+    headers = [("Content-Type", JSON_MIMETYPE)]
+    if status != 200 or cache_policy is None:
+        return status, headers, dumps(data)
+
+    if isinstance(data, dict) and data.get("partial"):
+        headers.append(("Cache-Control", "no-store"))
+        return status, headers, dumps(data)
+
+    body = None
+    data_version = version(data) if version is not None else None
+    if data_version is not None:
+        etag, weak = etag_for(request.full_path, data_version), True
+    else:
+        body = dumps(data)
+        etag, weak = etag_for(body), False
+
+    validators = [
+        ("ETag", quote_etag(etag, weak)),
+        ("Cache-Control", cache_control_value(**cache_policy)),
+    ]
+    if parse_etags(request.headers.get("if-none-match")).contains_weak(etag):
+        return 304, validators, b""
+
+    return status, headers + validators, body if body is not None else dumps(data)
+
+
+def _cors_headers(request, expose_headers):
+    """Mesmos cabeçalhos que o flask-cors envia (origem refletida por causa de supports_credentials)"""
+    origin = request.headers.get("origin")
+    if not origin:
+        return []
+    headers = [
+        ("Access-Control-Allow-Origin", origin),
+        ("Access-Control-Allow-Credentials", "true"),
+        ("Vary", "Origin"),
+    ]
+    if expose_headers:
+        headers.append(("Access-Control-Expose-Headers", ", ".join(expose_headers)))
+    return headers
+
+
+async def _lifespan(receive, send, on_shutdown):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            for callback in on_shutdown:
+                try:
+                    await callback()
+                except Exception:
+                    logger.exception("Erro ao encerrar o worker ASGI")
+            await send({"type": "lifespan.shutdown.complete"})
+            return
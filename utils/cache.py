@@ -0,0 +1,164 @@
+# Utilitários de cache em memória e coalescência de requisições
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Cache LRU em memória com expiração por item, seguro entre threads"""
+
+    def __init__(self, max_size=512, ttl_seconds=300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Retorna o valor da chave se ainda for válido"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            # Marca como usado recentemente
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        """Armazena um valor, removendo o menos usado se passar do limite"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove uma chave do cache"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Remove todas as chaves que começam com o prefixo informado"""
+        with self._lock:
+            for key in [k for k in self._data if str(k).startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Retorna estatísticas de uso do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class _Call:
+    """Execução em andamento compartilhada pelo SingleFlight"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Garante uma única execução por chave; chamadas concorrentes aguardam o resultado"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Executa fn uma vez por chave e retorna (resultado, compartilhado)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+        return call.result, False
+
+    def in_flight(self):
+        """Quantidade de chaves sendo processadas no momento"""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """SingleFlight para corrotinas de um mesmo event loop"""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Aguarda fn(*args, **kwargs) uma vez por chave e retorna (resultado, compartilhado)"""
+        future = self._calls.get(key)
+        if future is not None:
+            # shield: se quem espera for cancelado, a execução compartilhada continua
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Evita o aviso de exceção não lida quando ninguém estava esperando
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._calls.pop(key, None)
+
+        return result, False
+
+    def in_flight(self):
+        """Quantidade de chaves sendo processadas no momento"""
+        return len(self._calls)
@@ -0,0 +1,195 @@
+# Registro de clientes HTTP/OpenAI/Spotify/S3 compartilhados pelo processo
+import inspect
+import threading
+
+import boto3
+import httpx
+import requests
+import spotipy
+from botocore.config import Config as BotoConfig
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI, DefaultHttpxClient
+from requests.adapters import HTTPAdapter
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+
+from config import (
+    AWS_ACCESS_KEY_ID,
+    AWS_SECRET_ACCESS_KEY,
+    OPENAI_API_KEY,
+    SPOTIFY_CLIENT_ID,
+    SPOTIFY_CLIENT_SECRET,
+    HTTP_POOL_SIZE,
+    OPENAI_POOL_SIZE,
+    OPENAI_MAX_RETRIES,
+    SPOTIFY_POOL_SIZE,
+    HTTP_KEEPALIVE_SECONDS,
+    S3_POOL_SIZE,
+    S3_REGION,
+    ASYNC_HTTP_POOL_SIZE,
+)
+from utils.resilience import guarded_call, guarded_call_async
+
+# Clientes do modo ASGI: ficam presos ao event loop em que foram usados pela primeira vez
+_ASYNC_CLIENTS = ("async_openai", "async_http")
+
+_lock = threading.Lock()
+_clients = {}
+
+
+def _get_or_create(name, factory):
+    """Cria o cliente uma única vez por processo"""
+    client = _clients.get(name)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            client = factory()
+            _clients[name] = client
+        return client
+
+
+def _pooled_session(pool_size):
+    """Sessão requests com pool de conexões keep-alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session():
+    """Sessão HTTP compartilhada para IMDB, TMDB e outras chamadas simples"""
+    return _get_or_create("http", lambda: _pooled_session(HTTP_POOL_SIZE))
+
+
+def get_openai_client():
+    """Cliente OpenAI compartilhado (None se não houver API key)"""
+    if not OPENAI_API_KEY:
+        return None
+
+    def factory():
+        http_client = DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_POOL_SIZE,
+                max_keepalive_connections=OPENAI_POOL_SIZE,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+            )
+        )
+        return OpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=http_client,
+            max_retries=OPENAI_MAX_RETRIES,
+        )
+
+    return _get_or_create("openai", factory)
+
+
+def chat_completion(request):
+    """Texto da resposta da OpenAI para os parâmetros da chamada (com limite e circuit breaker)"""
+    client = get_openai_client()
+    response = guarded_call("openai", client.chat.completions.create, **request)
+    return response.choices[0].message.content.strip()
+
+
+def get_spotify_client():
+    """Cliente Spotify compartilhado; o token client-credentials fica em memória e é reaproveitado"""
+    if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
+        return None
+
+    def factory():
+        session = _pooled_session(SPOTIFY_POOL_SIZE)
+        auth_manager = SpotifyClientCredentials(
+            client_id=SPOTIFY_CLIENT_ID,
+            client_secret=SPOTIFY_CLIENT_SECRET,
+            requests_session=session,
+            cache_handler=MemoryCacheHandler(),
+        )
+        return spotipy.Spotify(
+            client_credentials_manager=auth_manager,
+            requests_session=session,
+        )
+
+    return _get_or_create("spotify", factory)
+
+
+def get_s3_client():
+    """Cliente S3 compartilhado (clientes boto3 são thread-safe)"""
+    def factory():
+        return boto3.client(
+            "s3",
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+            region_name=S3_REGION,
+            config=BotoConfig(
+                max_pool_connections=S3_POOL_SIZE,
+                tcp_keepalive=True,
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
+        )
+
+    return _get_or_create("s3", factory)
+
+
+def _async_limits():
+    return httpx.Limits(
+        max_connections=ASYNC_HTTP_POOL_SIZE,
+        max_keepalive_connections=ASYNC_HTTP_POOL_SIZE,
+        keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+    )
+
+
+def get_async_openai_client():
+    """Cliente AsyncOpenAI compartilhado pelo modo ASGI (None se não houver API key)"""
+    if not OPENAI_API_KEY:
+        return None
+
+    def factory():
+        return AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=DefaultAsyncHttpxClient(limits=_async_limits()),
+            max_retries=OPENAI_MAX_RETRIES,
+        )
+
+    return _get_or_create("async_openai", factory)
+
+
+async def chat_completion_async(request):
+    """chat_completion com o cliente AsyncOpenAI (modo ASGI)"""
+    client = get_async_openai_client()
+    response = await guarded_call_async("openai", client.chat.completions.create, **request)
+    return response.choices[0].message.content.strip()
+
+
+def get_async_http_client():
+    """Cliente httpx assíncrono para IMDB e outras chamadas simples no modo ASGI"""
+    return _get_or_create(
+        "async_http", lambda: httpx.AsyncClient(limits=_async_limits(), follow_redirects=True)
+    )
+
+
+async def close_async_clients():
+    """Fecha os clientes assíncronos (encerramento do worker ASGI)"""
+    with _lock:
+        clients = [_clients.pop(name) for name in _ASYNC_CLIENTS if name in _clients]
+    for client in clients:
+        close = getattr(client, "aclose", None) or getattr(client, "close", None)
+        try:
+            await close()
+        except Exception:
+            pass
+
+
+def reset_clients():
+    """Descarta os clientes (ex.: após fork de um worker)"""
+    with _lock:
+        for client in _clients.values():
+            close = getattr(client, "close", None)
+            # Clientes assíncronos só podem ser fechados dentro do event loop; são apenas descartados
+            if callable(close) and not inspect.iscoroutinefunction(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+        _clients.clear()
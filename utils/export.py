@@ -0,0 +1,82 @@
+# Exportação em NDJSON, lendo o cursor do MongoDB aos poucos
+import logging
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from flask import Response, stream_with_context
+
+from config import EXPORT_BATCH_SIZE
+from utils.serialization import dumps
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+NEXT_SINCE_HEADER = "X-Export-Next-Since"
+
+_EMPTY = object()
+
+logger = logging.getLogger(__name__)
+
+
+def wants_ndjson(args, headers=None):
+    """True se o cliente pediu NDJSON (?format=ndjson ou Accept: application/x-ndjson)"""
+    if args.get("format", "").lower() == "ndjson":
+        return True
+    return bool(headers) and NDJSON_MIMETYPE in headers.get("Accept", "")
+
+
+def parse_since(value):
+    """Data ISO 8601 (ou ObjectId) do parâmetro since; ValueError se inválido"""
+    if not value:
+        return None
+    if ObjectId.is_valid(value):
+        return ObjectId(value).generation_time.replace(tzinfo=None)
+
+    since = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def since_filter(since):
+    """Documentos criados ou alterados depois de `since` (updated_at, created_at ou data do _id)"""
+    if since is None:
+        return {}
+    return {"$or": [
+        {"updated_at": {"$gt": since}},
+        {"created_at": {"$gt": since}},
+        {"_id": {"$gt": ObjectId.from_datetime(since.replace(tzinfo=timezone.utc))}},
+    ]}
+
+
+def ndjson_response(collection, filters=None, projection=None):
+    """
+    Resposta em streaming com um documento JSON por linha, em ordem de _id.
+    O cabeçalho X-Export-Next-Since traz o valor de `since` para a próxima exportação incremental.
+    O primeiro lote é lido antes de responder: um erro na consulta sobe para o chamador,
+    que ainda pode responder 500. Se a leitura falhar no meio, a última linha é {"error": ...}.
+    """
+    started_at = datetime.utcnow()
+    cursor = (
+        collection.find(filters or {}, projection)
+        .sort("_id", 1)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+    try:
+        first = next(cursor, _EMPTY)
+    except Exception:
+        cursor.close()
+        raise
+
+    def generate():
+        try:
+            if first is not _EMPTY:
+                yield dumps(first) + b"\n"
+                for document in cursor:
+                    yield dumps(document) + b"\n"
+        except Exception as e:
+            logger.exception("Erro ao ler documentos durante a exportação de '%s'", collection.name)
+            yield dumps({"error": "Exportação incompleta: erro ao ler os documentos"}) + b"\n"
+
+    response = Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+    response.headers[NEXT_SINCE_HEADER] = started_at.isoformat() + "Z"
+    response.call_on_close(cursor.close)
+    return response
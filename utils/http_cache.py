@@ -0,0 +1,86 @@
+# Validadores HTTP (ETag / If-None-Match) e Cache-Control para endpoints de leitura
+import hashlib
+from functools import wraps
+
+from flask import Response, request
+
+from utils.serialization import output_json
+
+
+def cache_control_value(max_age, shared_max_age=None):
+    """Cabeçalho Cache-Control público; shared_max_age (s-maxage) vale só para CDN/proxies"""
+    if max_age <= 0:
+        return "no-cache"
+    value = f"public, max-age={max_age}"
+    if shared_max_age is not None:
+        value += f", s-maxage={shared_max_age}"
+    return value
+
+
+def etag_for(*parts):
+    """Hash das partes, usado como ETag"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _unpack(result):
+    """(corpo, status, headers) a partir do retorno de uma view ou Resource"""
+    if isinstance(result, tuple):
+        body = result[0]
+        status = result[1] if len(result) > 1 else 200
+        headers = result[2] if len(result) > 2 else None
+        return body, status, headers
+    return result, 200, None
+
+
+def conditional_get(max_age, shared_max_age=None, version=None, render=output_json):
+    """
+    Adiciona ETag e Cache-Control às respostas 200 e responde 304 ao If-None-Match.
+
+    `version(data)` pode devolver um identificador estável do conteúdo (ex.: created_at
+    de um cache); nesse caso o 304 sai sem serializar o corpo e o ETag é fraco, já que
+    campos como idade do cache variam. Sem versão, o ETag é o hash do corpo serializado.
+    Respostas marcadas como parciais (partial=True) não são cacheadas.
+    `render(data, status, headers)` serializa o corpo (padrão: utils.serialization).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            data, status, headers = _unpack(result)
+            if status != 200 or request.method not in ("GET", "HEAD"):
+                return result
+
+            if isinstance(data, dict) and data.get("partial"):
+                response = data if isinstance(data, Response) else render(data, status, headers)
+                response.headers["Cache-Control"] = "no-store"
+                return response
+
+            cache_control = cache_control_value(max_age, shared_max_age)
+            etag = None
+            weak = False
+            if version is not None and not isinstance(data, Response):
+                data_version = version(data)
+                if data_version is not None:
+                    etag = etag_for(request.full_path, data_version)
+                    weak = True
+                    if request.if_none_match.contains_weak(etag):
+                        response = Response(status=304)
+                        response.set_etag(etag, weak=True)
+                        response.headers["Cache-Control"] = cache_control
+                        return response
+
+            response = data if isinstance(data, Response) else render(data, status, headers)
+            response.status_code = status
+            if etag is None:
+                etag = etag_for(response.get_data())
+            response.set_etag(etag, weak=weak)
+            response.headers["Cache-Control"] = cache_control
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,188 @@
+# Criação dos índices do MongoDB na inicialização
+import logging
+
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+# Idiomas do conteúdo dos blog posts (content.<idioma>.<campo>)
+BLOGPOST_CONTENT_LANGUAGES = ("en", "pt")
+
+# Pesos dos campos do texto do post: título pesa mais que o corpo
+BLOGPOST_FIELD_WEIGHTS = {
+    "title": 8,
+    "introduction": 3,
+    "conclusion": 2,
+    "historical_context": 1,
+    "cultural_importance": 1,
+    "technical_analysis": 1,
+}
+
+# Pesos do índice de texto dos blog posts: campos na raiz e dentro de content.<idioma>
+BLOGPOSTS_TEXT_WEIGHTS = {
+    "primaryTitle": 10,
+    **BLOGPOST_FIELD_WEIGHTS,
+    **{
+        f"content.{language}.{field}": weight
+        for language in BLOGPOST_CONTENT_LANGUAGES
+        for field, weight in BLOGPOST_FIELD_WEIGHTS.items()
+    },
+}
+BLOGPOSTS_TEXT_INDEX = "blogposts_text"
+
+
+def ensure_indexes(db, movie_detail_ttl_seconds, soundtracks_ttl_seconds,
+                   blogposts_text_language="none"):
+    """Cria os índices TTL, únicos e de busca usados pelas coleções"""
+    _ensure_unique_index(db["movie_detail_cache"], "cache_key")
+    _ensure_ttl_index(db, "movie_detail_cache", "created_at", movie_detail_ttl_seconds)
+    # Usado pela invalidação de todos os idiomas de um filme
+    db["movie_detail_cache"].create_index("movie_id")
+
+    _ensure_unique_index(db["movie_soundtracks"], "cache_key")
+    _ensure_ttl_index(db, "movie_soundtracks", "created_at", soundtracks_ttl_seconds)
+
+    _ensure_unique_index(db["directors"], "name")
+
+    _ensure_unique_index(db["translations"], "key")
+
+    # Cache negativo: cada item expira sozinho no expires_at gravado no documento
+    _ensure_unique_index(db["negative_cache"], "key")
+    db["negative_cache"].create_index("expires_at", expireAfterSeconds=0)
+
+    # Resultado por filme dos jobs de pré-população
+    db["prepopulate_job_items"].create_index([("job_id", 1), ("tconst", 1)], unique=True)
+    db["prepopulate_job_items"].create_index([("job_id", 1), ("status", 1)])
+
+    # Busca direta por tconst e ordenação da watchlist
+    db["recommendations"].create_index("tconst")
+    db["recommendations"].create_index("position")
+
+    _ensure_unique_index(db["image_manifests"], "cache_key")
+
+    # Busca textual dos blog posts ($** inclui o conteúdo aninhado por idioma)
+    db["blogposts"].create_index("tconst")
+    _ensure_text_index(db["blogposts"], blogposts_text_language)
+
+
+def _ensure_unique_index(collection, field):
+    """
+    Cria um índice único. Se já houver duplicatas, apenas registra no log e segue sem o
+    índice; a limpeza é feita à parte com `python -m utils.indexes --drop-duplicates`
+    """
+    try:
+        collection.create_index(field, unique=True)
+    except OperationFailure as e:
+        # 11000 = chave duplicada
+        if e.code != 11000:
+            raise
+        duplicates = _find_duplicates(collection, field)
+        logger.warning(
+            "Índice único de %s.%s não criado: %s valores duplicados (ex.: %s)",
+            collection.name, field, len(duplicates), [group["_id"] for group in duplicates[:5]],
+        )
+
+
+def _ensure_text_index(collection, language):
+    """Cria o índice de texto, recriando-o se pesos ou idioma mudaram"""
+    options = {
+        "name": BLOGPOSTS_TEXT_INDEX,
+        "weights": BLOGPOSTS_TEXT_WEIGHTS,
+        "default_language": language,
+    }
+    try:
+        collection.create_index([("$**", "text")], **options)
+    except OperationFailure as e:
+        # 85/86 = já existe um índice de texto com outra definição
+        if e.code not in (85, 86):
+            raise
+        for name, info in collection.index_information().items():
+            if any(direction == "text" for _, direction in info.get("key", [])):
+                collection.drop_index(name)
+        collection.create_index([("$**", "text")], **options)
+        logger.warning("Índice de texto de %s recriado", collection.name)
+
+
+def _find_duplicates(collection, field):
+    """Grupos de documentos com o mesmo valor do campo (ids do mais recente para o mais antigo)"""
+    pipeline = [
+        {"$sort": {"_id": -1}},
+        {"$group": {"_id": f"${field}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    return list(collection.aggregate(pipeline, allowDiskUse=True))
+
+
+def drop_duplicates(collection, field):
+    """Mantém apenas o documento mais recente para cada valor do campo e cria o índice único"""
+    removed = 0
+    for group in _find_duplicates(collection, field):
+        result = collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+
+    logger.warning("%s documentos duplicados removidos de %s (%s)", removed, collection.name, field)
+    collection.create_index(field, unique=True)
+    return removed
+
+
+def _ensure_ttl_index(db, collection_name, field, ttl_seconds):
+    """Cria ou ajusta um índice TTL; ttl_seconds <= 0 remove a expiração"""
+    collection = db[collection_name]
+    existing = None
+    for name, info in collection.index_information().items():
+        if info.get("key") == [(field, 1)]:
+            existing = (name, info)
+            break
+
+    if ttl_seconds <= 0:
+        if existing and "expireAfterSeconds" in existing[1]:
+            collection.drop_index(existing[0])
+        return
+
+    if existing is None:
+        collection.create_index(field, expireAfterSeconds=ttl_seconds)
+    elif existing[1].get("expireAfterSeconds") != ttl_seconds:
+        if "expireAfterSeconds" in existing[1]:
+            # Atualiza o TTL sem recriar o índice
+            db.command(
+                "collMod",
+                collection_name,
+                index={"keyPattern": {field: 1}, "expireAfterSeconds": ttl_seconds},
+            )
+        else:
+            collection.drop_index(existing[0])
+            collection.create_index(field, expireAfterSeconds=ttl_seconds)
+
+
+# Chaves únicas das coleções de cache (limpeza manual de duplicatas)
+UNIQUE_KEYS = {
+    "movie_detail_cache": "cache_key",
+    "movie_soundtracks": "cache_key",
+    "directors": "name",
+    "translations": "key",
+    "negative_cache": "key",
+    "image_manifests": "cache_key",
+}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from config import get_mongo_client, MONGODB_DATABASE
+
+    parser = argparse.ArgumentParser(description="Migração única: remove duplicatas e cria os índices únicos")
+    parser.add_argument("--drop-duplicates", action="store_true", help="apaga as duplicatas (mantém o mais recente)")
+    parser.add_argument("--collection", choices=sorted(UNIQUE_KEYS), help="apenas esta coleção")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = get_mongo_client()[MONGODB_DATABASE]
+    for name, field in UNIQUE_KEYS.items():
+        if args.collection and name != args.collection:
+            continue
+        if args.drop_duplicates:
+            print(f"{name}.{field}: {drop_duplicates(db[name], field)} removidos")
+        else:
+            groups = _find_duplicates(db[name], field)
+            print(f"{name}.{field}: {len(groups)} valores duplicados")
@@ -0,0 +1,238 @@
+# Instrumentação por requisição: spans de dependências, Server-Timing e métricas no formato Prometheus
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+METRIC_PREFIX = "movie_search"
+
+logger = logging.getLogger("movie_search.slow_requests")
+
+# Tempos da requisição atual; copiado para as threads dos pools por submit()
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+class _Histogram:
+    """Histograma cumulativo com limites fixos"""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[index] += 1
+        self.total += 1
+        self.sum += seconds
+
+
+class _Registry:
+    """Histogramas e contadores do processo, identificados por (nome, labels)"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, labels, seconds):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {
+                key: (list(h.counts), h.total, h.sum) for key, h in self._histograms.items()
+            }
+            return histograms, dict(self._counters)
+
+
+class _RequestTimings:
+    """Tempo acumulado por dependência dentro de uma requisição (spans podem vir de várias threads)"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.dependencies = {}
+        self._lock = threading.Lock()
+
+    def add(self, dependency, seconds):
+        with self._lock:
+            total, count = self.dependencies.get(dependency, (0.0, 0))
+            self.dependencies[dependency] = (total + seconds, count + 1)
+
+    def items(self):
+        with self._lock:
+            return sorted(self.dependencies.items(), key=lambda item: -item[1][0])
+
+
+_registry = _Registry()
+_caches = {}
+_settings = {"server_timing": True, "slow_request_ms": 0}
+
+
+@contextmanager
+def span(dependency, operation):
+    """
+    Mede uma chamada externa ou consulta ao banco (ex.: span("mongo", "directors.find_one")).
+    Alimenta o histograma da dependência e o Server-Timing da requisição atual.
+    Também pode ser usado como decorador.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _registry.increment(f"{METRIC_PREFIX}_dependency_errors_total",
+                            {"dependency": dependency, "operation": operation})
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        _registry.observe(f"{METRIC_PREFIX}_dependency_duration_seconds",
+                          {"dependency": dependency, "operation": operation}, elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add(dependency, elapsed)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit propagando o contexto (spans da thread contam na requisição que a disparou)"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def count_cache(cache, hit):
+    """Registra acerto ou falha de um cache que não é um TTLCache (ex.: coleções de cache no MongoDB)"""
+    _registry.increment(f"{METRIC_PREFIX}_cache_requests_total",
+                        {"cache": cache, "result": "hit" if hit else "miss"})
+
+
+def register_cache(name, cache):
+    """Expõe os contadores de acertos/falhas de um TTLCache em /metrics"""
+    _caches[name] = cache
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def render_prometheus():
+    """Métricas do processo no formato texto do Prometheus (cada worker expõe as suas)"""
+    histograms, counters = _registry.snapshot()
+
+    for name, cache in _caches.items():
+        stats = cache.stats()
+        for result, field in (("hit", "hits"), ("miss", "misses")):
+            key = (f"{METRIC_PREFIX}_cache_requests_total", (("cache", name), ("result", result)))
+            counters[key] = counters.get(key, 0) + stats[field]
+
+    lines = []
+    declared = set()
+
+    for (name, labels), (counts, total, total_seconds) in sorted(histograms.items()):
+        if name not in declared:
+            lines.append(f"# TYPE {name} histogram")
+            declared.add(name)
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {total}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {round(total_seconds, 6)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {total}")
+
+    for (name, labels), value in sorted(counters.items()):
+        if name not in declared:
+            lines.append(f"# TYPE {name} counter")
+            declared.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def start_request():
+    """Começa a medir uma requisição; retorna o token para end_request"""
+    return _request_timings.set(_RequestTimings())
+
+
+def finish_request(method, endpoint, status, path):
+    """
+    Registra a duração da requisição atual (histograma por endpoint e log de lentidão)
+    e retorna o valor do cabeçalho Server-Timing (None se desativado).
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        return None
+
+    elapsed = time.perf_counter() - timings.started_at
+    _registry.observe(f"{METRIC_PREFIX}_http_request_duration_seconds",
+                      {"endpoint": endpoint, "method": method, "status": str(status)}, elapsed)
+
+    dependencies = timings.items()
+    slow_request_ms = _settings["slow_request_ms"]
+    if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+        breakdown = ", ".join(
+            f"{dependency}={total * 1000:.0f}ms x{count}" for dependency, (total, count) in dependencies
+        )
+        logger.warning(
+            "Requisição lenta: %s %s %s %.0fms (%s)",
+            method, path, status, elapsed * 1000, breakdown or "sem dependências medidas",
+        )
+
+    if not _settings["server_timing"]:
+        return None
+    entries = [
+        f'{dependency};dur={total * 1000:.1f};desc="{count}x"'
+        for dependency, (total, count) in dependencies
+    ]
+    entries.append(f"app;dur={elapsed * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def end_request(token):
+    _request_timings.reset(token)
+
+
+def init_app(app, server_timing=True, slow_request_ms=0):
+    """
+    Mede cada requisição: histograma por endpoint, cabeçalho Server-Timing com o tempo
+    por dependência e, se slow_request_ms > 0, log das requisições mais lentas.
+    """
+    _settings.update(server_timing=server_timing, slow_request_ms=slow_request_ms)
+
+    @app.before_request
+    def _start_request_timing():
+        g._request_timings_token = start_request()
+
+    @app.after_request
+    def _finish_request_timing(response):
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        server_timing = finish_request(
+            request.method, endpoint, response.status_code, request.full_path.rstrip("?")
+        )
+        if server_timing:
+            response.headers["Server-Timing"] = server_timing
+        return response
+
+    @app.teardown_request
+    def _reset_request_timing(error=None):
+        token = g.pop("_request_timings_token", None)
+        if token is not None:
+            end_request(token)
@@ -0,0 +1,131 @@
+# Estatísticas do pool de conexões do MongoDB (eventos CMAP do pymongo) e verificação de saúde
+import threading
+import time
+
+from pymongo import monitoring
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Contadores por servidor de um MongoClient: conexões abertas e em uso (com o pico),
+    retiradas do pool, tempo de espera por uma conexão livre e falhas (ex.: pool esgotado).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = {}
+
+    def _server(self, address):
+        key = f"{address[0]}:{address[1]}"
+        server = self._servers.get(key)
+        if server is None:
+            server = self._servers[key] = {
+                "open": 0,
+                "in_use": 0,
+                "max_in_use": 0,
+                "created": 0,
+                "closed": 0,
+                "checkouts": 0,
+                "checkout_failures": {},
+                "wait_seconds_total": 0.0,
+                "wait_seconds_max": 0.0,
+                "cleared": 0,
+            }
+        return server
+
+    def connection_created(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["open"] += 1
+            server["created"] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["open"] = max(0, server["open"] - 1)
+            server["closed"] += 1
+
+    def connection_checked_out(self, event):
+        wait = event.duration or 0.0
+        with self._lock:
+            server = self._server(event.address)
+            server["in_use"] += 1
+            server["max_in_use"] = max(server["max_in_use"], server["in_use"])
+            server["checkouts"] += 1
+            server["wait_seconds_total"] += wait
+            server["wait_seconds_max"] = max(server["wait_seconds_max"], wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["in_use"] = max(0, server["in_use"] - 1)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            failures = self._server(event.address)["checkout_failures"]
+            failures[event.reason] = failures.get(event.reason, 0) + 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._server(event.address)["cleared"] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def snapshot(self):
+        """Cópia dos contadores, com a espera média e máxima em milissegundos"""
+        with self._lock:
+            servers = {key: {**server, "checkout_failures": dict(server["checkout_failures"])}
+                       for key, server in self._servers.items()}
+
+        for server in servers.values():
+            wait_total = server.pop("wait_seconds_total")
+            wait_max = server.pop("wait_seconds_max")
+            server["avg_wait_ms"] = round(wait_total * 1000 / server["checkouts"], 3) if server["checkouts"] else 0.0
+            server["max_wait_ms"] = round(wait_max * 1000, 3)
+        return servers
+
+
+def mongo_health(client, pool_stats, options):
+    """Ping (com latência), topologia vista pelo cliente e uso do pool deste processo"""
+    started = time.perf_counter()
+    try:
+        client.admin.command("ping")
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, str(e)
+    ping_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    description = client.topology_description
+    servers = [
+        {
+            "address": f"{host}:{port}",
+            "type": server.server_type_name,
+            "round_trip_ms": round(server.round_trip_time * 1000, 2) if server.round_trip_time is not None else None,
+        }
+        for (host, port), server in description.server_descriptions().items()
+    ]
+
+    return {
+        "ok": ok,
+        "error": error,
+        "ping_ms": ping_ms,
+        "topology": description.topology_type_name,
+        "servers": servers,
+        "pool": {
+            "options": options,
+            "servers": pool_stats.snapshot() if pool_stats is not None else {},
+        },
+    }
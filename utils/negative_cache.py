@@ -0,0 +1,76 @@
+# Cache negativo: itens que não foram encontrados, com nova tentativa por backoff
+from datetime import datetime, timedelta
+
+from config import (
+    get_mongo_collection,
+    NEGATIVE_CACHE_BACKOFF_MINUTES,
+    NEGATIVE_CACHE_TTL_DAYS,
+)
+
+COLLECTION_NAME = "negative_cache"
+
+
+def is_known_missing(kind, key):
+    """Indica se o item falhou recentemente e ainda está dentro do backoff"""
+    try:
+        collection = get_mongo_collection(COLLECTION_NAME)
+        return collection.find_one(
+            {"key": f"{kind}:{key}", "retry_at": {"$gt": datetime.utcnow()}},
+            {"_id": 1}
+        ) is not None
+    except Exception:
+        return False
+
+
+def record_missing(kind, key):
+    """Registra uma tentativa sem resultado e agenda a próxima conforme o backoff"""
+    try:
+        get_mongo_collection(COLLECTION_NAME).update_one(
+            {"key": f"{kind}:{key}"},
+            _record_update(kind, datetime.utcnow()),
+            upsert=True
+        )
+    except Exception:
+        pass
+
+
+def _record_update(kind, now):
+    """Pipeline de atualização: soma a tentativa e calcula a próxima no mesmo comando"""
+    return [
+        {"$set": {
+            "kind": kind,
+            "last_attempt_at": now,
+            "attempts": {"$add": [{"$ifNull": ["$attempts", 0]}, 1]},
+        }},
+        # Quanto mais tentativas sem resultado, maior o intervalo (o último se repete)
+        {"$set": {
+            "retry_at": {"$add": [now, {"$multiply": [
+                {"$arrayElemAt": [
+                    NEGATIVE_CACHE_BACKOFF_MINUTES,
+                    {"$subtract": [{"$min": ["$attempts", len(NEGATIVE_CACHE_BACKOFF_MINUTES)]}, 1]},
+                ]},
+                60 * 1000,
+            ]}]},
+            # Removido pelo índice TTL; depois disso as tentativas recomeçam do zero
+            "expires_at": now + timedelta(days=NEGATIVE_CACHE_TTL_DAYS),
+        }},
+    ]
+
+
+def clear_missing(kind, key):
+    """Remove o item do cache negativo (foi encontrado)"""
+    try:
+        get_mongo_collection(COLLECTION_NAME).delete_one({"key": f"{kind}:{key}"})
+    except Exception:
+        pass
+
+
+def count_known_missing():
+    """Quantidade de itens no cache negativo por tipo"""
+    collection = get_mongo_collection(COLLECTION_NAME)
+    return {
+        group["_id"]: group["count"]
+        for group in collection.aggregate([
+            {"$group": {"_id": "$kind", "count": {"$sum": 1}}}
+        ])
+    }
@@ -0,0 +1,70 @@
+# Execução paralela de etapas independentes com prazo total
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from config import ORCHESTRATION_WORKERS
+from utils.metrics import submit
+
+_executor = ThreadPoolExecutor(
+    max_workers=ORCHESTRATION_WORKERS,
+    thread_name_prefix="orchestration"
+)
+
+# Tarefas assíncronas que passaram do prazo; a referência evita que sejam coletadas antes de terminar
+_background_tasks = set()
+
+
+def run_parallel(tasks, timeout, executor=None):
+    """
+    Executa as etapas ({nome: função}) ao mesmo tempo e espera no máximo `timeout` segundos.
+
+    Retorna (resultados, etapas que não terminaram a tempo). Etapas que falharam
+    ficam com resultado None; as que estouraram o prazo continuam rodando em
+    segundo plano e não aparecem nos resultados.
+    """
+    executor = executor or _executor
+    futures = {name: submit(executor, fn) for name, fn in tasks.items()}
+
+    done, _ = wait(futures.values(), timeout=timeout)
+
+    results = {}
+    timed_out = []
+    for name, future in futures.items():
+        if future not in done:
+            timed_out.append(name)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception:
+            results[name] = None
+
+    return results, timed_out
+
+
+async def run_parallel_async(tasks, timeout):
+    """
+    Versão assíncrona de run_parallel ({nome: função que retorna uma corrotina}).
+
+    Mesmo retorno: (resultados, etapas que não terminaram a tempo). As etapas atrasadas
+    não são canceladas; continuam no event loop e salvam seus resultados normalmente.
+    """
+    if not tasks:
+        return {}, []
+
+    running = {name: asyncio.ensure_future(fn()) for name, fn in tasks.items()}
+    done, _ = await asyncio.wait(running.values(), timeout=timeout)
+
+    results = {}
+    timed_out = []
+    for name, task in running.items():
+        if task not in done:
+            timed_out.append(name)
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+            continue
+        try:
+            results[name] = task.result()
+        except Exception:
+            results[name] = None
+
+    return results, timed_out
@@ -0,0 +1,102 @@
+# Paginação por cursor (keyset) usando os campos de ordenação
+import base64
+import binascii
+
+from bson import json_util
+from bson.errors import BSONError
+
+
+class InvalidCursor(ValueError):
+    """Cursor de paginação malformado ou de outra ordenação"""
+
+
+def requested_cursor(params):
+    """None para paginação por página; string (vazia na primeira página) para cursor"""
+    cursor = params.get("cursor")
+    if cursor:
+        return cursor
+    if params.get("pagination") == "cursor":
+        return ""
+    return None
+
+
+def encode_cursor(document, sort):
+    """Gera um cursor opaco com os valores de ordenação do último documento"""
+    values = {field: document.get(field) for field, _ in sort}
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor, sort):
+    """Lê os valores de ordenação de um cursor"""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError, TypeError, BSONError):
+        # BSONError cobre ObjectId malformado ({"$oid": "..."} com InvalidId)
+        raise InvalidCursor("Cursor inválido")
+
+    if not isinstance(values, dict) or set(values) != {field for field, _ in sort}:
+        raise InvalidCursor("Cursor inválido")
+    return values
+
+
+def _after_cursor_filter(values, sort):
+    """Filtro que seleciona documentos depois do cursor na ordenação (f1, f2, ...)"""
+    conditions = []
+    for index, (field, direction) in enumerate(sort):
+        after = _after_value(field, direction, values[field])
+        if after is None:
+            continue
+        condition = {previous: values[previous] for previous, _ in sort[:index]}
+        condition.update(after)
+        conditions.append(condition)
+    return {"$or": conditions}
+
+
+def _after_value(field, direction, value):
+    """
+    Condição "depois de value" no campo. No MongoDB null/ausente vem antes de qualquer valor
+    na ordem crescente (e por último na decrescente); None = nada vem depois.
+    """
+    if value is None:
+        return {field: {"$ne": None}} if direction == 1 else None
+    if direction == 1:
+        return {field: {"$gt": value}}
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def paginate_by_cursor(collection, filters, sort, page_size, cursor=None, count="estimated", projection=None):
+    """
+    Busca uma página a partir do cursor, sem skip.
+
+    `sort` deve terminar em um campo único (normalmente _id). `count` pode ser
+    "exact" (count_documents), "estimated" (metadado da coleção, apenas sem
+    filtros) ou "none".
+    """
+    query = filters
+    if cursor:
+        after = _after_cursor_filter(decode_cursor(cursor, sort), sort)
+        query = {"$and": [filters, after]} if filters else after
+
+    # Busca um documento a mais para saber se existe próxima página
+    items = list(
+        collection.find(query, projection)
+        .sort(sort)
+        .limit(page_size + 1)
+    )
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    result = {
+        "entries": items,
+        "page_size": page_size,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(items[-1], sort) if has_more else None,
+    }
+
+    if count == "exact":
+        result["total_documents"] = collection.count_documents(filters)
+    elif count == "estimated" and not filters:
+        result["total_documents"] = collection.estimated_document_count()
+
+    return result
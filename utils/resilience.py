@@ -0,0 +1,237 @@
+# Limite de taxa e circuit breaker por provedor externo (OpenAI, Spotify, IMDB)
+import asyncio
+import threading
+import time
+
+from config import (
+    PROVIDER_RATE_LIMITS,
+    RATE_LIMIT_MAX_WAIT,
+    CIRCUIT_BREAKER_FAILURES,
+    CIRCUIT_BREAKER_RESET_SECONDS,
+)
+from utils.metrics import span
+
+
+class ProviderUnavailable(Exception):
+    """Provedor com circuito aberto ou sem capacidade no limite de taxa"""
+
+
+class TokenBucket:
+    """Token bucket: `rate` chamadas por segundo com rajadas de até `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def _try_acquire(self, max_wait):
+        """Consome um token se houver; senão retorna (agora, segundos até o próximo token)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return now, 0
+            return now, (1 - self._tokens) / self.rate if self.rate > 0 else max_wait
+
+    def acquire(self, max_wait=0):
+        """Consome um token, esperando no máximo max_wait segundos"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            now, wait = self._try_acquire(max_wait)
+            if wait == 0:
+                return True
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait=0):
+        """Como acquire, mas espera sem bloquear o event loop"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            now, wait = self._try_acquire(max_wait)
+            if wait == 0:
+                return True
+            if now + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return round(self._tokens, 2)
+
+
+class CircuitBreaker:
+    """Abre após falhas seguidas; depois do tempo de espera libera uma chamada de teste"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Indica se a chamada pode ser feita agora"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            # Meio aberto: apenas uma chamada de teste por vez
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Libera a chamada de teste quando o erro não indica problema no provedor"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class ProviderGuard:
+    """Limite de taxa + circuit breaker de um provedor, com contadores para monitoramento"""
+
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_RESET_SECONDS)
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise ProviderUnavailable(f"{self.name}: circuito aberto")
+
+    def _reject_rate_limited(self):
+        self.breaker.release()
+        self._count("rejected")
+        raise ProviderUnavailable(f"{self.name}: limite de taxa atingido")
+
+    def _record_error(self, error):
+        if _is_provider_failure(error):
+            self._count("failures")
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    def call(self, fn, *args, **kwargs):
+        """Executa fn respeitando o circuito e o limite de taxa do provedor"""
+        self._check_circuit()
+        if not self.limiter.acquire(RATE_LIMIT_MAX_WAIT):
+            self._reject_rate_limited()
+
+        self._count("calls")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record_error(e)
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def call_async(self, fn, *args, **kwargs):
+        """Como call, para corrotinas (fn(*args, **kwargs) é aguardada)"""
+        self._check_circuit()
+        if not await self.limiter.acquire_async(RATE_LIMIT_MAX_WAIT):
+            self._reject_rate_limited()
+
+        self._count("calls")
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            self._record_error(e)
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    def state(self):
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "tokens_available": self.limiter.available(),
+            "rate_per_second": self.limiter.rate,
+            "burst": self.limiter.capacity,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+def _is_provider_failure(error):
+    """Timeouts, erros de conexão, 429 e 5xx indicam provedor com problema; 4xx não"""
+    status = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+
+    if status is None:
+        return True
+    return status == 429 or status >= 500
+
+
+_guards = {
+    name: ProviderGuard(name, limits["rate"], limits["burst"])
+    for name, limits in PROVIDER_RATE_LIMITS.items()
+}
+
+
+def guarded_call(provider, fn, *args, **kwargs):
+    """Chama fn pelo guard do provedor (openai, spotify ou imdb), medindo a latência da chamada"""
+    with span(provider, getattr(fn, "__name__", "call")):
+        return _guards[provider].call(fn, *args, **kwargs)
+
+
+async def guarded_call_async(provider, fn, *args, **kwargs):
+    """guarded_call para clientes assíncronos (modo ASGI)"""
+    with span(provider, getattr(fn, "__name__", "call")):
+        return await _guards[provider].call_async(fn, *args, **kwargs)
+
+
+def get_providers_state():
+    """Estado atual de cada provedor (circuito, tokens e contadores)"""
+    return {name: guard.state() for name, guard in _guards.items()}
@@ -0,0 +1,130 @@
+# Índice invertido em memória com normalização de acentos e busca por prefixo
+import bisect
+import heapq
+import threading
+from collections import defaultdict
+
+from utils.text import tokenize
+
+# Limite padrão de palavras do vocabulário expandidas por um prefixo curto ("a", "ca"...);
+# acima dele ficam as palavras presentes em mais documentos (e sempre a palavra exata)
+MAX_PREFIX_EXPANSIONS = 200
+
+
+class SearchIndex:
+    """Índice invertido: palavra -> {documento: peso}, com vocabulário ordenado para prefixos"""
+
+    def __init__(self, max_prefix_expansions=MAX_PREFIX_EXPANSIONS):
+        self.max_prefix_expansions = max_prefix_expansions
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def __len__(self):
+        return len(self._documents)
+
+    def upsert(self, doc_key, display, weighted_texts):
+        """Indexa (ou reindexa) um documento; weighted_texts = [(texto, peso), ...]"""
+        weights = {}
+        for text, weight in weighted_texts:
+            if not text:
+                continue
+            for token in tokenize(text):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+
+        with self._lock:
+            self._remove(doc_key)
+            if not weights:
+                return
+            self._documents[doc_key] = (display, tuple(weights))
+            for token, weight in weights.items():
+                postings = self._postings[token]
+                if not postings and not self._vocabulary_dirty:
+                    bisect.insort(self._vocabulary, token)
+                postings[doc_key] = weight
+
+    def remove(self, doc_key):
+        """Remove um documento do índice"""
+        with self._lock:
+            self._remove(doc_key)
+
+    def _remove(self, doc_key):
+        entry = self._documents.pop(doc_key, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_key, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_dirty = True
+
+    def _expand(self, term):
+        """Palavras do vocabulário que começam com o termo (as mais frequentes, se forem muitas)"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\uffff", start)
+        if end - start <= self.max_prefix_expansions:
+            return self._vocabulary[start:end]
+
+        tokens = heapq.nlargest(
+            self.max_prefix_expansions,
+            self._vocabulary[start:end],
+            key=lambda token: len(self._postings[token]),
+        )
+        if term in self._postings and term not in tokens:
+            tokens[-1] = term
+        return tokens
+
+    def search(self, query, limit=10, accept=None):
+        """
+        Busca todos os termos da consulta (E lógico), cada um por prefixo.
+        Palavras idênticas ao termo valem o dobro. Retorna (total, [(score, display)]).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return 0, []
+
+        with self._lock:
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token in self._expand(term):
+                    boost = 2 if token == term else 1
+                    for doc_key, weight in self._postings[token].items():
+                        score = weight * boost
+                        if term_scores.get(doc_key, 0) < score:
+                            term_scores[doc_key] = score
+
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        doc_key: score + term_scores[doc_key]
+                        for doc_key, score in scores.items()
+                        if doc_key in term_scores
+                    }
+                if not scores:
+                    return 0, []
+
+            matches = [
+                (score, self._documents[doc_key][0])
+                for doc_key, score in scores.items()
+                if accept is None or accept(doc_key)
+            ]
+
+        matches.sort(key=lambda match: (-match[0], match[1].get("title") or ""))
+        return len(matches), matches[:limit]
+
+    def stats(self):
+        """Tamanho do índice"""
+        with self._lock:
+            return {"documents": len(self._documents), "tokens": len(self._postings)}
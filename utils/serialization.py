@@ -0,0 +1,109 @@
+# Serialização JSON das respostas: orjson quando instalado, json da biblioteca padrão senão
+import json
+import logging
+from datetime import date, datetime
+
+from bson import ObjectId
+from flask import Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+JSON_MIMETYPE = "application/json"
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value):
+    """Tipos do MongoDB que o JSON não conhece (ObjectId; datas no fallback sem orjson)"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def dumps(data):
+    """Serializa para bytes UTF-8, convertendo ObjectId e datas"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """Representação application/json do Flask-RESTX usando o serializador rápido"""
+    response = Response(dumps(data), status=code, mimetype=JSON_MIMETYPE)
+    if headers:
+        response.headers.extend(headers)
+    return response
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provider do Flask (jsonify) usando o mesmo serializador. Argumentos do json.dumps
+    (indent, sort_keys...) fazem a serialização passar pelo json da biblioteca padrão,
+    que os respeita; em modo debug (ou compact=False) a resposta sai indentada.
+    """
+
+    # Chaves na ordem de inserção, como no orjson (app.json.sort_keys = True volta a ordenar)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs and not self.sort_keys:
+            return dumps(obj).decode("utf-8")
+        kwargs.setdefault("default", _default)
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.sort_keys or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        data = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(data), mimetype=self.mimetype)
+
+
+_EMPTY = object()
+
+
+def stream_json(documents, key="data", envelope=None):
+    """
+    Resposta {<envelope...>, "<key>": [...]} gerada conforme o cursor é lido,
+    sem montar a lista inteira em memória.
+    O primeiro lote é lido antes de responder: um erro na consulta sobe para o chamador,
+    que ainda pode responder 500. Se a leitura falhar depois do status 200 já enviado,
+    o JSON termina com "error" para não parecer uma lista completa.
+    """
+    envelope = envelope or {}
+    iterator = iter(documents)
+    try:
+        first = next(iterator, _EMPTY)
+    except Exception:
+        _close(documents)
+        raise
+
+    def generate():
+        prefix = b"".join(dumps(name) + b":" + dumps(value) + b"," for name, value in envelope.items())
+        yield b"{" + prefix + dumps(key) + b":["
+        try:
+            if first is not _EMPTY:
+                yield dumps(first)
+                for document in iterator:
+                    yield b"," + dumps(document)
+        except Exception as e:
+            logger.exception("Erro ao ler documentos durante o streaming de '%s'", key)
+            yield b"]," + dumps("error") + b":" + dumps("Resposta incompleta: erro ao ler os documentos") + b"}"
+            return
+        yield b"]}"
+
+    response = Response(stream_with_context(generate()), mimetype=JSON_MIMETYPE)
+    response.call_on_close(lambda: _close(documents))
+    return response
+
+
+def _close(documents):
+    """Fecha o cursor (se houver) ao terminar ou abandonar o streaming"""
+    close = getattr(documents, "close", None)
+    if callable(close):
+        close()
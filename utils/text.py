@@ -0,0 +1,74 @@
+# Utilitários de texto: normalização sem acentos e trechos destacados
+import html
+import re
+import unicodedata
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fold(text):
+    """Minúsculas e sem acentos ("Ação" -> "acao")"""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text):
+    """Palavras normalizadas do texto"""
+    return _WORD_RE.findall(fold(text))
+
+
+def query_terms(query):
+    """Termos de uma busca textual, ignorando negações (-termo) do $text"""
+    terms = []
+    for word in str(query).split():
+        if word.startswith("-"):
+            continue
+        terms.extend(tokenize(word))
+    return terms
+
+
+def _fold_with_positions(text):
+    """Texto normalizado + posição original de cada caractere normalizado"""
+    folded = []
+    positions = []
+    for index, char in enumerate(text):
+        for folded_char in fold(char):
+            folded.append(folded_char)
+            positions.append(index)
+    return "".join(folded), positions
+
+
+def highlight_snippet(text, terms, width=160, mark=("<mark>", "</mark>")):
+    """
+    Trecho de até `width` caracteres em volta do primeiro termo encontrado,
+    com os termos marcados. Retorna None se nenhum termo aparecer no texto.
+    """
+    if not text or not terms or not isinstance(text, str):
+        return None
+
+    folded, positions = _fold_with_positions(text)
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\w*")
+
+    spans = [
+        (positions[match.start()], positions[match.end() - 1] + 1)
+        for match in pattern.finditer(folded)
+    ]
+    if not spans:
+        return None
+
+    first_start = spans[0][0]
+    start = max(0, first_start - width // 3)
+    end = min(len(text), start + width)
+
+    parts = ["…" if start > 0 else ""]
+    cursor = start
+    for span_start, span_end in spans:
+        if span_start < start or span_end > end:
+            continue
+        parts.append(html.escape(text[cursor:span_start]))
+        parts.append(mark[0] + html.escape(text[span_start:span_end]) + mark[1])
+        cursor = span_end
+    parts.append(html.escape(text[cursor:end]))
+    parts.append("…" if end < len(text) else "")
+
+    return "".join(parts)
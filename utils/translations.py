@@ -0,0 +1,159 @@
+# Cache persistente de traduções (MongoDB com LRU em memória na frente)
+import asyncio
+import hashlib
+from datetime import datetime
+
+from config import (
+    get_mongo_collection,
+    OPENAI_API_KEY,
+    TRANSLATION_MEMORY_CACHE_SIZE,
+    TRANSLATION_MEMORY_CACHE_TTL,
+)
+from utils.cache import AsyncSingleFlight, TTLCache, SingleFlight
+from utils.clients import chat_completion, chat_completion_async
+from utils.metrics import register_cache
+
+_memory_cache = TTLCache(
+    max_size=TRANSLATION_MEMORY_CACHE_SIZE,
+    ttl_seconds=TRANSLATION_MEMORY_CACHE_TTL
+)
+register_cache("translations_memory", _memory_cache)
+_translations_in_flight = SingleFlight()
+_async_translations_in_flight = AsyncSingleFlight()
+
+
+def translation_key(kind, text, language):
+    """Chave da tradução: tipo de conteúdo + idioma + hash do texto original"""
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{kind}:{language}:{content_hash}"
+
+
+def translate_with_cache(kind, text, language, translate_fn):
+    """Retorna a tradução salva ou chama translate_fn(text, language) uma única vez"""
+    if not text:
+        return text
+
+    key = translation_key(kind, text, language)
+
+    translated = _memory_cache.get(key)
+    if translated is not None:
+        return translated
+
+    translated, _ = _translations_in_flight.do(
+        key, _load_or_translate, key, kind, text, language, translate_fn
+    )
+    return translated
+
+
+def _load_or_translate(key, kind, text, language, translate_fn):
+    """Busca a tradução no MongoDB e, se não existir, traduz e salva"""
+    saved = _find_translation(key)
+    if saved is not None:
+        return saved
+
+    translated = translate_fn(text, language)
+    if _should_save(text, translated):
+        _save_translation(key, kind, language, translated)
+    return translated
+
+
+async def translate_with_cache_async(kind, text, language, translate_fn):
+    """Versão assíncrona (modo ASGI): translate_fn(text, language) é uma corrotina"""
+    if not text:
+        return text
+
+    key = translation_key(kind, text, language)
+
+    translated = _memory_cache.get(key)
+    if translated is not None:
+        return translated
+
+    translated, _ = await _async_translations_in_flight.do(
+        key, _load_or_translate_async, key, kind, text, language, translate_fn
+    )
+    return translated
+
+
+async def _load_or_translate_async(key, kind, text, language, translate_fn):
+    """_load_or_translate com a tradução em corrotina (o MongoDB roda numa thread)"""
+    saved = await asyncio.to_thread(_find_translation, key)
+    if saved is not None:
+        return saved
+
+    translated = await translate_fn(text, language)
+    if _should_save(text, translated):
+        await asyncio.to_thread(_save_translation, key, kind, language, translated)
+    return translated
+
+
+def _should_save(text, translated):
+    """Os tradutores devolvem o texto original quando falham; nesse caso não salva"""
+    return bool(translated) and translated != text
+
+
+def _find_translation(key):
+    """Tradução salva no MongoDB (também guardada na memória); None se não houver"""
+    try:
+        saved = get_mongo_collection("translations").find_one({"key": key}, {"text": 1})
+    except Exception:
+        return None
+
+    if saved:
+        _memory_cache.set(key, saved["text"])
+        return saved["text"]
+    return None
+
+
+def _save_translation(key, kind, language, translated):
+    """Guarda a tradução na memória e no MongoDB (erros do banco são ignorados)"""
+    _memory_cache.set(key, translated)
+    try:
+        get_mongo_collection("translations").update_one(
+            {"key": key},
+            {"$setOnInsert": {
+                "key": key,
+                "kind": kind,
+                "language": language,
+                "text": translated,
+                "created_at": datetime.utcnow(),
+            }},
+            upsert=True
+        )
+    except Exception:
+        pass
+
+
+def translate_text(kind, text, language, build_request):
+    """
+    Traduz com o cache de traduções; build_request(text) monta a chamada à OpenAI.
+    Sem OpenAI (ou em português) o texto é mantido, assim como se a OpenAI falhar.
+    """
+    if not OPENAI_API_KEY or language == "pt":
+        return text
+
+    def translate(text, language):
+        try:
+            return chat_completion(build_request(text))
+        except Exception as e:
+            return text
+
+    return translate_with_cache(kind, text, language, translate)
+
+
+async def translate_text_async(kind, text, language, build_request):
+    """translate_text com o cliente AsyncOpenAI (modo ASGI)"""
+    if not OPENAI_API_KEY or language == "pt":
+        return text
+
+    async def translate(text, language):
+        try:
+            return await chat_completion_async(build_request(text))
+        except Exception as e:
+            return text
+
+    return await translate_with_cache_async(kind, text, language, translate)
+
+
+def get_translation_cache_stats():
+    """Retorna estatísticas do cache de traduções em memória"""
+    return _memory_cache.stats()
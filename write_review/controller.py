@@ -1,8 +1,10 @@
 from config import get_mongo_collection
+from utils.export import ndjson_response, since_filter
+from utils.pagination import paginate_by_cursor, InvalidCursor
 
 COLLECTION_NAME = "authoralreviewslist"
 
-def search_write_reviews(filters, page=1, page_size=10):
+def search_write_reviews(filters, page=1, page_size=10, cursor=None, count="estimated"):
     """Pesquisa opiniões pessoais com base em filtros e paginação"""
     try:
         write_reviews_collection = get_mongo_collection(COLLECTION_NAME)
@@ -16,6 +18,12 @@ def search_write_reviews(filters, page=1, page_size=10):
             else:
                 search_filters[key] = value
         
+        if cursor is not None:
+            result = paginate_by_cursor(
+                write_reviews_collection, search_filters, [("_id", -1)], page_size, cursor, count
+            )
+            return result, 200
+        
         total_documents = write_reviews_collection.count_documents(search_filters)
         skip = (page - 1) * page_size
         
@@ -26,13 +34,12 @@ def search_write_reviews(filters, page=1, page_size=10):
             .limit(page_size)
         )
         
-        for review in reviews:
-            review["_id"] = str(review["_id"])
-        
         return {
             "total_documents": total_documents,
             "entries": reviews
         }, 200
+    except InvalidCursor as e:
+        return {"status": 400, "message": str(e)}, 400
     except Exception as e:
         return {"status": 500, "message": "Erro ao pesquisar opiniões pessoais"}, 500
 
@@ -52,14 +59,15 @@ def get_write_review(tconst):
         return {"status": 500, "message": "Erro ao recuperar opinião pessoal"}, 500
 
 
-def get_all_write_reviews():
+def get_all_write_reviews(since=None, stream=False):
     """Recupera todas as opiniões pessoais"""
+    filters = since_filter(since)
     try:
+        if stream:
+            return ndjson_response(get_mongo_collection(COLLECTION_NAME), filters)
+
         write_reviews_collection = get_mongo_collection(COLLECTION_NAME)
-        reviews = list(write_reviews_collection.find({}))
-        
-        for review in reviews:
-            review["_id"] = str(review["_id"])
+        reviews = list(write_reviews_collection.find(filters))
         
         return {"data": reviews}, 200
     except Exception as e:
@@ -2,6 +2,8 @@ from flask import Blueprint, request
 from flask_restx import Namespace, Resource, fields
 
 from .controller import get_all_write_reviews, get_write_review, search_write_reviews
+from utils.pagination import requested_cursor
+from utils.export import parse_since, wants_ndjson
 
 
 write_review_bp = Blueprint("write_review", __name__)
@@ -72,9 +74,32 @@ search_input = api.model(
         "filters": fields.Raw(description="Filtros de busca", default={}),
         "page": fields.Integer(description="Número da página", default=1),
         "page_size": fields.Integer(description="Tamanho da página", default=10),
+        "pagination": fields.String(description="Use 'cursor' para paginação por cursor"),
+        "cursor": fields.String(description="Cursor retornado em next_cursor"),
+        "count": fields.String(description="Total no modo cursor: exact, estimated ou none", default="estimated"),
     },
 )
 
+@api.route("/")
+class AllMovieReviews(Resource):
+    @api.doc(
+        "get_all_reviews",
+        params={
+            "since": "Exporta apenas documentos criados/alterados depois desta data ISO 8601 (ou ObjectId)",
+            "format": "ndjson para exportar em streaming, um documento por linha",
+        },
+    )
+    @api.response(200, "Success")
+    @api.response(400, "Invalid since parameter")
+    def get(self):
+        """Recupera todas as resenhas"""
+        try:
+            since = parse_since(request.args.get("since"))
+        except ValueError:
+            return {"status": 400, "message": "Parâmetro since inválido"}, 400
+        return get_all_write_reviews(since, wants_ndjson(request.args, request.headers))
+
+
 @api.route("/<string:tconst>")
 class MovieReview(Resource):
     @api.doc("get_review")
@@ -107,4 +132,6 @@ class ReviewSearch(Resource):
             filters=request_data.get("filters", {}),
             page=request_data.get("page", 1),
             page_size=request_data.get("page_size", 10),
+            cursor=requested_cursor(request_data),
+            count=request_data.get("count", "estimated"),
         )